@@ -0,0 +1,199 @@
+"""Local stand-in for the Anchor Browser API, used by the benchmarks so they run without network access
+
+Only the routes the tools use are implemented. Responses have the same shape as the real API,
+with configurable latency, payload sizes and failure rate.
+"""
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections import Counter
+import json
+import random
+import threading
+import time
+import uuid
+
+
+@dataclass
+class FakeServerConfig:
+    latency: float = 0.05  # Seconds per tool call
+    jitter: float = 0.0  # Extra uniform random latency, in seconds
+    session_latency: float = 0.2  # Seconds to "boot" a browser session
+    content_bytes: int = 20_000
+    screenshot_bytes: int = 200_000
+    failure_rate: float = 0.0  # Share of tool calls answered with a 503
+    seed: int | None = None
+
+
+def sample_for_schema(schema: dict):
+    """A small value that satisfies a JSON Schema of the kinds the benchmarks send"""
+    if "const" in schema:
+        return schema["const"]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    for keyword in ("anyOf", "oneOf"):
+        if schema.get(keyword):
+            return sample_for_schema(schema[keyword][0])
+    kind = schema.get("type", "object" if "properties" in schema else "string")
+    if isinstance(kind, list):
+        kind = kind[0]
+    if kind == "object":
+        return {name: sample_for_schema(sub) for name, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [sample_for_schema(schema.get("items", {}))] * schema.get("minItems", 1)
+    samples = {"string": "Task completed", "integer": 1, "number": 1.0, "boolean": True, "null": None}
+    return samples.get(kind, "Task completed")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so client connection pooling is exercised
+    disable_nagle_algorithm = True  # Headers and body are separate writes; avoid delayed-ACK stalls
+    server: "FakeAnchorServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = self._read_body()
+        path = self.path.split("?", 1)[0]
+        # Counted on arrival, so requests the client gave up on are included
+        self.server.count(f"POST {path}")
+        if path == "/v1/sessions":
+            self.server.pause(self.server.config.session_latency)
+            self._send_json(200, {"data": self.server.create_session()})
+        elif path == "/v1/tools/fetch-webpage":
+            self._tool_call(lambda: self._send(200, self.server.content, "text/plain"))
+        elif path == "/v1/tools/screenshot":
+            self._tool_call(lambda: self._send(200, self.server.screenshot, "image/png"))
+        elif path == "/v1/tools/perform-web-task":
+            schema = json.loads(body or b"{}").get("output_schema")
+            # A structured task answers with data that matches its schema, as the real API would
+            result = sample_for_schema(schema) if schema else "Task completed"
+            self._tool_call(lambda: self._send_json(200, {"data": {"result": result}}))
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown route {path}"}})
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/v1/sessions/all/status":
+            self._send_json(200, {"data": self.server.session_statuses()})
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown route {path}"}})
+        self.server.count(f"GET {path}")
+
+    def do_DELETE(self):
+        path = self.path.split("?", 1)[0]
+        self.server.end_session(path.rsplit("/", 1)[-1])
+        self._send_json(200, {"data": {"status": "success"}})
+        self.server.count("DELETE /v1/sessions/{id}")
+
+    def _tool_call(self, respond):
+        self.server.pause(self.server.config.latency, self.server.config.jitter)
+        if self.server.should_fail():
+            self._send_json(503, {"error": {"message": "Service temporarily unavailable"}})
+        else:
+            respond()
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send_json(self, status: int, payload: dict):
+        self._send(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeAnchorServer(ThreadingHTTPServer):
+    """Threaded HTTP server on 127.0.0.1 with an ephemeral port; use as a context manager"""
+
+    daemon_threads = True
+
+    def __init__(self, config: FakeServerConfig | None = None):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.config = config or FakeServerConfig()
+        self.content = b"x" * self.config.content_bytes
+        self.screenshot = b"\x89PNG\r\n\x1a\n" + bytes(max(self.config.screenshot_bytes - 8, 0))
+        self.requests = Counter()
+        self.sessions_created = 0
+        self.peak_live_sessions = 0
+        self._live_sessions: set[str] = set()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeAnchorServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def pause(self, latency: float, jitter: float = 0.0) -> None:
+        with self._lock:
+            extra = self._random.uniform(0, jitter) if jitter else 0.0
+        if latency + extra > 0:
+            time.sleep(latency + extra)
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.config.failure_rate
+
+    def count(self, route: str) -> None:
+        with self._lock:
+            self.requests[route] += 1
+
+    def create_session(self) -> dict:
+        session_id = str(uuid.uuid4())
+        with self._lock:
+            self.sessions_created += 1
+            self._live_sessions.add(session_id)
+            self.peak_live_sessions = max(self.peak_live_sessions, len(self._live_sessions))
+        return {
+            "id": session_id,
+            "cdp_url": f"ws://127.0.0.1/{session_id}",
+            "live_view_url": f"{self.url}/live/{session_id}",
+        }
+
+    def end_session(self, session_id: str) -> None:
+        with self._lock:
+            self._live_sessions.discard(session_id)
+
+    def session_statuses(self) -> dict:
+        with self._lock:
+            items = [
+                {"session_id": session_id, "status": "running", "created_at": "2024-01-01T00:00:00Z"}
+                for session_id in self._live_sessions
+            ]
+        return {"count": len(items), "items": items}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": dict(self.requests),
+                "sessions_created": self.sessions_created,
+                "peak_live_sessions": self.peak_live_sessions,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.sessions_created = 0
+            self.peak_live_sessions = len(self._live_sessions)
@@ -0,0 +1,315 @@
+"""Offline benchmarks for the Anchor Browser tools
+
+Starts a local FakeAnchorServer, points the SDK at it through ANCHORBROWSER_BASE_URL and drives
+the tools at several concurrency levels, sync and async, with and without session pooling.
+Results are written as JSON; pass --compare with an earlier results file to flag regressions.
+
+    python benchmarks/run_benchmarks.py --concurrency 1,8 --requests 40 --output results.json
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from fake_anchor_server import FakeAnchorServer, FakeServerConfig
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+OUTPUT_SCHEMA = {"type": "object", "properties": {"title": {"type": "string"}}}
+
+# tool key -> (tool class name, input builder); every call uses a distinct URL so nothing is coalesced
+TOOL_INPUTS = {
+    "content": ("AnchorContentTool", lambda i: {"url": f"https://example.com/page/{i}", "format": "markdown"}),
+    "screenshot": ("AnchorScreenshotTool", lambda i: {"url": f"https://example.com/page/{i}"}),
+    "web_task": ("SimpleAnchorWebTaskTool", lambda i: {"prompt": "Read the title", "url": f"https://example.com/page/{i}"}),
+    "web_task_structured": (
+        "AdvancedAnchorWebTaskTool",
+        lambda i: {"prompt": "Read the title", "url": f"https://example.com/page/{i}", "output_schema": OUTPUT_SCHEMA},
+    ),
+}
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+def rss_mb() -> float | None:
+    """Current resident set size, falling back to the peak where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def summarize(latencies: list[float], errors: int, wall_seconds: float) -> dict:
+    return {
+        "calls": len(latencies) + errors,
+        "errors": errors,
+        "wall_seconds": wall_seconds,
+        "throughput_per_second": len(latencies) / wall_seconds if wall_seconds else None,
+        "p50_ms": _ms(percentile(latencies, 50)),
+        "p95_ms": _ms(percentile(latencies, 95)),
+        "p99_ms": _ms(percentile(latencies, 99)),
+        "mean_ms": _ms(sum(latencies) / len(latencies)) if latencies else None,
+    }
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def run_sync(tool, inputs: list[dict], concurrency: int) -> tuple[list[float], int, float]:
+    def call(tool_input):
+        start = time.perf_counter()
+        try:
+            tool.invoke(tool_input)
+        except Exception:
+            return None
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        timings = list(executor.map(call, inputs))
+    wall = time.perf_counter() - start
+    latencies = [t for t in timings if t is not None]
+    return latencies, len(timings) - len(latencies), wall
+
+
+def run_async(tool, warmup: list[dict], inputs: list[dict], concurrency: int, on_warm=None) -> tuple[list[float], int, float]:
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call(tool_input):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    await tool.ainvoke(tool_input)
+                except Exception:
+                    return None
+                return time.perf_counter() - start
+
+        # Warm up inside the same loop, since async session pools are per event loop
+        await asyncio.gather(*(call(tool_input) for tool_input in warmup))
+        if on_warm is not None:
+            on_warm()
+        start = time.perf_counter()
+        timings = await asyncio.gather(*(call(tool_input) for tool_input in inputs))
+        wall = time.perf_counter() - start
+        # The pool and its HTTP client belong to this loop, so shut them down before it closes
+        from langchain_anchorbrowser import AnchorClient
+        pool = AnchorClient().get_async_session_pool()
+        await pool.aclose()
+        await pool.client.close()
+        return timings, wall
+
+    timings, wall = asyncio.run(main())
+    latencies = [t for t in timings if t is not None]
+    return latencies, len(timings) - len(latencies), wall
+
+
+def run_raw_sdk(client, inputs: list[dict], concurrency: int) -> tuple[list[float], int, float]:
+    """Baseline: the bare SDK call without sessions, pooling or any of the tool layers"""
+    def call(tool_input):
+        start = time.perf_counter()
+        try:
+            client.tools.fetch_webpage(**tool_input)
+        except Exception:
+            return None
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        timings = list(executor.map(call, inputs))
+    wall = time.perf_counter() - start
+    latencies = [t for t in timings if t is not None]
+    return latencies, len(timings) - len(latencies), wall
+
+
+def run_scenario(server, tool_key: str, mode: str, pooled: bool, concurrency: int, args) -> dict:
+    import langchain_anchorbrowser
+    from langchain_anchorbrowser import AnchorClient
+
+    # idle_ttl=0 expires every session as soon as it is handed back, i.e. one session per call
+    pool_options = {"max_size": max(concurrency, 10)}
+    if not pooled:
+        pool_options["idle_ttl"] = 0
+    AnchorClient().configure_session_pool(**pool_options)
+    tool_class_name, make_input = TOOL_INPUTS[tool_key]
+    tool = getattr(langchain_anchorbrowser, tool_class_name)()
+
+    warmup = [make_input(f"warmup-{i}") for i in range(args.warmup if pooled else 0)]
+    inputs = [make_input(i) for i in range(args.requests)]
+    if mode == "sync":
+        run_sync(tool, warmup, concurrency)
+        server.reset_stats()
+        latencies, errors, wall = run_sync(tool, inputs, concurrency)
+    else:
+        latencies, errors, wall = run_async(tool, warmup, inputs, concurrency, on_warm=server.reset_stats)
+    return {
+        "tool": tool_key,
+        "mode": mode,
+        "pooled": pooled,
+        "concurrency": concurrency,
+        **summarize(latencies, errors, wall),
+        "rss_mb": rss_mb(),
+        "peak_rss_mb": peak_rss_mb(),
+        "server": server.stats(),
+    }
+
+
+def run_baseline(server, concurrency: int, args) -> dict:
+    from anchorbrowser import Anchorbrowser
+
+    client = Anchorbrowser(api_key="benchmark")
+    inputs = [TOOL_INPUTS["content"][1](i) for i in range(args.requests)]
+    server.reset_stats()
+    latencies, errors, wall = run_raw_sdk(client, inputs, concurrency)
+    client.close()
+    return {
+        "tool": "content",
+        "mode": "raw_sdk",
+        "pooled": None,
+        "concurrency": concurrency,
+        **summarize(latencies, errors, wall),
+        "rss_mb": rss_mb(),
+        "peak_rss_mb": peak_rss_mb(),
+        "server": server.stats(),
+    }
+
+
+def scenario_key(result: dict) -> tuple:
+    return result["tool"], result["mode"], result["pooled"], result["concurrency"]
+
+
+def compare(results: list[dict], baseline_path: str, threshold: float) -> list[str]:
+    """Describe scenarios whose p95 grew by more than threshold (a fraction) against an earlier run"""
+    with open(baseline_path) as f:
+        previous = {scenario_key(r): r for r in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get(scenario_key(result))
+        if not before or not before.get("p95_ms") or result["p95_ms"] is None:
+            continue
+        change = result["p95_ms"] / before["p95_ms"] - 1
+        if change > threshold:
+            regressions.append(
+                f"{scenario_key(result)}: p95 {before['p95_ms']:.1f}ms -> {result['p95_ms']:.1f}ms (+{change:.0%})"
+            )
+    return regressions
+
+
+def print_table(results: list[dict]) -> None:
+    header = f"{'tool':<20}{'mode':<9}{'pool':<7}{'conc':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'calls/s':>10}{'err':>5}{'sess':>6}{'rss MB':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        pooled = "-" if r["pooled"] is None else ("yes" if r["pooled"] else "no")
+        print(
+            f"{r['tool']:<20}{r['mode']:<9}{pooled:<7}{r['concurrency']:>5}"
+            f"{_fmt(r['p50_ms'])}{_fmt(r['p95_ms'])}{_fmt(r['p99_ms'])}{_fmt(r['throughput_per_second'])}"
+            f"{r['errors']:>5}{r['server']['sessions_created']:>6}{_fmt(r['rss_mb'], 8)}"
+        )
+
+
+def _fmt(value: float | None, width: int = 10) -> str:
+    return f"{'-':>{width}}" if value is None else f"{value:>{width}.1f}"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tools", default="content,screenshot,web_task,web_task_structured",
+                        help=f"Comma-separated subset of {', '.join(TOOL_INPUTS)}")
+    parser.add_argument("--modes", default="sync,async", help="Comma-separated subset of sync, async")
+    parser.add_argument("--pooling", default="pooled,unpooled", help="Comma-separated subset of pooled, unpooled")
+    parser.add_argument("--concurrency", default="1,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=40, help="Measured calls per scenario")
+    parser.add_argument("--warmup", type=int, default=8, help="Unmeasured calls before each pooled scenario")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake tool-call latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random tool-call latency in seconds")
+    parser.add_argument("--session-latency", type=float, default=0.2, help="Fake session creation latency")
+    parser.add_argument("--content-bytes", type=int, default=20_000)
+    parser.add_argument("--screenshot-bytes", type=int, default=200_000)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of tool calls answered with 503")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--no-baseline", action="store_true", help="Skip the raw SDK baseline")
+    parser.add_argument("--output", default="benchmark-results.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Earlier results file to check for p95 regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p95 growth for --compare")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    config = FakeServerConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        session_latency=args.session_latency,
+        content_bytes=args.content_bytes,
+        screenshot_bytes=args.screenshot_bytes,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+    concurrency_levels = [int(c) for c in args.concurrency.split(",")]
+
+    with FakeAnchorServer(config) as server:
+        os.environ["ANCHORBROWSER_BASE_URL"] = server.url
+        os.environ["ANCHORBROWSER_API_KEY"] = "benchmark"
+        results = []
+        if not args.no_baseline:
+            results.extend(run_baseline(server, c, args) for c in concurrency_levels)
+        for tool_key in args.tools.split(","):
+            for mode in args.modes.split(","):
+                for pooling in args.pooling.split(","):
+                    for concurrency in concurrency_levels:
+                        results.append(
+                            run_scenario(server, tool_key, mode, pooling == "pooled", concurrency, args)
+                        )
+        from langchain_anchorbrowser import AnchorClient
+        AnchorClient().close()
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "server_config": vars(config),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print_table(results)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
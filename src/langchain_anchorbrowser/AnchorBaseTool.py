@@ -1,63 +1,497 @@
-from pydantic import SecretStr, Field
+from pydantic import SecretStr
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from langchain_core.runnables.config import ensure_config
 import logging
-from anchorbrowser import Anchorbrowser
+from .AnchorSessionPool import AnchorSessionPool, AsyncAnchorSessionPool
+from .AnchorCache import AnchorCache, make_cache_key
+from .AnchorSingleFlight import SingleFlight, AsyncSingleFlight
+from .AnchorInstrumentation import AnchorHook, CallMetrics, metrics_sink, payload_size
+from .AnchorRateLimiter import RateLimit, RateLimiter
+from .AnchorTransport import TransportConfig, TransportStats, aprewarm, client_options, prewarm
+from .AnchorCancellation import (
+    CONFIG_CANCEL_KEY,
+    CONFIG_TIMEOUT_KEY,
+    CallCancelledError,
+    CancellationToken,
+    deadline_after,
+    time_left,
+)
+from .AnchorSession import CONFIG_SESSION_KEY, AnchorSession, current_session
+from .AnchorResilience import NO_RETRY, CircuitBreaker, RetryPolicy, acall_with_retry, call_with_retry
+from collections import OrderedDict
+from typing import Callable
+import asyncio
+import atexit
 import getpass
+import hashlib
 import time
 import os
+import sys
+import threading
+import weakref
+
+# Client functions that can safely be coalesced and retried because they have no side effects
+IDEMPOTENT_FUNCTIONS = {"fetch_webpage", "screenshot_webpage"}
+
+logger = logging.getLogger(__name__)
+
+
+def __getattr__(name):
+    # The SDK takes about a second to import, so it is only loaded once a client is created
+    if name in ("Anchorbrowser", "AsyncAnchorbrowser"):
+        import anchorbrowser
+        return getattr(anchorbrowser, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _sdk_class(name: str):
+    # Looked up through the module so tests can patch AnchorBaseTool.Anchorbrowser
+    return getattr(sys.modules[__name__], name)
+
+
+def key_fingerprint(api_key: str | SecretStr) -> str:
+    """Short stable identifier for an API key, safe to log and to use in cache keys"""
+    if isinstance(api_key, SecretStr):
+        api_key = api_key.get_secret_value()
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def _log_background_failure(task: asyncio.Task, description: str) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"{description} failed: {task.exception()}")
+
+
+class _TenantRegistry:
+    """Keyed AnchorClient instances with LRU and idle-time eviction"""
+
+    def __init__(self, max_clients: int | None = 256, idle_ttl: float | None = 900.0,
+                 setup: Callable[["AnchorClient"], None] | None = None):
+        self.max_clients = max_clients
+        self.idle_ttl = idle_ttl
+        self.setup = setup
+        self.clients: OrderedDict[str, AnchorClient] = OrderedDict()  # Least recently used first
+        self.last_used: dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def get(self, api_key: SecretStr) -> "AnchorClient":
+        fingerprint = key_fingerprint(api_key)
+        evicted = []
+        with self.lock:
+            client = self.clients.get(fingerprint)
+            if client is None:
+                evicted = self._pop_evictable(time.monotonic(), reserve=1)
+                client = AnchorClient._for_tenant(api_key, fingerprint)
+                self.clients[fingerprint] = client
+            else:
+                self.clients.move_to_end(fingerprint)
+            self.last_used[fingerprint] = time.monotonic()
+        for old in evicted:
+            old.shutdown()
+        if client._tenant_setup_pending:
+            # Callers of the same new tenant wait here, so none gets the client before setup finished
+            with client._setup_lock:
+                if client._tenant_setup_pending:
+                    if self.setup is not None:
+                        self.setup(client)
+                    client._tenant_setup_pending = False
+        return client
+
+    def evict_idle(self) -> int:
+        with self.lock:
+            evicted = self._pop_evictable(time.monotonic(), reserve=0)
+        for client in evicted:
+            client.shutdown()
+        return len(evicted)
+
+    def _pop_evictable(self, now: float, reserve: int) -> list["AnchorClient"]:
+        evicted = []
+        for fingerprint, client in list(self.clients.items()):
+            if client._is_busy():
+                continue
+            over_capacity = self.max_clients is not None and len(self.clients) + reserve > self.max_clients
+            idle = self.idle_ttl is not None and now - self.last_used[fingerprint] > self.idle_ttl
+            if not (over_capacity or idle):
+                continue
+            evicted.append(self.clients.pop(fingerprint))
+            del self.last_used[fingerprint]
+        return evicted
+
+    def close_all(self) -> None:
+        with self.lock:
+            clients, self.clients = list(self.clients.values()), OrderedDict()
+            self.last_used.clear()
+        for client in clients:
+            client.shutdown()
+
 
 class AnchorClient:
-    """Singleton class to ensure only one Anchor Browser client instance exists"""
+    """Shared Anchor Browser client state: one default instance, plus one per tenant API key
+
+    AnchorClient() returns the process-wide default client, whose key comes from
+    ANCHORBROWSER_API_KEY. AnchorClient(api_key) returns the registered client for that key, with its
+    own HTTP connections, session pools, rate limits and circuit breaker.
+    """
     _instance = None
     _client = None
     _api_key = None
+    _session_pool = None
+    _pool_options = {}
+    _async_session_pools = None
+    _single_flight = None
+    _async_single_flights = None
+    _lock = threading.Lock()
+    _hooks: tuple[AnchorHook, ...] = ()
+    _retry_policy = None
+    _circuit_breaker = None
+    _rate_limiter = None
+    _transport = None
+    _transport_stats = None
+    _prewarm_tasks = None
+    _tenant_fingerprint = None  # Set on per-key clients
+    _tenant_setup_pending = False
+    _setup_lock = None  # Per tenant; held while the registry's setup callback runs
+    _pool_lock = threading.RLock()  # Guards session pool creation; separate from _lock, which initialize() takes
+    _tenants = None
     
-    def __new__(cls):
+    def __new__(cls, api_key: str | SecretStr | None = None):
+        if api_key is not None:
+            return cls.for_api_key(api_key)
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
-    
+
+    @classmethod
+    def for_api_key(cls, api_key: str | SecretStr) -> "AnchorClient":
+        """Return the client registered for api_key, creating it (without any I/O) on first use"""
+        if not isinstance(api_key, SecretStr):
+            api_key = SecretStr(api_key)
+        return cls._tenant_registry().get(api_key)
+
+    @classmethod
+    def configure_tenants(cls, max_clients: int | None = 256, idle_ttl: float | None = 900.0,
+                          setup: Callable[["AnchorClient"], None] | None = None) -> None:
+        """Bound the per-key client registry; setup(client) runs once for every new tenant client
+
+        Clients idle for longer than idle_ttl seconds, or least recently used beyond max_clients,
+        are shut down, unless they have sessions leased.
+        """
+        registry = cls._tenant_registry()
+        with registry.lock:
+            registry.max_clients = max_clients
+            registry.idle_ttl = idle_ttl
+            registry.setup = setup
+
+    @classmethod
+    def evict_idle_tenants(cls) -> int:
+        """Shut down tenant clients that exceeded the registry limits; returns how many were evicted"""
+        return cls._tenant_registry().evict_idle()
+
+    @classmethod
+    def tenant_count(cls) -> int:
+        return len(cls._tenant_registry().clients)
+
+    @classmethod
+    def _tenant_registry(cls) -> _TenantRegistry:
+        with cls._lock:
+            if cls._tenants is None:
+                cls._tenants = _TenantRegistry()
+                atexit.register(cls._tenants.close_all)
+        return cls._tenants
+
+    @classmethod
+    def _for_tenant(cls, api_key: SecretStr, fingerprint: str) -> "AnchorClient":
+        client = super().__new__(cls)
+        client._api_key = api_key
+        client._tenant_fingerprint = fingerprint
+        client._tenant_setup_pending = True
+        client._lock = threading.Lock()
+        client._setup_lock = threading.Lock()
+        client._pool_lock = threading.RLock()
+        return client
+
+    @property
+    def tenant(self) -> str | None:
+        """Fingerprint of the tenant API key, or None for the default client"""
+        return self._tenant_fingerprint
+
     def initialize(self):
-        """Initialize API key and client only once"""
-        if self._api_key is None:
-            print(f"Checking for ANCHORBROWSER_API_KEY env var...")
-            env_api_key = os.getenv('ANCHORBROWSER_API_KEY')
-            
-            if env_api_key:
-                # Use environment variable directly
-                self._api_key = SecretStr(env_api_key)
-                print(f"Using API key from environment variable")
-            else:
-                # Fall back to prompt
-                self._api_key = SecretStr(getpass.getpass("Enter API key for Anchor Browser: "))
-                print(f"Using API key from prompt")
-            
-            self._client = Anchorbrowser(api_key=self._api_key.get_secret_value())
-            print(f"Created new API key and client instances")
+        """Initialize API key and client only once; tools call this lazily on their first API call"""
+        created = None
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    api_key = self._api_key or self._default_api_key()
+                    options = self._client_options()
+                    self._client = _sdk_class("Anchorbrowser")(api_key=api_key.get_secret_value(), **options)
+                    self._api_key = api_key
+                    created = options.get("http_client")
+                    logger.debug(f"Created Anchor Browser client (tenant={self.tenant})")
+        if created is not None and self._transport.prewarm_count:
+            # Outside the lock, so other threads are not held up by the handshakes
+            prewarm(created, str(self._client.base_url), self._transport.prewarm_count)
         return self._api_key, self._client
 
+    @staticmethod
+    def _default_api_key() -> SecretStr:
+        env_api_key = os.getenv('ANCHORBROWSER_API_KEY')
+        if env_api_key:
+            # Use environment variable directly
+            logger.debug("Using API key from ANCHORBROWSER_API_KEY")
+            return SecretStr(env_api_key)
+        # Fall back to prompt
+        logger.debug("Using API key from prompt")
+        return SecretStr(getpass.getpass("Enter API key for Anchor Browser: "))
+
+    def get_session_pool(self) -> AnchorSessionPool:
+        """Return the session pool shared by all tools, creating it on first use"""
+        pool = self._session_pool
+        if pool is None:
+            with self._pool_lock:
+                pool = self._session_pool
+                if pool is None:
+                    pool = self.configure_session_pool()
+        return pool
+
+    def configure_session_pool(self, **pool_options) -> AnchorSessionPool:
+        """Replace the shared session pools, e.g. configure_session_pool(min_size=2, max_size=20)"""
+        _, client = self.initialize()
+        with self._pool_lock:
+            self.close()
+            self._pool_options = pool_options
+            self._async_session_pools = None
+            self._session_pool = AnchorSessionPool(client, **self._with_resilience(pool_options))
+            atexit.unregister(self.close)
+            atexit.register(self.close)
+            self._session_pool.warm()
+            return self._session_pool
+
+    def get_async_session_pool(self) -> AsyncAnchorSessionPool:
+        """Return the async session pool for the running event loop, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        pools = self._async_session_pools
+        pool = pools.get(loop) if pools is not None else None
+        if pool is not None:
+            return pool
+        api_key, _ = self.initialize()
+        with self._pool_lock:
+            if self._async_session_pools is None:
+                # httpx async connections cannot be shared across event loops, so each loop gets its own client
+                self._async_session_pools = weakref.WeakKeyDictionary()
+            pool = self._async_session_pools.get(loop)
+            if pool is None:
+                options = self._client_options(asynchronous=True)
+                async_client = _sdk_class("AsyncAnchorbrowser")(api_key=api_key.get_secret_value(), **options)
+                pool = AsyncAnchorSessionPool(async_client, **self._with_resilience(self._pool_options))
+                self._async_session_pools[loop] = pool
+                if "http_client" in options and self._transport.prewarm_count:
+                    self._start_prewarm(options["http_client"], str(async_client.base_url))
+                if pool.min_size:
+                    # Filled up to min_size like the sync pool, but in the background of the running loop
+                    self._start_background(pool.warm(), "Warming the async session pool")
+        return pool
+
+    def configure_transport(self, config: TransportConfig | None = None, **options) -> TransportConfig:
+        """Set connection pooling, keep-alive, HTTP/2, timeouts and proxy for this client's HTTP traffic,
+        e.g. configure_transport(max_keepalive_connections=50, prewarm=8)
+
+        The SDK clients (and with them the session pools) are recreated with the new settings.
+        With prewarm, the sync client is created and its connections opened right away.
+        """
+        config = config or TransportConfig(**options)
+        if self._client is not None:
+            self.shutdown()
+            self._client = None
+        self._session_pool = None
+        self._async_session_pools = None
+        self._transport = config
+        self._transport_stats = TransportStats()
+        if config.prewarm_count:
+            self.initialize()
+        return config
+
+    def transport_stats(self) -> dict | None:
+        """Requests, new connections, TLS handshakes and reuse rate since configure_transport()
+
+        None when no transport is configured, since the SDK's own HTTP clients are not instrumented.
+        """
+        if self._transport_stats is None:
+            return None
+        return self._transport_stats.snapshot()
+
+    def _client_options(self, asynchronous: bool = False) -> dict:
+        # RetryPolicy is the only retry layer: SDK retries would re-send web tasks, multiply attempts,
+        # hide failures from the circuit breaker and outlive call deadlines
+        options = {"max_retries": 0}
+        if self._transport is not None:
+            options.update(client_options(self._transport, self._transport_stats, asynchronous))
+        return options
+
+    def _start_prewarm(self, http_client, url: str) -> None:
+        # get_async_session_pool() is synchronous, so the connections are opened in the background
+        self._start_background(aprewarm(http_client, url, self._transport.prewarm_count), "Prewarming connections")
+
+    def _start_background(self, coro, description: str) -> None:
+        if self._prewarm_tasks is None:
+            self._prewarm_tasks = set()
+        task = asyncio.ensure_future(coro)
+        self._prewarm_tasks.add(task)
+        task.add_done_callback(self._prewarm_tasks.discard)
+        task.add_done_callback(lambda done: _log_background_failure(done, description))
+
+    def get_single_flight(self) -> SingleFlight:
+        """Return the coalescing layer shared by all tools on the sync path"""
+        with self._lock:
+            if self._single_flight is None:
+                self._single_flight = SingleFlight()
+        return self._single_flight
+
+    def get_async_single_flight(self) -> AsyncSingleFlight:
+        """Return the coalescing layer for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._async_single_flights is None:
+            self._async_single_flights = weakref.WeakKeyDictionary()
+        single_flight = self._async_single_flights.get(loop)
+        if single_flight is None:
+            single_flight = self._async_single_flights[loop] = AsyncSingleFlight()
+        return single_flight
+
+    def get_retry_policy(self) -> RetryPolicy:
+        """Default retry policy for session creation and idempotent tool calls"""
+        if self._retry_policy is None:
+            self._retry_policy = RetryPolicy()
+        return self._retry_policy
+
+    def get_circuit_breaker(self) -> CircuitBreaker:
+        """Circuit breaker shared by every tool, tripped by repeated transient API failures"""
+        with self._lock:
+            if self._circuit_breaker is None:
+                self._circuit_breaker = CircuitBreaker()
+        return self._circuit_breaker
+
+    def configure_resilience(
+        self, retry_policy: RetryPolicy | None = None, circuit_breaker: CircuitBreaker | None = None
+    ) -> None:
+        """Replace the default retry policy and/or circuit breaker used by tools and session pools"""
+        if retry_policy is not None:
+            self._retry_policy = retry_policy
+        if circuit_breaker is not None:
+            self._circuit_breaker = circuit_breaker
+        for pool in self._all_pools():
+            pool.retry_policy = self.get_retry_policy()
+            pool.circuit_breaker = self.get_circuit_breaker()
+
+    def _with_resilience(self, pool_options: dict) -> dict:
+        return {
+            "retry_policy": self.get_retry_policy(),
+            "circuit_breaker": self.get_circuit_breaker(),
+            **pool_options,
+        }
+
+    def _all_pools(self) -> list:
+        pools = list((self._async_session_pools or {}).values())
+        if self._session_pool is not None:
+            pools.append(self._session_pool)
+        return pools
+
+    def get_rate_limiter(self) -> RateLimiter | None:
+        """Return the governor shared by all tools, or None when no limits are configured"""
+        return self._rate_limiter
+
+    def configure_rate_limits(
+        self, default: RateLimit | None = None, timeout: float | None = None, **limits: RateLimit
+    ) -> RateLimiter:
+        """Limit tool calls per client function, e.g. configure_rate_limits(perform_web_task=RateLimit(max_in_flight=5))"""
+        self._rate_limiter = RateLimiter(default, timeout=timeout, **limits)
+        return self._rate_limiter
+
+    @property
+    def hooks(self) -> tuple[AnchorHook, ...]:
+        if self._tenant_fingerprint is None:
+            return self._hooks
+        # Hooks added to the default client observe every tenant
+        return (*AnchorClient().hooks, *self._hooks)
+
+    def add_hook(self, hook: AnchorHook) -> None:
+        """Register an instrumentation hook that receives CallMetrics for every tool call"""
+        self._hooks = (*self._hooks, hook)
+
+    def remove_hook(self, hook: AnchorHook) -> None:
+        self._hooks = tuple(h for h in self._hooks if h is not hook)
+
+    def emit_metrics(self, metrics: CallMetrics) -> None:
+        for hook in self.hooks:
+            try:
+                hook.on_call_end(metrics)
+            except Exception as e:
+                logger.warning(f"Instrumentation hook {hook!r} failed: {e}")
+
+    def close(self) -> None:
+        """End all idle pooled sessions, both sync and async"""
+        if self._session_pool is not None:
+            self._session_pool.close()
+        for pool in list((self._async_session_pools or {}).values()):
+            # The owning event loop may be gone by now, so end its sessions through the sync client
+            for session in pool.detach_idle():
+                try:
+                    self._client.sessions.delete(session.id)
+                except Exception as e:
+                    logger.warning(f"Failed to end session {session.id}: {e}")
+
+    def shutdown(self) -> None:
+        """close(), then also release the HTTP connections; used when a tenant client is evicted"""
+        self.close()
+        atexit.unregister(self.close)
+        if self._client is not None:
+            self._client.close()
+
+    def _is_busy(self) -> bool:
+        return any(pool.leased_count or pool._creating for pool in self._all_pools())
+
 # Base configuration for all tools
 class AnchorBaseTool:
-    api_key: SecretStr = Field(default=SecretStr(""), description="API key for Anchor Browser")
-    logger: logging.Logger = Field(default=logging.getLogger(__name__), description="Logger instance")
-    client: Anchorbrowser | None = Field(default=None, description="Anchor Browser client instance")
+    logger: logging.Logger = logger  # Logger instance
+    cache: AnchorCache | None = None  # Optional response cache; hits skip session creation
+    coalesce_requests: bool = True  # Share one remote call between concurrent identical fetch/screenshot calls
+    retry_policy: RetryPolicy | None = None  # Defaults to the client's get_retry_policy()
+    retry_web_tasks: bool = False  # perform_web_task has side effects, so retrying it is opt-in
+    timeout: float | None = None  # Hard deadline per call in seconds, covering queueing, retries and the request
+    tenant_api_key: SecretStr | None = None  # Set from the api_key argument; None uses the default client
     client_function_name: str = None  # Will be overridden by subclasses
 
-    def __init__(self, api_key: str | SecretStr | None = None):
-        super().__init__()
-        print(f"Creating {self.__class__.__name__}")
-        self.logger = logging.getLogger(__name__)
-        # Get shared API key and client instances
-        self.api_key, self.client = AnchorClient().initialize()
-        print("Using shared API key and client instances")
+    def __init__(self, api_key: str | SecretStr | None = None, **kwargs):
+        # Construction does no I/O; the shared client and session pool are created on the first call
+        super().__init__(**kwargs)
+        if api_key is not None:
+            self.tenant_api_key = api_key if isinstance(api_key, SecretStr) else SecretStr(api_key)
 
-    def _run(self, **kwargs) -> str:
-        """Generic run method that calls the appropriate client function"""
-        start_time = time.time()
-        
+    @property
+    def anchor_client(self) -> AnchorClient:
+        """The AnchorClient for this tool's API key, or the default one"""
+        if self.tenant_api_key is None:
+            return AnchorClient()
+        return AnchorClient.for_api_key(self.tenant_api_key)
+
+    @property
+    def api_key(self) -> SecretStr:
+        return self.anchor_client.initialize()[0]
+
+    @property
+    def client(self):
+        """Shared Anchorbrowser client, created on first access"""
+        return self.anchor_client.initialize()[1]
+
+    @property
+    def session_pool(self) -> AnchorSessionPool:
+        """Shared pool of warm browser sessions, created on first access"""
+        return self.anchor_client.get_session_pool()
+
+    def _build_request_body(self, kwargs: dict, pinned: AnchorSession | None = None) -> tuple[str, dict]:
+        """Resolve the client function name and the request body for a tool call"""
         # Filter out None values
         request_body = {k: v for k, v in kwargs.items() if v is not None}
 
-        if self.client_function_name == "perform_web_task" and "url" not in request_body:
+        # On a pinned session a web task without a url continues on the page that is already open
+        if self.client_function_name == "perform_web_task" and "url" not in request_body and pinned is None:
             request_body["url"] = "https://example.com"
             request_body["prompt"] += ". Ignore the starting url."
 
@@ -65,24 +499,340 @@ class AnchorBaseTool:
         function_name = self.client_function_name
         if not function_name:
             raise ValueError(f"client_function_name not set for {self.__class__.__name__}")
-        
-        # Create a new session
-        session = self.client.sessions.create()
-        live_view_url = session.data.live_view_url
-        self.logger.info(f"Session Information: {session.data}")
-        print(f"Live view URL: {live_view_url}")
-        request_body["session_id"] = session.data.id
-
-        # Get the function from the client
-        client_func = getattr(self.client.tools, function_name)  
-        self.logger.info(f"Calling {function_name} for: {kwargs.get('url', '')}")
-        result = client_func(**request_body)
-        
-        execution_time = time.time() - start_time
-        self.logger.info(f"{function_name} completed in {execution_time:.2f}s")
-        if function_name == "screenshot_webpage":
-            return result.text()
-        elif function_name == "perform_web_task":
+        return function_name, request_body
+
+    def _invoke_client(self, client, function_name: str, request_body: dict):
+        """Call the client function; tools override this to change how the response is transferred"""
+        return getattr(client.tools, function_name)(**request_body)
+
+    async def _ainvoke_client(self, client, function_name: str, request_body: dict):
+        return await getattr(client.tools, function_name)(**request_body)
+
+    def _format_result(self, function_name: str, result):
+        if function_name == "perform_web_task":
             return result.data
-        else:
+        return result
+
+    def _cache_get(self, cache_key: str | None):
+        if cache_key is None:
+            return None
+        try:
+            return self.cache.get(cache_key)
+        except Exception as e:
+            # A cache backend that is down (or an unreadable entry) is a miss, never a failed call
+            self.logger.warning(f"Cache lookup for {self.name} failed, calling the API: {e}")
+            self.cache.record_error("get")
+            return None
+
+    def _cache_set(self, cache_key: str | None, result) -> None:
+        if cache_key is None or result is None:
+            return
+        try:
+            self.cache.set(cache_key, result)
+        except (TypeError, ValueError) as e:
+            self.logger.debug(f"Not caching {self.name} result: {e}")
+        except Exception as e:
+            self.logger.warning(f"Caching {self.name} result failed: {e}")
+            self.cache.record_error("set")
+
+    def _cache_key(self, function_name: str, request_body: dict) -> str | None:
+        if self.cache is None:
+            return None
+        return make_cache_key(self._key_namespace(), request_body)
+
+    def _key_namespace(self) -> str:
+        # Caches and stores may be shared between tenants' tools, so their entries are kept apart
+        return self.name if self.tenant_api_key is None else f"{self.name}@{key_fingerprint(self.tenant_api_key)}"
+
+    def _coalesce_key(self, function_name: str, request_body: dict) -> str | None:
+        """Key under which concurrent identical calls share one remote call, or None to not coalesce"""
+        if not self.coalesce_requests or function_name not in IDEMPOTENT_FUNCTIONS:
+            return None
+        return make_cache_key(function_name, request_body)
+
+    def _start_metrics(self, function_name: str, request_body: dict) -> CallMetrics | None:
+        """Create the metrics record for a call, or None when no hooks are registered and nothing captures it"""
+        if not self.anchor_client.hooks and metrics_sink() is None:
+            return None
+        return CallMetrics(
+            tool_name=getattr(self, "name", self.__class__.__name__),
+            function_name=function_name,
+            url=request_body.get("url"),
+        )
+
+    def _finish_metrics(self, metrics: CallMetrics | None, start: float, error: BaseException | None) -> None:
+        if metrics is None:
+            return
+        metrics.total_seconds = time.monotonic() - start
+        if error is not None:
+            metrics.error_class = type(error).__name__
+        sink = metrics_sink()
+        if sink is not None:
+            sink.append(metrics)
+        self.anchor_client.emit_metrics(metrics)
+
+    def _record_phases(self, metrics: CallMetrics | None, session, acquire_start: float,
+                       call_start: float, decode_start: float, result) -> None:
+        if metrics is None:
+            return
+        metrics.session_id = session.id
+        metrics.session_created = session.created_at >= acquire_start
+        metrics.session_acquire_seconds = call_start - acquire_start
+        metrics.tool_call_seconds = decode_start - call_start
+        metrics.decode_seconds = time.monotonic() - decode_start
+        metrics.payload_bytes = payload_size(result)
+
+    def _record_coalesced(self, metrics: CallMetrics | None, ran: list, result) -> None:
+        # A caller whose call function never ran got the result of another caller's call
+        if metrics is not None and not ran:
+            metrics.coalesced = True
+            metrics.payload_bytes = payload_size(result)
+
+    def _record_queue_wait(self, metrics: CallMetrics | None, queue_wait: float) -> None:
+        if metrics is not None:
+            # Summed over retries, each of which queues again
+            metrics.queue_wait_seconds = (metrics.queue_wait_seconds or 0.0) + queue_wait
+
+    def _rate_limit(self, function_name: str, deadline: float | None = None):
+        rate_limiter = self.anchor_client.get_rate_limiter()
+        return rate_limiter.limit(function_name, deadline) if rate_limiter is not None else nullcontext(0.0)
+
+    def _arate_limit(self, function_name: str):
+        rate_limiter = self.anchor_client.get_rate_limiter()
+        return rate_limiter.alimit(function_name) if rate_limiter is not None else nullcontext(0.0)
+
+    def _pinned_session(self) -> AnchorSession | None:
+        """Session this call is pinned to, from the run config or an enclosing AnchorSession block"""
+        session_id = ensure_config().get("configurable", {}).get(CONFIG_SESSION_KEY)
+        if session_id:
+            return AnchorSession(api_key=self.tenant_api_key, session_id=session_id)
+        pinned = current_session()
+        if pinned is not None and pinned.pins(self.anchor_client):
+            return pinned
+        return None
+
+    def _call_limits(self) -> tuple[float | None, CancellationToken | None]:
+        """Deadline and cancellation token for this call; a timeout in the run config overrides the tool's"""
+        configurable = ensure_config().get("configurable", {})
+        timeout = configurable.get(CONFIG_TIMEOUT_KEY, self.timeout)
+        return deadline_after(timeout), configurable.get(CONFIG_CANCEL_KEY)
+
+    @contextmanager
+    def _lease(self, session_pool: AnchorSessionPool, pinned: AnchorSession | None, deadline: float | None = None):
+        if pinned is None:
+            with session_pool.lease(timeout=time_left(deadline), deadline=deadline) as session:
+                yield session
+            return
+        # A pinned session is never discarded on failure; its owner ends it
+        remaining = time_left(deadline)
+        if not pinned.lock.acquire(timeout=-1 if remaining is None else remaining):
+            raise TimeoutError(f"Timed out waiting for pinned session {pinned.id}")
+        try:
+            yield pinned.session
+        finally:
+            pinned.lock.release()
+
+    @asynccontextmanager
+    async def _alease(self, session_pool: AsyncAnchorSessionPool, pinned: AnchorSession | None):
+        if pinned is None:
+            async with session_pool.lease() as session:
+                yield session
+            return
+        async with pinned.alock:
+            yield pinned.session
+
+    def _request_body_for(self, request_body: dict, session, deadline: float | None) -> dict:
+        """Request body for a call on session; the SDK request gets whatever time the deadline leaves"""
+        body = {**request_body, "session_id": session.id}
+        if deadline is not None:
+            body["timeout"] = time_left(deadline)
+        return body
+
+    def _call_remote(self, function_name: str, request_body: dict, metrics: CallMetrics | None = None,
+                     pinned: AnchorSession | None = None):
+        """Run the client function on a leased (or pinned) session and return the formatted result"""
+        # The deadline starts before the first call creates the client, which imports the SDK
+        deadline, cancel_token = self._call_limits()
+        session_pool = self.session_pool
+        breaker = self.anchor_client.get_circuit_breaker()
+
+        def attempt():
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            # Queue on the rate limiter before leasing, so waiting calls don't hold sessions
+            with self._rate_limit(function_name, deadline) as queue_wait:
+                self._record_queue_wait(metrics, queue_wait)
+                return leased_call()
+
+        def leased_call():
+            # Lease a warm session from the shared pool; it is handed back once the call returns
+            acquire_start = time.monotonic()
+            with self._lease(session_pool, pinned, deadline) as session:
+                call_start = time.monotonic()
+                self.logger.debug(f"Calling {function_name} on session {session.id} (live view: {session.live_view_url})")
+                body = self._request_body_for(request_body, session, deadline)
+                with self._ending_on_cancel(cancel_token, session_pool, session if pinned is None else None):
+                    result = breaker.call(lambda: self._invoke_client(session_pool.client, function_name, body))
+                decode_start = time.monotonic()
+                result = self._format_result(function_name, result)
+            self._record_phases(metrics, session, acquire_start, call_start, decode_start, result)
+            return result
+
+        # A failed attempt discards its session, so a retry runs on a fresh one
+        try:
+            return call_with_retry(attempt, self._retry_policy_for(function_name), deadline)
+        except Exception as e:
+            # Whichever layer noticed it, a call cut short by its deadline raises TimeoutError, as on the async path
+            if deadline is not None and time.monotonic() >= deadline and not isinstance(e, TimeoutError):
+                raise TimeoutError("Anchor Browser call exceeded its deadline") from e
+            raise
+
+    @contextmanager
+    def _ending_on_cancel(self, cancel_token: CancellationToken | None, session_pool: AnchorSessionPool, session):
+        """End the session if the token is cancelled mid-call, so the blocked request fails fast"""
+        if cancel_token is None:
+            yield
+            return
+        unregister = cancel_token.on_cancel(lambda: session_pool._end_session(session)) if session else None
+        try:
+            yield
+        except Exception as e:
+            if cancel_token.cancelled:
+                raise CallCancelledError("Anchor Browser call was cancelled") from e
+            raise
+        finally:
+            if unregister is not None:
+                unregister()
+
+    async def _acall_remote(self, function_name: str, request_body: dict, metrics: CallMetrics | None = None,
+                            pinned: AnchorSession | None = None):
+        """Async counterpart of _call_remote, using the async client and pool of the running loop"""
+        deadline, _ = self._call_limits()
+        session_pool = self.anchor_client.get_async_session_pool()
+        breaker = self.anchor_client.get_circuit_breaker()
+
+        async def attempt():
+            async with self._arate_limit(function_name) as queue_wait:
+                self._record_queue_wait(metrics, queue_wait)
+                return await leased_call()
+
+        async def leased_call():
+            acquire_start = time.monotonic()
+            async with self._alease(session_pool, pinned) as session:
+                call_start = time.monotonic()
+                self.logger.debug(f"Calling {function_name} on session {session.id} (live view: {session.live_view_url})")
+                body = self._request_body_for(request_body, session, deadline)
+                result = await breaker.acall(lambda: self._ainvoke_client(session_pool.client, function_name, body))
+                decode_start = time.monotonic()
+                result = self._format_result(function_name, result)
+            self._record_phases(metrics, session, acquire_start, call_start, decode_start, result)
+            return result
+
+        call = acall_with_retry(attempt, self._retry_policy_for(function_name), deadline)
+        if deadline is None:
+            return await call
+        # Cancelling on the deadline unwinds the lease, which ends the session
+        try:
+            return await asyncio.wait_for(call, time_left(deadline))
+        except asyncio.TimeoutError:
+            raise TimeoutError("Anchor Browser call exceeded its deadline") from None
+
+    def _retry_policy_for(self, function_name: str) -> RetryPolicy:
+        """Retry policy for a tool call; web tasks may have side effects and are only retried on request"""
+        if function_name not in IDEMPOTENT_FUNCTIONS and not self.retry_web_tasks:
+            return NO_RETRY
+        return self.retry_policy or self.anchor_client.get_retry_policy()
+
+    def _run(self, **kwargs) -> str:
+        """Generic run method that calls the appropriate client function"""
+        start = time.monotonic()
+        pinned = self._pinned_session()
+        function_name, request_body = self._build_request_body(kwargs, pinned)
+        metrics = self._start_metrics(function_name, request_body)
+        error = None
+        try:
+            if pinned is not None:
+                # The result depends on the browser's state, so neither cached nor shared
+                return self._call_remote(function_name, request_body, metrics, pinned)
+
+            cache_key = self._cache_key(function_name, request_body)
+            result = self._cache_get(cache_key)
+            if result is not None:
+                if metrics is not None:
+                    metrics.cache_hit = True
+                return result
+
+            coalesce_key = self._coalesce_key(function_name, request_body)
+            if coalesce_key is None:
+                result = self._call_remote(function_name, request_body, metrics)
+            else:
+                deadline, cancel_token = self._call_limits()
+                ran = []
+
+                def call():
+                    ran.append(True)
+                    return self._call_remote(function_name, request_body, metrics)
+
+                result = self.anchor_client.get_single_flight().do(coalesce_key, call, deadline, cancel_token)
+                self._record_coalesced(metrics, ran, result)
+            self._cache_set(cache_key, result)
+            return result
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._finish_metrics(metrics, start, error)
+
+    async def _arun(self, **kwargs) -> str:
+        """Async counterpart of _run"""
+        start = time.monotonic()
+        pinned = self._pinned_session()
+        function_name, request_body = self._build_request_body(kwargs, pinned)
+        metrics = self._start_metrics(function_name, request_body)
+        error = None
+        try:
+            if pinned is not None:
+                # The result depends on the browser's state, so neither cached nor shared
+                return await self._acall_remote(function_name, request_body, metrics, pinned)
+
+            cache_key = self._cache_key(function_name, request_body)
+            result = self._cache_get(cache_key)
+            if result is not None:
+                if metrics is not None:
+                    metrics.cache_hit = True
+                return result
+
+            coalesce_key = self._coalesce_key(function_name, request_body)
+            if coalesce_key is None:
+                result = await self._acall_remote(function_name, request_body, metrics)
+            else:
+                deadline, _ = self._call_limits()
+                ran = []
+
+                def call():
+                    ran.append(True)
+                    return self._acall_remote(function_name, request_body, metrics)
+
+                result = await self.anchor_client.get_async_single_flight().do(coalesce_key, call, deadline)
+                self._record_coalesced(metrics, ran, result)
+            self._cache_set(cache_key, result)
             return result
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._finish_metrics(metrics, start, error)
+
+    def batch_urls(self, urls: list[str], max_concurrency: int = 5, **params) -> list:
+        """Run the tool for many URLs concurrently, e.g. content_tool.batch_urls(urls, format="html")
+
+        Results keep the input order; an item that failed holds its exception instead of a result.
+        Calls lease sessions from the shared pool, so the pool's max_size also bounds concurrency.
+        """
+        inputs = [{"url": url, **params} for url in urls]
+        return self.batch(inputs, config={"max_concurrency": max_concurrency}, return_exceptions=True)
+
+    async def abatch_urls(self, urls: list[str], max_concurrency: int = 5, **params) -> list:
+        """Async counterpart of batch_urls, running every call on the current event loop"""
+        inputs = [{"url": url, **params} for url in urls]
+        return await self.abatch(inputs, config={"max_concurrency": max_concurrency}, return_exceptions=True)
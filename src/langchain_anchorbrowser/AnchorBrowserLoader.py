@@ -0,0 +1,105 @@
+from .AnchorContentTool import AnchorContentTool
+from .AnchorInstrumentation import capture_metrics
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+from pydantic import SecretStr
+from typing import AsyncIterator, Iterable, Iterator, Literal
+import asyncio
+import contextvars
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class AnchorBrowserLoader(BaseLoader):
+    """Loads web pages through Anchor Browser as Documents, e.g. for RAG ingestion
+
+    URLs are read lazily and at most max_concurrency pages are in flight, so memory is bounded
+    by that window rather than by the number of URLs. Documents are yielded as their fetch
+    completes, so not in input order. Each carries the url (also as source), format, fetch
+    latency, session id and whether it came from the cache. A tool with a chunking pipeline
+    yields one Document per chunk, with its chunk index.
+    """
+
+    def __init__(self, urls: Iterable[str], format: Literal["markdown", "html"] = "markdown",
+                 max_concurrency: int = 5, api_key: str | SecretStr | None = None,
+                 tool: AnchorContentTool | None = None, continue_on_failure: bool = True):
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        self.urls = urls
+        self.format = format
+        self.max_concurrency = max_concurrency
+        # Cache, pipeline and change tracking come from the tool's settings
+        self.tool = tool if tool is not None else AnchorContentTool(api_key=api_key)
+        self.continue_on_failure = continue_on_failure
+
+    def lazy_load(self) -> Iterator[Document]:
+        urls = iter(self.urls)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            in_flight = {}
+            while True:
+                for url in urls:
+                    in_flight[executor.submit(contextvars.copy_context().run, self._fetch, url)] = url
+                    if len(in_flight) >= self.max_concurrency:
+                        break
+                if not in_flight:
+                    return
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from self._documents(in_flight.pop(future), future)
+
+    async def alazy_load(self) -> AsyncIterator[Document]:
+        urls = iter(self.urls)
+        in_flight = {}
+        try:
+            while True:
+                for url in urls:
+                    in_flight[asyncio.ensure_future(self._afetch(url))] = url
+                    if len(in_flight) >= self.max_concurrency:
+                        break
+                if not in_flight:
+                    return
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    for document in self._documents(in_flight.pop(task), task):
+                        yield document
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    def _fetch(self, url: str) -> tuple:
+        with capture_metrics() as captured:
+            start = time.monotonic()
+            content = self.tool.invoke({"url": url, "format": self.format})
+            return content, time.monotonic() - start, captured[-1] if captured else None
+
+    async def _afetch(self, url: str) -> tuple:
+        with capture_metrics() as captured:
+            start = time.monotonic()
+            content = await self.tool.ainvoke({"url": url, "format": self.format})
+            return content, time.monotonic() - start, captured[-1] if captured else None
+
+    def _documents(self, url: str, future) -> list[Document]:
+        error = future.exception()
+        if error is not None:
+            if not self.continue_on_failure:
+                raise error
+            logger.warning(f"Failed to load {url}: {error}")
+            return []
+        content, seconds, metrics = future.result()
+        metadata = {
+            "source": url,
+            "url": url,
+            "format": self.format,
+            "fetch_seconds": seconds,
+            "session_id": metrics.session_id if metrics is not None else None,
+            "cache_hit": metrics.cache_hit if metrics is not None else False,
+        }
+        if isinstance(content, str):
+            return [Document(page_content=content, metadata=metadata)]
+        return [
+            Document(page_content=chunk, metadata={**metadata, "chunk": index})
+            for index, chunk in enumerate(content)
+        ]
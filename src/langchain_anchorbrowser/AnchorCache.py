@@ -0,0 +1,180 @@
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+# Request fields that identify where a call ran rather than what it asked for
+NON_CACHE_KEY_FIELDS = {"session_id"}
+
+
+def normalize_url(url: str) -> str:
+    """Lowercase scheme and host and drop the fragment, which never reaches the server"""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, ""))
+
+
+def make_cache_key(tool_name: str, request_body: dict) -> str:
+    """Content-addressed key for a tool call: the tool name plus its normalized request body"""
+    body = {k: v for k, v in request_body.items() if k not in NON_CACHE_KEY_FIELDS}
+    if isinstance(body.get("url"), str):
+        body["url"] = normalize_url(body["url"])
+    payload = json.dumps([tool_name, body], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnchorCache:
+    """Base class for tool response caches; values must be JSON serializable"""
+
+    def __init__(self, ttl: float | None = 300.0):
+        self.ttl = ttl
+        self._errors = {"get_errors": 0, "set_errors": 0}
+        self._errors_lock = threading.Lock()
+
+    def get(self, key: str):
+        """Return the cached value, or None on a miss"""
+        raise NotImplementedError
+
+    def set(self, key: str, value) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def record_error(self, operation: str) -> None:
+        """Count a failed get or set; tools treat it as a miss or a skipped store and carry on"""
+        with self._errors_lock:
+            self._errors[f"{operation}_errors"] += 1
+
+    def stats(self) -> dict:
+        with self._errors_lock:
+            return dict(self._errors)
+
+    def _expires_at(self) -> float | None:
+        return None if self.ttl is None else time.time() + self.ttl
+
+
+class InMemoryCache(AnchorCache):
+    """Thread-safe in-process LRU cache"""
+
+    def __init__(self, max_size: int = 1024, ttl: float | None = 300.0):
+        super().__init__(ttl)
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float | None, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._entries[key] = (self._expires_at(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(AnchorCache):
+    """On-disk LRU cache that survives restarts and can be shared between processes"""
+
+    def __init__(self, path: str = "anchor_cache.sqlite3", max_size: int = 10000, ttl: float | None = 3600.0):
+        super().__init__(ttl)
+        self.path = path
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS anchor_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, last_access REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS anchor_cache_last_access ON anchor_cache (last_access)"
+        )
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM anchor_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._connection.execute("DELETE FROM anchor_cache WHERE key = ?", (key,))
+                return None
+            self._connection.execute("UPDATE anchor_cache SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO anchor_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), self._expires_at(), time.time()),
+            )
+            # Evict the least recently used entries beyond max_size
+            self._connection.execute(
+                "DELETE FROM anchor_cache WHERE key IN ("
+                "SELECT key FROM anchor_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM anchor_cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM anchor_cache")
+
+
+class RedisCache(AnchorCache):
+    """Cache backed by any Redis-compatible client (redis-py, valkey, fakeredis, ...)
+
+    Expiry uses Redis TTLs; size-bounded LRU eviction is left to the server's
+    maxmemory-policy (e.g. allkeys-lru), so there is no max_size here.
+    """
+
+    def __init__(self, client, ttl: float | None = 300.0, prefix: str = "anchor:cache:"):
+        super().__init__(ttl)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str):
+        value = self.client.get(self.prefix + key)
+        return None if value is None else json.loads(value)
+
+    def set(self, key: str, value) -> None:
+        ttl = None if self.ttl is None else max(1, int(self.ttl))
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
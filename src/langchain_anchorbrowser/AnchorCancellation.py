@@ -0,0 +1,72 @@
+from typing import Callable
+import threading
+import time
+
+# LangChain run config keys for a per-call deadline (seconds) and a CancellationToken
+CONFIG_TIMEOUT_KEY = "anchor_timeout"
+CONFIG_CANCEL_KEY = "anchor_cancel_token"
+
+
+class CallCancelledError(RuntimeError):
+    """Raised by a tool call whose CancellationToken was cancelled"""
+
+
+class CancellationToken:
+    """Cooperative cancellation for sync tool calls; cancel() may be called from any thread
+
+    Pass it per call through the run config, e.g.
+    tool.invoke(args, config={"configurable": {"anchor_cancel_token": token}}). A call that is
+    waiting stops at its next checkpoint; a call that is running has its browser session ended,
+    which makes the in-flight request fail fast. Async calls are cancelled with Task.cancel().
+    """
+
+    def __init__(self):
+        self._cancelled = False
+        self._callbacks: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def raise_if_cancelled(self) -> None:
+        if self._cancelled:
+            raise CallCancelledError("Anchor Browser call was cancelled")
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run callback once cancel() is called (right away if it already was); returns an unregister function"""
+        with self._lock:
+            if not self._cancelled:
+                self._callbacks.append(callback)
+                return lambda: self._unregister(callback)
+        callback()
+        return lambda: None
+
+    def _unregister(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+def deadline_after(timeout: float | None) -> float | None:
+    """Monotonic deadline timeout seconds from now; None means no deadline"""
+    return None if timeout is None else time.monotonic() + timeout
+
+
+def time_left(deadline: float | None) -> float | None:
+    """Seconds until the deadline; raises TimeoutError once it has passed"""
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("Anchor Browser call exceeded its deadline")
+    return remaining
@@ -0,0 +1,327 @@
+"""Post-processing for fetched pages, so less of them ends up in the LLM's context
+
+A pipeline is a chain of stages. Each stage takes an iterator of text pieces and lazily yields
+new pieces, so a budget stage at the end stops the upstream stages from doing more work than
+the output needs. HtmlToText yields a text block per paragraph as it parses; the block stages
+(DedupeBlocks, TruncateTokens, ChunkTokens) treat blank lines as block breaks.
+"""
+from html.parser import HTMLParser
+from typing import Callable, Iterable, Iterator
+import asyncio
+import re
+
+Stage = Callable[[Iterable[str]], Iterable[str]]
+
+# Elements that hold navigation, chrome or code rather than page content
+BOILERPLATE_TAGS = frozenset({
+    "nav", "header", "footer", "aside", "script", "style", "noscript", "template", "form", "iframe", "svg",
+})
+# Elements that never contain anything; they have no end tag to wait for
+VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr",
+})
+BLOCK_TAGS = frozenset({
+    "address", "article", "blockquote", "br", "dd", "div", "dl", "dt", "figcaption", "figure", "h1", "h2",
+    "h3", "h4", "h5", "h6", "hr", "li", "main", "ol", "p", "pre", "section", "table", "td", "th", "tr", "ul",
+})
+_INVISIBLE_TAGS = frozenset({"script", "style", "noscript", "template"})
+_BLOCK_BREAK = re.compile(r"\n\s*\n")
+_MARKDOWN_LINK = re.compile(r"!?\[[^\]]*\]\([^)]*\)")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token); pass count_tokens for an exact tokenizer"""
+    return (len(text) + 3) // 4
+
+
+def _blocks(pieces: Iterable[str]) -> Iterator[str]:
+    for piece in pieces:
+        for block in _BLOCK_BREAK.split(piece):
+            block = block.strip()
+            if block:
+                yield block
+
+
+def _is_html(pieces: Iterator[str]) -> tuple[bool, Iterator[str]]:
+    """Peek at the first non-blank piece; returns whether it looks like HTML and the unconsumed stream"""
+    seen = []
+    for piece in pieces:
+        seen.append(piece)
+        if piece.strip():
+            return piece.lstrip().startswith("<"), _chain(seen, pieces)
+    return False, iter(seen)
+
+
+def _chain(head: list[str], tail: Iterator[str]) -> Iterator[str]:
+    yield from head
+    yield from tail
+
+
+class _BoilerplateFilter(HTMLParser):
+    """Re-serializes HTML without the subtrees of the given tags"""
+
+    def __init__(self, tags: frozenset):
+        super().__init__(convert_charrefs=False)
+        self.tags = tags
+        self.out: list[str] = []
+        self._skipping: str | None = None
+        self._depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._skipping is not None:
+            # Only the skipped tag is counted, so unclosed <p> or <li> inside it can't derail the filter
+            self._depth += tag == self._skipping
+        elif tag in self.tags and tag not in VOID_TAGS:
+            self._skipping, self._depth = tag, 1
+        elif tag not in self.tags:
+            self.out.append(self.get_starttag_text())
+
+    def handle_startendtag(self, tag, attrs):
+        if self._skipping is None and tag not in self.tags:
+            self.out.append(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        if self._skipping is None:
+            self.out.append(f"</{tag}>")
+        elif tag == self._skipping:
+            self._depth -= 1
+            if self._depth == 0:
+                self._skipping = None
+
+    def handle_data(self, data):
+        if self._skipping is None:
+            self.out.append(data)
+
+    def handle_entityref(self, name):
+        self.handle_data(f"&{name};")
+
+    def handle_charref(self, name):
+        self.handle_data(f"&#{name};")
+
+    def handle_decl(self, decl):
+        self.handle_data(f"<!{decl}>")
+
+    def drain(self) -> str:
+        return "".join(self.out)
+
+
+class _TextExtractor(HTMLParser):
+    """Turns HTML into one text block per block-level element"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks: list[str] = []
+        self._text: list[str] = []
+        self._prefix = ""
+        self._invisible = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _INVISIBLE_TAGS:
+            self._invisible += 1
+        elif tag in BLOCK_TAGS:
+            self._flush()
+            self._prefix = "- " if tag == "li" else ""
+
+    def handle_endtag(self, tag):
+        if tag in _INVISIBLE_TAGS:
+            self._invisible = max(self._invisible - 1, 0)
+        elif tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if not self._invisible:
+            self._text.append(data)
+
+    def _flush(self):
+        text = " ".join("".join(self._text).split())
+        if text:
+            self.blocks.append(self._prefix + text)
+        self._text = []
+        self._prefix = ""
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    def drain(self) -> list[str]:
+        blocks, self.blocks = self.blocks, []
+        return blocks
+
+
+class StripBoilerplate:
+    """Drops navigation and page chrome
+
+    HTML loses the subtrees of BOILERPLATE_TAGS (and comments). Markdown loses blocks made up
+    mostly of links, which is what menus, breadcrumbs and footers turn into.
+    """
+
+    def __init__(self, tags: Iterable[str] = BOILERPLATE_TAGS, max_link_density: float = 0.6):
+        self.tags = frozenset(tags)
+        self.max_link_density = max_link_density
+
+    def __call__(self, pieces: Iterable[str]) -> Iterator[str]:
+        is_html, pieces = _is_html(iter(pieces))
+        if is_html:
+            yield from self._strip_html(pieces)
+        else:
+            yield from (block for block in _blocks(pieces) if not self._is_link_block(block))
+
+    def _strip_html(self, pieces: Iterator[str]) -> Iterator[str]:
+        # Yielded as one piece: the pipeline joins pieces with blank lines, which would split markup
+        parser = _BoilerplateFilter(self.tags)
+        for piece in pieces:
+            parser.feed(piece)
+        parser.close()
+        yield parser.drain()
+
+    def _is_link_block(self, block: str) -> bool:
+        link_chars = sum(len(match) for match in _MARKDOWN_LINK.findall(block))
+        return link_chars / len(block) >= self.max_link_density
+
+
+class HtmlToText:
+    """Converts HTML to plain text, one block per paragraph, heading, list item or cell"""
+
+    def __call__(self, pieces: Iterable[str]) -> Iterator[str]:
+        parser = _TextExtractor()
+        for piece in pieces:
+            parser.feed(piece)
+            yield from parser.drain()
+        parser.close()
+        yield from parser.drain()
+
+
+class SelectCss:
+    """Keeps only the HTML of elements matching a CSS selector (needs beautifulsoup4)
+
+    Selectors need the whole document, so this stage buffers its input.
+    """
+
+    def __init__(self, selector: str):
+        try:
+            from bs4 import BeautifulSoup
+        except ImportError as e:
+            raise ImportError("SelectCss requires beautifulsoup4: pip install beautifulsoup4") from e
+        self.selector = selector
+        self._soup = BeautifulSoup
+
+    def __call__(self, pieces: Iterable[str]) -> Iterator[str]:
+        document = self._soup("".join(pieces), "html.parser")
+        for element in document.select(self.selector):
+            yield str(element)
+
+
+class DedupeBlocks:
+    """Drops blocks repeated earlier in the page, ignoring case and whitespace"""
+
+    def __call__(self, pieces: Iterable[str]) -> Iterator[str]:
+        seen = set()
+        for block in _blocks(pieces):
+            key = " ".join(block.lower().split())
+            if key not in seen:
+                seen.add(key)
+                yield block
+
+
+def _cut(block: str, tokens: int, count_tokens: Callable[[str], int]) -> str:
+    """The longest prefix of block (by a proportional estimate) that fits in tokens"""
+    end = len(block) * tokens // max(count_tokens(block), 1)
+    while end > 0 and count_tokens(block[:end]) > tokens:
+        end = end * 9 // 10
+    return block[:end]
+
+
+class TruncateTokens:
+    """Stops once max_tokens worth of blocks went through, cutting the last block to fit"""
+
+    def __init__(self, max_tokens: int, count_tokens: Callable[[str], int] = estimate_tokens,
+                 marker: str | None = "[truncated]"):
+        if max_tokens < 1:
+            raise ValueError(f"max_tokens must be at least 1, got {max_tokens}")
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens
+        self.marker = marker
+
+    def __call__(self, pieces: Iterable[str]) -> Iterator[str]:
+        remaining = self.max_tokens
+        for block in _blocks(pieces):
+            tokens = self.count_tokens(block)
+            if tokens <= remaining:
+                remaining -= tokens
+                yield block
+                continue
+            head = _cut(block, remaining, self.count_tokens)
+            if head:
+                yield head
+            if self.marker:
+                yield self.marker
+            return  # Leaves the rest of the page unprocessed
+
+
+class ChunkTokens:
+    """Packs blocks into chunks of at most max_tokens each; the pipeline then returns a list of chunks"""
+
+    returns_chunks = True
+
+    def __init__(self, max_tokens: int, count_tokens: Callable[[str], int] = estimate_tokens,
+                 separator: str = "\n\n"):
+        if max_tokens < 1:
+            raise ValueError(f"max_tokens must be at least 1, got {max_tokens}")
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens
+        self.separator = separator
+
+    def __call__(self, pieces: Iterable[str]) -> Iterator[str]:
+        chunk: list[str] = []
+        used = 0
+        for block in _blocks(pieces):
+            while block:
+                tokens = self.count_tokens(block)
+                if chunk and used + tokens > self.max_tokens:
+                    yield self.separator.join(chunk)
+                    chunk, used = [], 0
+                if tokens <= self.max_tokens:
+                    chunk.append(block)
+                    used += tokens
+                    break
+                # A block larger than a whole chunk is split across chunks
+                head = _cut(block, self.max_tokens, self.count_tokens) or block[:1]
+                yield head
+                block = block[len(head):].lstrip()
+        if chunk:
+            yield self.separator.join(chunk)
+
+
+class ContentPipeline:
+    """Runs fetched content through stages, e.g.
+
+        ContentPipeline(StripBoilerplate(), HtmlToText(), DedupeBlocks(), TruncateTokens(4000))
+
+    Async callers hand pages of offload_threshold characters or more to a worker pool so parsing
+    does not block the event loop: the loop's default thread pool, or the given executor (a
+    ProcessPoolExecutor also works as long as the stages can be pickled).
+    """
+
+    def __init__(self, *stages: Stage, separator: str = "\n\n", offload_threshold: int = 64_000, executor=None):
+        self.stages = stages
+        self.separator = separator
+        self.offload_threshold = offload_threshold
+        self.executor = executor
+
+    def stream(self, content: str) -> Iterator[str]:
+        """Lazily yield the processed pieces of content"""
+        pieces: Iterable[str] = iter([content])
+        for stage in self.stages:
+            pieces = stage(pieces)
+        return iter(pieces)
+
+    def run(self, content: str) -> str | list[str]:
+        pieces = [piece for piece in self.stream(content) if piece]
+        if self.stages and getattr(self.stages[-1], "returns_chunks", False):
+            return pieces
+        return self.separator.join(pieces)
+
+    async def arun(self, content: str) -> str | list[str]:
+        if len(content) < self.offload_threshold:
+            return self.run(content)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.run, content)
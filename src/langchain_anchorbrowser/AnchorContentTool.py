@@ -1,15 +1,60 @@
 from .AnchorBaseTool import AnchorBaseTool
+from .AnchorCache import make_cache_key
+from .AnchorContentPipeline import ContentPipeline
+from .AnchorRevisions import RevisionStore, describe_change
 from langchain_core.tools import BaseTool
 from pydantic import Field, BaseModel
 from typing import Optional, Literal
+import asyncio
 
 class AnchorContentTool(AnchorBaseTool, BaseTool):
     name: str = "anchor_content_tool"
     description: str = "Get the content of a webpage using Anchor Browser"
     client_function_name: str = "fetch_webpage"
+    pipeline: ContentPipeline | None = None  # Post-processes pages before they are returned; the cache keeps them raw
+    revisions: RevisionStore | None = None  # Remembers each page's last (processed) content for change_mode
+    change_mode: Literal["full", "if_changed", "diff"] = "full"  # Repeat fetches: whole page, marker if unchanged, or diff
     
     class InputSchema(BaseModel):
         url: str = Field(description="The URL of the webpage to get content from")
         format: Optional[Literal['markdown', 'html']] = Field(default='markdown', description="Format of the content")
     
     args_schema: type[BaseModel] = InputSchema
+
+    def _run(self, **kwargs):
+        content = super()._run(**kwargs)
+        if self.pipeline is not None:
+            content = self.pipeline.run(content)
+        return self._track_revision(kwargs, content)
+
+    async def _arun(self, **kwargs):
+        content = await super()._arun(**kwargs)
+        if self.pipeline is not None:
+            content = await self.pipeline.arun(content)
+        if self.revisions is None and self.change_mode == "full":
+            return content
+        # SQLite and difflib work stays off the event loop
+        return await asyncio.get_running_loop().run_in_executor(None, self._track_revision, kwargs, content)
+
+    def changed_since(self, url: str, since: float, format: str | None = None) -> bool:
+        """Fetch the page and report whether its content changed after since (a time.time() timestamp)"""
+        if self.revisions is None:
+            raise ValueError("changed_since needs a revision store: set revisions=RevisionStore(...)")
+        self._run(url=url, format=format)
+        return self.revisions.get(self._revision_key({"url": url, "format": format})).changed_at > since
+
+    def _revision_key(self, kwargs: dict) -> str:
+        return make_cache_key(self._key_namespace(), {k: v for k, v in kwargs.items() if v is not None})
+
+    def _track_revision(self, kwargs: dict, content):
+        if self.revisions is None:
+            if self.change_mode != "full":
+                raise ValueError(f"change_mode={self.change_mode!r} needs a revision store: set revisions=RevisionStore(...)")
+            return content
+        # Chunked output is compared as one document
+        text = content if isinstance(content, str) else "\n\n".join(content)
+        previous, current = self.revisions.record(self._revision_key(kwargs), kwargs["url"], text)
+        changed = previous is None or previous.content_hash != current.content_hash
+        if self.change_mode == "full" or (changed and self.change_mode == "if_changed"):
+            return content
+        return describe_change(previous, current, self.change_mode)
@@ -0,0 +1,261 @@
+from .AnchorBaseTool import AnchorBaseTool
+from .AnchorContentPipeline import ContentPipeline
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from langchain_core.tools import BaseTool
+from pydantic import Field, BaseModel
+from typing import AsyncIterator, Callable, Iterable, Iterator, Literal, Optional
+from urllib.parse import parse_qsl, urldefrag, urlencode, urljoin, urlsplit, urlunsplit
+import asyncio
+import contextvars
+import re
+import sqlite3
+import threading
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_MARKDOWN_LINK = re.compile(r"\]\(\s*<?([^)\s>]+)>?(?:\s+\"[^\"]*\")?\s*\)")
+# Query parameters that only track where a visitor came from
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|gclid|fbclid|mc_cid|mc_eid)$")
+
+
+def normalize_crawl_url(url: str) -> str | None:
+    """Canonical form used to deduplicate the frontier; None for links that can't be crawled
+
+    Lowercases scheme and host, drops default ports, fragments and tracking parameters, and
+    turns an empty path into "/".
+    """
+    parts = urlsplit(urldefrag(url.strip())[0])
+    if parts.scheme.lower() not in _DEFAULT_PORTS or not parts.hostname:
+        return None
+    scheme = parts.scheme.lower()
+    host = parts.hostname.lower()
+    try:
+        port = parts.port
+    except ValueError:
+        return None
+    netloc = host if port in (None, _DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _TRACKING_PARAMS.match(k)])
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+class _LinkParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links: list[str] = []
+        self.base: str | None = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self.links.append(href)
+        elif tag == "base" and self.base is None:
+            self.base = dict(attrs).get("href")
+
+
+def extract_links(content: str, base_url: str) -> list[str]:
+    """Absolute, normalized links of an HTML or markdown page, in page order without duplicates"""
+    if content.lstrip().startswith("<"):
+        parser = _LinkParser()
+        parser.feed(content)
+        parser.close()
+        base_url = urljoin(base_url, parser.base) if parser.base else base_url
+        hrefs = parser.links
+    else:
+        hrefs = _MARKDOWN_LINK.findall(content)
+    links = (normalize_crawl_url(urljoin(base_url, href)) for href in hrefs)
+    return list(dict.fromkeys(link for link in links if link is not None))
+
+
+@dataclass
+class CrawlPage:
+    """One crawled page; content is None and error is set when the fetch failed"""
+    url: str
+    depth: int
+    content: str | list[str] | None = None
+    links: list[str] = field(default_factory=list)
+    error: str | None = None
+
+
+class CrawlState:
+    """The crawl frontier in SQLite: every URL seen, its depth and whether it was fetched
+
+    The default ":memory:" state lasts one crawl. With a file path, a crawl that stopped (or
+    crashed) resumes where it left off: fetched URLs are not fetched again, and URLs that were in
+    flight go back to the queue.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS anchor_crawl ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL UNIQUE, depth INTEGER NOT NULL, "
+            "status TEXT NOT NULL DEFAULT 'queued', error TEXT)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS anchor_crawl_status ON anchor_crawl (status, seq)")
+        # Nothing is in flight in a new process
+        self._connection.execute("UPDATE anchor_crawl SET status = 'queued' WHERE status = 'active'")
+
+    def add(self, urls: Iterable[str], depth: int) -> int:
+        """Queue the URLs not seen before; returns how many were new"""
+        with self._lock:
+            before = self._connection.total_changes
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO anchor_crawl (url, depth) VALUES (?, ?)", [(url, depth) for url in urls]
+            )
+            return self._connection.total_changes - before
+
+    def claim(self) -> tuple[str, int] | None:
+        """Take the oldest queued URL (breadth first) and mark it in flight"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT seq, url, depth FROM anchor_crawl WHERE status = 'queued' ORDER BY seq LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute("UPDATE anchor_crawl SET status = 'active' WHERE seq = ?", (row[0],))
+            return row[1], row[2]
+
+    def finish(self, url: str, error: str | None = None) -> None:
+        with self._lock:
+            self._connection.execute(
+                "UPDATE anchor_crawl SET status = ?, error = ? WHERE url = ?",
+                ("failed" if error is not None else "done", error, url),
+            )
+
+    def count(self, *statuses: str) -> int:
+        with self._lock:
+            placeholders = ", ".join("?" for _ in statuses)
+            return self._connection.execute(
+                f"SELECT COUNT(*) FROM anchor_crawl WHERE status IN ({placeholders})", statuses
+            ).fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM anchor_crawl")
+
+
+class AnchorCrawlTool(AnchorBaseTool, BaseTool):
+    name: str = "anchor_crawl_tool"
+    description: str = "Crawl a website from seed URLs using Anchor Browser and return the content of each page"
+    client_function_name: str = "fetch_webpage"
+    format: Literal["markdown", "html"] = "markdown"  # Format pages are fetched in; links are found in either
+    max_concurrency: int = 5  # Pages fetched at once; the session pool's max_size also bounds this
+    allowed_domains: list[str] | None = None  # Hosts (and their subdomains) to stay on; None means the seeds' hosts
+    url_filter: Callable[[str], bool] | None = None  # Extra predicate a normalized link must pass to be queued
+    pipeline: ContentPipeline | None = None  # Applied to each page after its links were extracted
+    state: CrawlState | None = None  # Frontier to resume from; None starts a fresh in-memory one per crawl
+
+    class InputSchema(BaseModel):
+        urls: list[str] = Field(description="Seed URLs to start crawling from")
+        max_depth: Optional[int] = Field(default=1, description="How many links away from a seed to follow (0 fetches only the seeds)")
+        max_pages: Optional[int] = Field(default=20, description="Maximum number of pages to fetch")
+
+    args_schema: type[BaseModel] = InputSchema
+
+    def _run(self, urls: list[str], max_depth: int | None = 1, max_pages: int | None = 20) -> list[dict]:
+        return [_page_result(page) for page in self.crawl(urls, max_depth, max_pages)]
+
+    async def _arun(self, urls: list[str], max_depth: int | None = 1, max_pages: int | None = 20) -> list[dict]:
+        return [_page_result(page) async for page in self.acrawl(urls, max_depth, max_pages)]
+
+    def crawl(self, urls: Iterable[str], max_depth: int | None = 1, max_pages: int | None = 20) -> Iterator[CrawlPage]:
+        """Crawl breadth first from urls, yielding each page as soon as it is fetched"""
+        state, allowed = self._start(urls)
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        in_flight = {}
+        try:
+            while True:
+                while len(in_flight) < self.max_concurrency and self._has_budget(state, max_pages):
+                    claimed = state.claim()
+                    if claimed is None:
+                        break
+                    # Each fetch sees the caller's run config (deadlines, pinned sessions)
+                    context = contextvars.copy_context()
+                    in_flight[executor.submit(context.run, self._fetch, claimed[0])] = claimed
+                if not in_flight:
+                    return
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url, depth = in_flight.pop(future)
+                    error = future.exception()
+                    page = self._settle(state, allowed, url, depth, max_depth, None if error else future.result(), error)
+                    if self.pipeline is not None and page.error is None:
+                        page.content = self.pipeline.run(page.content)
+                    yield page
+        finally:
+            # Pages still in flight stay queued in the state, for a resumed crawl to pick up
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def acrawl(self, urls: Iterable[str], max_depth: int | None = 1,
+                     max_pages: int | None = 20) -> AsyncIterator[CrawlPage]:
+        """Async counterpart of crawl, fetching on the current event loop"""
+        state, allowed = self._start(urls)
+        in_flight = {}
+        try:
+            while True:
+                while len(in_flight) < self.max_concurrency and self._has_budget(state, max_pages):
+                    claimed = state.claim()
+                    if claimed is None:
+                        break
+                    in_flight[asyncio.ensure_future(self._afetch(claimed[0]))] = claimed
+                if not in_flight:
+                    return
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    url, depth = in_flight.pop(task)
+                    error = task.exception()
+                    page = self._settle(state, allowed, url, depth, max_depth, None if error else task.result(), error)
+                    if self.pipeline is not None and page.error is None:
+                        page.content = await self.pipeline.arun(page.content)
+                    yield page
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    def _start(self, urls: Iterable[str]) -> tuple[CrawlState, tuple[str, ...]]:
+        seeds = [url for url in map(normalize_crawl_url, urls) if url is not None]
+        if not seeds:
+            raise ValueError("No crawlable seed URLs: they must be absolute http(s) URLs")
+        state = self.state if self.state is not None else CrawlState()
+        state.add(seeds, 0)
+        allowed = self.allowed_domains or [urlsplit(seed).hostname for seed in seeds]
+        return state, tuple(domain.lower().lstrip(".") for domain in allowed)
+
+    def _has_budget(self, state: CrawlState, max_pages: int | None) -> bool:
+        # Counted from the state, so a resumed crawl keeps to the same limit
+        return max_pages is None or state.count("active", "done", "failed") < max_pages
+
+    def _fetch(self, url: str):
+        return AnchorBaseTool._run(self, url=url, format=self.format)
+
+    async def _afetch(self, url: str):
+        return await AnchorBaseTool._arun(self, url=url, format=self.format)
+
+    def _settle(self, state: CrawlState, allowed: tuple[str, ...], url: str, depth: int, max_depth: int | None,
+                content, error: BaseException | None) -> CrawlPage:
+        if error is not None:
+            state.finish(url, f"{type(error).__name__}: {error}")
+            return CrawlPage(url, depth, error=f"{type(error).__name__}: {error}")
+        links = [link for link in extract_links(content, url) if self._follows(link, allowed)]
+        if max_depth is None or depth < max_depth:
+            state.add(links, depth + 1)
+        state.finish(url)
+        return CrawlPage(url, depth, content, links)
+
+    def _follows(self, link: str, allowed: tuple[str, ...]) -> bool:
+        host = urlsplit(link).hostname or ""
+        if not any(host == domain or host.endswith("." + domain) for domain in allowed):
+            return False
+        return self.url_filter is None or self.url_filter(link)
+
+
+def _page_result(page: CrawlPage) -> dict:
+    if page.error is not None:
+        return {"url": page.url, "depth": page.depth, "error": page.error}
+    return {"url": page.url, "depth": page.depth, "content": page.content}
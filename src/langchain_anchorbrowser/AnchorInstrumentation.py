@@ -0,0 +1,172 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Callable
+import logging
+import time
+
+# Metrics of the calls made inside capture_metrics(), per thread or asyncio task
+_captured_metrics: ContextVar[list | None] = ContextVar("anchor_captured_metrics", default=None)
+
+
+@dataclass
+class CallMetrics:
+    """Phase-level measurements for a single tool call, handed to every AnchorHook"""
+    tool_name: str
+    function_name: str
+    url: str | None = None
+    started_at: float = field(default_factory=time.time)  # Unix timestamp
+    total_seconds: float | None = None
+    cache_hit: bool = False
+    coalesced: bool = False  # Shared the result of a concurrent identical call; session and phase fields stay unset
+    queue_wait_seconds: float | None = None  # Time spent waiting on the client-side rate limiter
+    session_id: str | None = None
+    session_created: bool | None = None  # False when a warm pooled session was reused
+    session_acquire_seconds: float | None = None
+    tool_call_seconds: float | None = None
+    decode_seconds: float | None = None
+    payload_bytes: int | None = None
+    error_class: str | None = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def payload_size(result) -> int | None:
+    """Size in bytes of a tool result, when it is text or binary"""
+    if isinstance(result, (bytes, bytearray)):
+        return len(result)
+    if isinstance(result, str):
+        return len(result.encode("utf-8"))
+    return None
+
+
+@contextmanager
+def capture_metrics():
+    """Collect the CallMetrics of the tool calls made in this context, whether or not hooks are registered"""
+    captured: list[CallMetrics] = []
+    token = _captured_metrics.set(captured)
+    try:
+        yield captured
+    finally:
+        _captured_metrics.reset(token)
+
+
+def metrics_sink() -> list | None:
+    """The list capture_metrics() collects into, or None outside of it"""
+    return _captured_metrics.get()
+
+
+class AnchorHook:
+    """Receives CallMetrics after every tool call; override on_call_end in subclasses"""
+
+    def on_call_end(self, metrics: CallMetrics) -> None:
+        pass
+
+
+class CallbackHook(AnchorHook):
+    """Forwards metrics to a plain callable, e.g. CallbackHook(metrics_list.append)"""
+
+    def __init__(self, callback: Callable[[CallMetrics], None]):
+        self.callback = callback
+
+    def on_call_end(self, metrics: CallMetrics) -> None:
+        self.callback(metrics)
+
+
+class LoggingHook(AnchorHook):
+    """Logs one line per call with its phase timings"""
+
+    def __init__(self, logger: logging.Logger | None = None, level: int = logging.INFO):
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def on_call_end(self, metrics: CallMetrics) -> None:
+        if not self.logger.isEnabledFor(self.level):
+            return
+        phases = ", ".join(
+            f"{name}={value:.3f}s"
+            for name, value in (
+                ("queue", metrics.queue_wait_seconds),
+                ("session", metrics.session_acquire_seconds),
+                ("call", metrics.tool_call_seconds),
+                ("decode", metrics.decode_seconds),
+            )
+            if value is not None
+        )
+        outcome = metrics.error_class or ("cache hit" if metrics.cache_hit else "coalesced" if metrics.coalesced else "ok")
+        self.logger.log(
+            self.level,
+            f"{metrics.function_name} {outcome} in {metrics.total_seconds:.2f}s ({phases}) "
+            f"bytes={metrics.payload_bytes} url={metrics.url}",
+        )
+
+
+class OpenTelemetryHook(AnchorHook):
+    """Emits one span per tool call with the phase timings as attributes (needs opentelemetry-api)"""
+
+    def __init__(self, tracer=None):
+        if tracer is None:
+            try:
+                from opentelemetry import trace
+            except ImportError as e:
+                raise ImportError(
+                    "OpenTelemetryHook requires opentelemetry-api: pip install opentelemetry-api"
+                ) from e
+            tracer = trace.get_tracer("langchain_anchorbrowser")
+        self.tracer = tracer
+
+    def on_call_end(self, metrics: CallMetrics) -> None:
+        start_ns = int(metrics.started_at * 1e9)
+        span = self.tracer.start_span(f"anchor.{metrics.function_name}", start_time=start_ns)
+        for name, value in metrics.as_dict().items():
+            if value is not None:
+                span.set_attribute(f"anchor.{name}", value)
+        if metrics.error_class is not None:
+            try:
+                from opentelemetry.trace import Status, StatusCode
+                span.set_status(Status(StatusCode.ERROR, metrics.error_class))
+            except ImportError:
+                pass
+        span.end(end_time=start_ns + int((metrics.total_seconds or 0) * 1e9))
+
+
+class PrometheusHook(AnchorHook):
+    """Exports call counters and phase/payload histograms (needs prometheus-client)"""
+
+    def __init__(self, registry=None, namespace: str = "anchor"):
+        try:
+            from prometheus_client import REGISTRY, Counter, Histogram
+        except ImportError as e:
+            raise ImportError(
+                "PrometheusHook requires prometheus-client: pip install prometheus-client"
+            ) from e
+        registry = registry or REGISTRY
+        self.calls = Counter(
+            "tool_calls", "Anchor tool calls by outcome",
+            ["tool", "function", "outcome"], namespace=namespace, registry=registry,
+        )
+        self.phase_seconds = Histogram(
+            "tool_phase_seconds", "Anchor tool call latency by phase",
+            ["function", "phase"], namespace=namespace, registry=registry,
+        )
+        self.payload_bytes = Histogram(
+            "tool_payload_bytes", "Size of Anchor tool results",
+            ["function"], namespace=namespace, registry=registry,
+            buckets=(1e3, 1e4, 1e5, 1e6, 1e7, 1e8),
+        )
+
+    def on_call_end(self, metrics: CallMetrics) -> None:
+        outcome = metrics.error_class or ("cache_hit" if metrics.cache_hit else "coalesced" if metrics.coalesced else "ok")
+        self.calls.labels(metrics.tool_name, metrics.function_name, outcome).inc()
+        for phase, value in (
+            ("total", metrics.total_seconds),
+            ("queue_wait", metrics.queue_wait_seconds),
+            ("session_acquire", metrics.session_acquire_seconds),
+            ("tool_call", metrics.tool_call_seconds),
+            ("decode", metrics.decode_seconds),
+        ):
+            if value is not None:
+                self.phase_seconds.labels(metrics.function_name, phase).observe(value)
+        if metrics.payload_bytes is not None:
+            self.payload_bytes.labels(metrics.function_name).observe(metrics.payload_bytes)
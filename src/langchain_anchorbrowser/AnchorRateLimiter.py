@@ -0,0 +1,157 @@
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+import asyncio
+import threading
+import time
+
+
+@dataclass
+class RateLimit:
+    """Token bucket plus in-flight cap for one client function; None disables either half"""
+    rate: float | None = None  # Calls per second refilled into the bucket
+    burst: int = 1  # Bucket capacity, i.e. calls allowed back to back
+    max_in_flight: int | None = None  # Concurrent calls, e.g. the account's session quota
+
+    def __post_init__(self):
+        if self.rate is not None and self.rate <= 0:
+            raise ValueError(f"rate must be positive, got {self.rate}")
+        if self.burst < 1:
+            raise ValueError(f"burst must be at least 1, got {self.burst}")
+        if self.max_in_flight is not None and self.max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be at least 1, got {self.max_in_flight}")
+
+
+class _Governor:
+    """State for a single RateLimit, shared by threads and event loops alike"""
+
+    def __init__(self, limit: RateLimit):
+        self.limit = limit
+        self.in_flight = 0
+        self._tokens = float(limit.burst)
+        self._refilled_at = time.monotonic()
+        self._condition = threading.Condition()
+        self._async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def _try_take(self) -> tuple[bool, float | None]:
+        """Take a token and a slot under the lock; otherwise return how long to wait (None: until a release)"""
+        if self.limit.max_in_flight is not None and self.in_flight >= self.limit.max_in_flight:
+            return False, None
+        if self.limit.rate is not None:
+            now = time.monotonic()
+            self._tokens = min(self.limit.burst, self._tokens + (now - self._refilled_at) * self.limit.rate)
+            self._refilled_at = now
+            if self._tokens < 1:
+                return False, (1 - self._tokens) / self.limit.rate
+            self._tokens -= 1
+        self.in_flight += 1
+        return True, 0.0
+
+    def acquire(self, deadline: float | None) -> None:
+        with self._condition:
+            while True:
+                ready, wait = self._try_take()
+                if ready:
+                    return
+                self._condition.wait(_bounded(wait, deadline))
+
+    async def aacquire(self, deadline: float | None) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            waiter = None
+            with self._condition:
+                ready, wait = self._try_take()
+                if ready:
+                    return
+                if wait is None:
+                    waiter = loop.create_future()
+                    self._async_waiters.append((loop, waiter))
+            timeout = _bounded(wait, deadline)
+            if waiter is None:
+                await asyncio.sleep(timeout)
+                continue
+            try:
+                await asyncio.wait_for(waiter, timeout)
+            except asyncio.TimeoutError:
+                pass  # _bounded() raises on the next iteration once the deadline passed
+            finally:
+                with self._condition:
+                    if (loop, waiter) in self._async_waiters:
+                        self._async_waiters.remove((loop, waiter))
+
+    def release(self) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+            waiters, self._async_waiters = self._async_waiters, []
+        # Wake every async waiter; they race for the slot like threads do after notify()
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def _bounded(wait: float | None, deadline: float | None) -> float | None:
+    if deadline is None:
+        return wait
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("Timed out waiting for the Anchor Browser rate limiter")
+    return remaining if wait is None else min(wait, remaining)
+
+
+class RateLimiter:
+    """Client-side governor shared by every tool through AnchorClient
+
+    Limits are set per client function (fetch_webpage, screenshot_webpage, perform_web_task);
+    functions without their own limit fall back to the default one, if any.
+    """
+
+    def __init__(self, default: RateLimit | None = None, timeout: float | None = None, **limits: RateLimit):
+        self.timeout = timeout
+        self._default = _Governor(default) if default is not None else None
+        self._governors = {name: _Governor(limit) for name, limit in limits.items()}
+
+    def _governor(self, function_name: str) -> _Governor | None:
+        return self._governors.get(function_name, self._default)
+
+    def in_flight(self, function_name: str) -> int:
+        governor = self._governor(function_name)
+        return 0 if governor is None else governor.in_flight
+
+    def _deadline(self, deadline: float | None = None) -> float | None:
+        """The earlier of the limiter's own timeout and the caller's deadline"""
+        own = None if self.timeout is None else time.monotonic() + self.timeout
+        if own is None or deadline is None:
+            return deadline if own is None else own
+        return min(own, deadline)
+
+    @contextmanager
+    def limit(self, function_name: str, deadline: float | None = None):
+        """Hold a slot for function_name; yields the seconds spent queueing"""
+        governor = self._governor(function_name)
+        if governor is None:
+            yield 0.0
+            return
+        start = time.monotonic()
+        governor.acquire(self._deadline(deadline))
+        try:
+            yield time.monotonic() - start
+        finally:
+            governor.release()
+
+    @asynccontextmanager
+    async def alimit(self, function_name: str):
+        """Async counterpart of limit"""
+        governor = self._governor(function_name)
+        if governor is None:
+            yield 0.0
+            return
+        start = time.monotonic()
+        await governor.aacquire(self._deadline())
+        try:
+            yield time.monotonic() - start
+        finally:
+            governor.release()
@@ -0,0 +1,188 @@
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+import asyncio
+import logging
+import random
+import threading
+import time
+
+# HTTP statuses worth retrying: request timeout, conflict, rate limiting and server errors
+TRANSIENT_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the API while the circuit breaker is open"""
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Whether an error is likely to go away on its own (network trouble, throttling, 5xx)"""
+    from anchorbrowser import APIConnectionError, APIStatusError
+
+    if isinstance(error, APIStatusError):
+        return error.status_code in TRANSIENT_STATUS_CODES
+    return isinstance(error, (APIConnectionError, ConnectionError, TimeoutError))
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter; attempts include the first call"""
+    max_attempts: int = 3
+    initial_backoff: float = 0.5
+    max_backoff: float = 8.0
+    multiplier: float = 2.0
+    jitter: bool = True
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        return attempt < self.max_attempts and is_transient_error(error)
+
+    def backoff(self, attempt: int, error: BaseException | None = None) -> float:
+        """Seconds to wait after the given failed attempt, honouring Retry-After when present"""
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        delay = min(self.max_backoff, self.initial_backoff * self.multiplier ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+def _retry_after(error: BaseException | None) -> float | None:
+    # Any API status error carries the HTTP response; no need to import the SDK to check
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+class CircuitBreaker:
+    """Fails fast after repeated transient failures, then lets a probe call through after a cool-down
+
+    Shared by every tool through AnchorClient, so an outage trips it once for the whole process
+    instead of every thread blocking on its own timeouts.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go through right now"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.OPEN:
+                remaining = self.recovery_timeout - (time.monotonic() - self._opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(f"Anchor Browser circuit is open; retry in {remaining:.1f}s")
+                self._state = self.HALF_OPEN
+            # Half-open: only one probe call at a time
+            if self._probing:
+                raise CircuitOpenError("Anchor Browser circuit is half-open; a probe call is in flight")
+            self._probing = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Opening Anchor Browser circuit after {self._failures} failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def record(self, error: BaseException | None) -> None:
+        """Record a call outcome; only transient errors count as failures"""
+        if error is None:
+            self.record_success()
+        elif not isinstance(error, Exception):
+            # Cancellation says nothing about the service; just free the probe slot
+            with self._lock:
+                self._probing = False
+        elif is_transient_error(error):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def call(self, fn: Callable):
+        """Call fn() through the breaker"""
+        self.before_call()
+        try:
+            result = fn()
+        except BaseException as e:
+            self.record(e)
+            raise
+        self.record(None)
+        return result
+
+    async def acall(self, fn: Callable[[], Awaitable]):
+        """Await fn() through the breaker"""
+        self.before_call()
+        try:
+            result = await fn()
+        except BaseException as e:
+            self.record(e)
+            raise
+        self.record(None)
+        return result
+
+
+def call_with_retry(fn: Callable, policy: RetryPolicy | None = None, deadline: float | None = None):
+    """Call fn(), retrying transient errors with backoff per the policy until the (monotonic) deadline"""
+    policy = policy or NO_RETRY
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return fn()
+        except Exception as e:
+            if not policy.should_retry(e, attempt):
+                raise
+            delay = policy.backoff(attempt, e)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise  # No time left for another attempt
+            logger.info(f"Attempt {attempt} failed with {type(e).__name__}; retrying in {delay:.2f}s")
+        time.sleep(delay)
+
+
+async def acall_with_retry(fn: Callable[[], Awaitable], policy: RetryPolicy | None = None,
+                           deadline: float | None = None):
+    """Async counterpart of call_with_retry"""
+    policy = policy or NO_RETRY
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return await fn()
+        except Exception as e:
+            if not policy.should_retry(e, attempt):
+                raise
+            delay = policy.backoff(attempt, e)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise  # No time left for another attempt
+            logger.info(f"Attempt {attempt} failed with {type(e).__name__}; retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
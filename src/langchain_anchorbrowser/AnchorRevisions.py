@@ -0,0 +1,100 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import difflib
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+
+# Prefix of the result returned instead of a page that did not change
+UNCHANGED_MARKER = "[unchanged]"
+
+
+@dataclass
+class PageRevision:
+    """Last content seen for a page, with when it was fetched and when it last changed"""
+    url: str
+    content: str
+    content_hash: str
+    fetched_at: float
+    changed_at: float
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _timestamp(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat(timespec="seconds")
+
+
+class RevisionStore:
+    """On-disk store of the last content per page (zlib-compressed in SQLite), surviving restarts"""
+
+    def __init__(self, path: str = "anchor_revisions.sqlite3"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS anchor_revisions ("
+            "key TEXT PRIMARY KEY, url TEXT NOT NULL, content BLOB NOT NULL, content_hash TEXT NOT NULL, "
+            "fetched_at REAL NOT NULL, changed_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> PageRevision | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT url, content, content_hash, fetched_at, changed_at FROM anchor_revisions WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        url, content, digest, fetched_at, changed_at = row
+        return PageRevision(url, zlib.decompress(content).decode("utf-8"), digest, fetched_at, changed_at)
+
+    def record(self, key: str, url: str, content: str) -> tuple[PageRevision | None, PageRevision]:
+        """Store a fetch of the page; returns the previous revision (None on the first fetch) and the new one"""
+        now = time.time()
+        digest = content_hash(content)
+        previous = self.get(key)
+        if previous is not None and previous.content_hash == digest:
+            # Same content: only the fetch time moves, and the blob is not rewritten
+            with self._lock:
+                self._connection.execute("UPDATE anchor_revisions SET fetched_at = ? WHERE key = ?", (now, key))
+            return previous, PageRevision(url, content, digest, now, previous.changed_at)
+        current = PageRevision(url, content, digest, now, now)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO anchor_revisions "
+                "(key, url, content, content_hash, fetched_at, changed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, url, zlib.compress(content.encode("utf-8")), digest, now, now),
+            )
+        return previous, current
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM anchor_revisions WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM anchor_revisions")
+
+
+def describe_change(previous: PageRevision | None, current: PageRevision, mode: str, context: int = 3) -> str:
+    """Result for a fetch in the given change mode: the page, a diff against the previous fetch, or a marker"""
+    if mode == "full" or previous is None:
+        return current.content
+    if previous.content_hash == current.content_hash:
+        return f"{UNCHANGED_MARKER} {current.url} has not changed since {_timestamp(current.changed_at)}"
+    if mode == "if_changed":
+        return current.content
+    return "\n".join(difflib.unified_diff(
+        previous.content.splitlines(),
+        current.content.splitlines(),
+        fromfile=f"{current.url} @ {_timestamp(previous.fetched_at)}",
+        tofile=f"{current.url} @ {_timestamp(current.fetched_at)}",
+        n=context,
+        lineterm="",
+    ))
@@ -0,0 +1,159 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+import asyncio
+import base64
+import io
+import math
+import os
+import threading
+
+_default_executor: ProcessPoolExecutor | None = None
+_default_executor_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Rendition:
+    """One derived image: width in pixels (height keeps the aspect ratio), format and optional byte budget"""
+    name: str
+    width: int | None = None  # None keeps the capture's size
+    format: str = "WEBP"  # Any format Pillow can write: WEBP, JPEG, PNG, ...
+    quality: int = 85  # Starting quality for lossy formats
+    max_bytes: int | None = None  # Lower quality, then size, until the image fits
+
+    def __post_init__(self):
+        if self.width is not None and self.width < 1:
+            raise ValueError(f"width must be positive, got {self.width}")
+        if not 1 <= self.quality <= 100:
+            raise ValueError(f"quality must be between 1 and 100, got {self.quality}")
+
+
+def hamming_distance(hash_a: str, hash_b: str) -> int:
+    """Number of differing bits between two perceptual hashes; small (under ~10) means visually similar"""
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count("1")
+
+
+def _shared_executor() -> ProcessPoolExecutor:
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+        return _default_executor
+
+
+class ScreenshotDerivatives:
+    """Local post-processing of a capture: resized/re-encoded renditions and a perceptual hash (needs Pillow)
+
+    Work runs in a process pool (a shared one by default), so it neither holds the GIL of the
+    calling process nor blocks an event loop. Results are plain JSON (renditions are base64),
+    so a tool's cache can keep them next to the screenshot.
+    """
+
+    def __init__(self, renditions: tuple[Rendition, ...] = (), perceptual_hash: bool = True,
+                 executor: Executor | None = None):
+        try:
+            import PIL  # noqa: F401
+        except ImportError as e:
+            raise ImportError("ScreenshotDerivatives requires Pillow: pip install Pillow") from e
+        self.renditions = tuple(renditions)
+        self.perceptual_hash = perceptual_hash
+        self.executor = executor
+
+    def spec(self) -> dict:
+        """What gets derived, as JSON; part of the cache key"""
+        return {"renditions": [asdict(rendition) for rendition in self.renditions], "phash": self.perceptual_hash}
+
+    def derive(self, image: bytes) -> dict:
+        executor = self.executor or _shared_executor()
+        return executor.submit(derive_image, image, self.renditions, self.perceptual_hash).result()
+
+    async def aderive(self, image: bytes) -> dict:
+        executor = self.executor or _shared_executor()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, derive_image, image, self.renditions, self.perceptual_hash)
+
+
+def derive_image(image: bytes, renditions: tuple[Rendition, ...], perceptual_hash: bool = True) -> dict:
+    """Compute the derivatives of an encoded image; runs in a worker process"""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(image)) as source:
+        source.load()
+        result = {"width": source.width, "height": source.height, "renditions": {}}
+        for rendition in renditions:
+            data = _render(source, rendition)
+            result["renditions"][rendition.name] = base64.b64encode(data).decode("ascii")
+        if perceptual_hash:
+            result["phash"] = _phash(source)
+    return result
+
+
+def _render(source, rendition: Rendition) -> bytes:
+    from PIL import Image
+
+    width = rendition.width or source.width
+    image = source
+    while True:
+        if width != image.width:
+            height = max(1, round(source.height * width / source.width))
+            image = source.resize((width, height), Image.LANCZOS)
+        data = _encode(image, rendition)
+        if rendition.max_bytes is None or len(data) <= rendition.max_bytes or width <= 16:
+            return data
+        # Lowest quality is still too big: shrink and try again
+        width = max(16, int(width * 0.75))
+
+
+def _encode(image, rendition: Rendition) -> bytes:
+    image_format = rendition.format.upper()
+    if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    if image_format not in ("JPEG", "WEBP"):
+        return _save(image, image_format)
+    data = _save(image, image_format, quality=rendition.quality)
+    if rendition.max_bytes is None or len(data) <= rendition.max_bytes:
+        return data
+    # Binary search for the highest quality that fits the budget
+    low, high, best = 10, rendition.quality - 1, None
+    while low <= high:
+        quality = (low + high) // 2
+        candidate = _save(image, image_format, quality=quality)
+        if len(candidate) <= rendition.max_bytes:
+            best, low = candidate, quality + 1
+        else:
+            high = quality - 1
+    return best if best is not None else _save(image, image_format, quality=10)
+
+
+def _save(image, image_format: str, **options) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+_HASH_SIZE = 8
+_SAMPLE_SIZE = 32
+_COSINES = [
+    [math.cos(math.pi * (2 * x + 1) * u / (2 * _SAMPLE_SIZE)) for x in range(_SAMPLE_SIZE)]
+    for u in range(_HASH_SIZE)
+]
+
+
+def _phash(image) -> str:
+    """64-bit DCT perceptual hash as 16 hex digits"""
+    from PIL import Image
+
+    small = image.convert("L").resize((_SAMPLE_SIZE, _SAMPLE_SIZE), Image.LANCZOS)
+    pixels = list(small.getdata())
+    rows = [pixels[i * _SAMPLE_SIZE:(i + 1) * _SAMPLE_SIZE] for i in range(_SAMPLE_SIZE)]
+    # Separable 2D DCT, keeping only the lowest 8x8 frequencies
+    row_dct = [[sum(c * p for c, p in zip(_COSINES[u], row)) for u in range(_HASH_SIZE)] for row in rows]
+    coefficients = [
+        sum(_COSINES[v][y] * row_dct[y][u] for y in range(_SAMPLE_SIZE))
+        for v in range(_HASH_SIZE) for u in range(_HASH_SIZE)
+    ]
+    # The DC term only reflects overall brightness, so it is left out of the median
+    median = sorted(coefficients[1:])[len(coefficients[1:]) // 2]
+    bits = 0
+    for coefficient in coefficients:
+        bits = (bits << 1) | (coefficient > median)
+    return f"{bits:016x}"
@@ -1,12 +1,108 @@
 from .AnchorBaseTool import AnchorBaseTool
+from .AnchorCache import make_cache_key
+from .AnchorScreenshotDerivatives import ScreenshotDerivatives
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Literal, Optional
+import base64
+import io
+import os
+import shutil
+import tempfile
+import uuid
+
+# Captures to a file-like target are staged in memory up to this size, then in a temporary file
+_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+
+class _Base64Sink:
+    """Base64-encodes chunks as they arrive, carrying over bytes that don't fill a 3-byte group"""
+
+    def __init__(self):
+        self.parts: list[bytes] = []
+        self.remainder = b""
+        self.size = 0
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        data = self.remainder + chunk
+        cut = len(data) - len(data) % 3
+        self.parts.append(base64.b64encode(data[:cut]))
+        self.remainder = data[cut:]
+
+    def abort(self) -> None:
+        pass
+
+    def finish(self) -> str:
+        self.parts.append(base64.b64encode(self.remainder))
+        return b"".join(self.parts).decode("ascii")
+
+
+class _BufferSink:
+    def __init__(self):
+        self.buffer = io.BytesIO()
+        self.size = 0
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        self.buffer.write(chunk)
+
+    def abort(self) -> None:
+        pass
+
+    def finish(self) -> bytes:
+        return self.buffer.getvalue()
+
+
+class _FileSink:
+    """Writes chunks to a path (a directory gets a unique file name) or to a binary file-like object
+
+    A file-like target only receives the capture once it streamed completely, so a failed attempt
+    leaves nothing behind for the retry to append to.
+    """
+
+    def __init__(self, target):
+        self.size = 0
+        if isinstance(target, (str, os.PathLike)):
+            path = os.fspath(target)
+            if os.path.isdir(path):
+                path = os.path.join(path, f"screenshot-{uuid.uuid4().hex}.png")
+            self.path = path
+            self.file = open(path, "wb")
+        else:
+            self.path = None
+            self.target = target
+            self.file = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES)
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        self.file.write(chunk)
+
+    def abort(self) -> None:
+        self.file.close()
+        if self.path is not None:
+            os.remove(self.path)
+
+    def finish(self) -> str:
+        if self.path is None:
+            self.file.seek(0)
+            shutil.copyfileobj(self.file, self.target)
+            self.file.close()
+            return f"Screenshot written ({self.size} bytes)"
+        self.file.close()
+        return f"Screenshot saved to {self.path} ({self.size} bytes)"
+
 
 class AnchorScreenshotTool(AnchorBaseTool, BaseTool):
     name: str = "anchor_screenshot_tool"
     description: str = "Take a screenshot of a webpage using Anchor Browser"
     client_function_name: str = "screenshot_webpage"
+    # "text" keeps the legacy decoded-string output; the other modes stream the image in chunks
+    output_mode: Literal["text", "base64", "bytes", "file"] = "text"
+    output_target: Any = None  # Path, directory or binary file-like object used by "file" mode
+    chunk_size: int = 64 * 1024
+    # Renditions and a perceptual hash computed locally from each capture; needs "bytes" or "base64" mode
+    derivatives: ScreenshotDerivatives | None = None
 
     class InputSchema(BaseModel):
         url: str = Field(description="The URL of the webpage to screenshot")
@@ -17,5 +113,95 @@ class AnchorScreenshotTool(AnchorBaseTool, BaseTool):
         scroll_all_content: Optional[bool] = Field(default=None, description="Whether to scroll all content")
         capture_full_height: Optional[bool] = Field(default=None, description="Whether to capture full height")
         s3_target_address: Optional[str] = Field(default=None, description="S3 target address for saving")
-    
-    args_schema: type[BaseModel] = InputSchema
\ No newline at end of file
+
+    args_schema: type[BaseModel] = InputSchema
+
+    def _open_sink(self):
+        if self.output_mode == "base64":
+            return _Base64Sink()
+        if self.output_mode == "bytes":
+            return _BufferSink()
+        if self.output_target is None:
+            raise ValueError("output_target must be set when output_mode is 'file'")
+        return _FileSink(self.output_target)
+
+    def _invoke_client(self, client, function_name: str, request_body: dict):
+        if self.output_mode == "text":
+            return client.tools.screenshot_webpage(**request_body).text()
+        with client.tools.with_streaming_response.screenshot_webpage(**request_body) as response:
+            sink = self._open_sink()
+            try:
+                for chunk in response.iter_bytes(self.chunk_size):
+                    sink.write(chunk)
+            except BaseException:
+                sink.abort()
+                raise
+            return sink.finish()
+
+    async def _ainvoke_client(self, client, function_name: str, request_body: dict):
+        if self.output_mode == "text":
+            response = await client.tools.screenshot_webpage(**request_body)
+            return await response.text()
+        async with client.tools.with_streaming_response.screenshot_webpage(**request_body) as response:
+            sink = self._open_sink()
+            try:
+                async for chunk in response.iter_bytes(self.chunk_size):
+                    sink.write(chunk)
+            except BaseException:
+                sink.abort()
+                raise
+            return sink.finish()
+
+    def _cache_key(self, function_name: str, request_body: dict) -> str | None:
+        # A cached result would skip writing the file, so "file" mode always captures
+        if self.output_mode == "file":
+            return None
+        return super()._cache_key(function_name, self._keyed_body(request_body))
+
+    def _coalesce_key(self, function_name: str, request_body: dict) -> str | None:
+        if self.output_mode == "file":
+            return None
+        return super()._coalesce_key(function_name, self._keyed_body(request_body))
+
+    def _keyed_body(self, request_body: dict) -> dict:
+        # The same capture comes back as text, base64 or bytes, so only calls formatting it alike share one
+        return {**request_body, "output_mode": self.output_mode, "chunk_size": self.chunk_size}
+
+    def _run(self, **kwargs):
+        self._check_derivatives()
+        capture = super()._run(**kwargs)
+        if self.derivatives is None:
+            return capture
+        cache_key = self._derivatives_cache_key(kwargs)
+        derived = self._cache_get(cache_key)
+        if derived is None:
+            derived = self.derivatives.derive(self._capture_bytes(capture))
+            self._cache_set(cache_key, derived)
+        return {"screenshot": capture, **derived}
+
+    async def _arun(self, **kwargs):
+        self._check_derivatives()
+        capture = await super()._arun(**kwargs)
+        if self.derivatives is None:
+            return capture
+        cache_key = self._derivatives_cache_key(kwargs)
+        derived = self._cache_get(cache_key)
+        if derived is None:
+            derived = await self.derivatives.aderive(self._capture_bytes(capture))
+            self._cache_set(cache_key, derived)
+        return {"screenshot": capture, **derived}
+
+    def _check_derivatives(self) -> None:
+        # Checked before capturing, so a misconfigured tool doesn't pay for a screenshot
+        if self.derivatives is not None and self.output_mode not in ("bytes", "base64"):
+            raise ValueError(f"derivatives need output_mode 'bytes' or 'base64', not {self.output_mode!r}")
+
+    def _capture_bytes(self, capture) -> bytes:
+        return capture if self.output_mode == "bytes" else base64.b64decode(capture)
+
+    def _derivatives_cache_key(self, kwargs: dict) -> str | None:
+        # Keyed by the capture request plus what is derived, so each set of renditions is cached once
+        if self.cache is None:
+            return None
+        request_body = {k: v for k, v in kwargs.items() if v is not None}
+        return make_cache_key(f"{self._key_namespace()}:derivatives", {**request_body, "derivatives": self.derivatives.spec()})
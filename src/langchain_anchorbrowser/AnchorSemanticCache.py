@@ -0,0 +1,197 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable
+import asyncio
+import hashlib
+import math
+import re
+import threading
+import time
+
+from .AnchorCache import normalize_url
+from .AnchorStructuredOutput import schema_hash
+
+# Embeds a prompt: a callable returning a vector, or a LangChain Embeddings object
+Embedder = Callable[[str], list[float]]
+
+_WORD = re.compile(r"\w+")
+# Words that change how a prompt is phrased but not what it asks for
+STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "can", "could", "do", "does", "find", "for", "from", "get", "give", "in", "is",
+    "it", "me", "of", "on", "page", "please", "return", "show", "tell", "that", "the", "this", "to", "what",
+    "which", "you",
+})
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case, punctuation and whitespace-insensitive form of a prompt, used for exact matches"""
+    return " ".join(_WORD.findall(prompt.casefold()))
+
+
+class HashingEmbedder:
+    """Dependency-free lexical embedder: hashed word and character trigram counts
+
+    Catches rewordings that share most of their words ("get the price" vs "what's the price?").
+    For paraphrases with different words, pass a real model, e.g. OpenAIEmbeddings().
+    """
+
+    def __init__(self, dimensions: int = 512, stop_words: frozenset = STOP_WORDS):
+        self.dimensions = dimensions
+        self.stop_words = stop_words
+
+    def __call__(self, text: str) -> list[float]:
+        vector = [0.0] * self.dimensions
+        words = [word for word in _WORD.findall(text.casefold()) if word not in self.stop_words]
+        features = words + [f"#{word[i:i + 3]}" for word in words for i in range(max(len(word) - 2, 1))]
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            # Words weigh more than their trigrams
+            vector[bucket] += (1.0 if digest[4] & 1 else -1.0) * (1.0 if feature[0] != "#" else 0.5)
+        return vector
+
+
+def _unit(vector: list[float]) -> list[float]:
+    norm = math.sqrt(sum(value * value for value in vector))
+    return [value / norm for value in vector] if norm else list(vector)
+
+
+@dataclass
+class _Entry:
+    partition: tuple
+    prompt: str
+    vector: list[float]
+    value: Any
+    expires_at: float | None
+
+
+class SemanticTaskCache:
+    """In-process cache of web task results that also answers near-identical prompts
+
+    Entries are partitioned by tool, start URL and output schema, so a match never crosses
+    pages or result shapes. A lookup first tries the normalized prompt exactly, then the entry
+    in its partition whose prompt embedding is most similar, if its cosine similarity is at
+    least threshold. Values are returned as stored, without a copy.
+    """
+
+    def __init__(self, embedder: Embedder | Any | None = None, threshold: float = 0.9,
+                 ttl: float | None = 3600.0, max_size: int = 1024):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        self.embedder = embedder if embedder is not None else HashingEmbedder()
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()  # (partition, prompt) -> entry, LRU first
+        self._partitions: dict[tuple, dict[str, _Entry]] = {}
+        self._stats = {"hits": 0, "near_hits": 0, "misses": 0}
+
+    @staticmethod
+    def partition(namespace: str, url: str | None, output_schema: dict | None) -> tuple:
+        return (namespace, normalize_url(url) if url else "", schema_hash(output_schema) if output_schema else "")
+
+    def get(self, partition: tuple, prompt: str):
+        prompt = normalize_prompt(prompt)
+        found, value = self._get_exact(partition, prompt)
+        if found or not self._has_candidates(partition):
+            return value
+        return self._get_near(partition, self._embed(prompt))
+
+    async def aget(self, partition: tuple, prompt: str):
+        prompt = normalize_prompt(prompt)
+        found, value = self._get_exact(partition, prompt)
+        if found or not self._has_candidates(partition):
+            return value
+        return self._get_near(partition, await self._aembed(prompt))
+
+    def set(self, partition: tuple, prompt: str, value) -> None:
+        prompt = normalize_prompt(prompt)
+        self._store(partition, prompt, self._embed(prompt), value)
+
+    async def aset(self, partition: tuple, prompt: str, value) -> None:
+        prompt = normalize_prompt(prompt)
+        self._store(partition, prompt, await self._aembed(prompt), value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._partitions.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = sum(stats.values())
+        stats["hit_rate"] = (stats["hits"] + stats["near_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def _embed(self, prompt: str) -> list[float]:
+        if hasattr(self.embedder, "embed_query"):
+            return _unit(self.embedder.embed_query(prompt))
+        return _unit(self.embedder(prompt))
+
+    async def _aembed(self, prompt: str) -> list[float]:
+        if hasattr(self.embedder, "aembed_query"):
+            return _unit(await self.embedder.aembed_query(prompt))
+        # A model call would block the event loop
+        return await asyncio.get_running_loop().run_in_executor(None, self._embed, prompt)
+
+    def _get_exact(self, partition: tuple, prompt: str) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._live(self._entries.get((partition, prompt)))
+            if entry is None:
+                return False, None
+            self._entries.move_to_end((partition, prompt))
+            self._stats["hits"] += 1
+            return True, entry.value
+
+    def _has_candidates(self, partition: tuple) -> bool:
+        with self._lock:
+            if self._partitions.get(partition):
+                return True
+            self._stats["misses"] += 1
+            return False
+
+    def _get_near(self, partition: tuple, vector: list[float]):
+        with self._lock:
+            best, best_score = None, self.threshold
+            for entry in list(self._partitions.get(partition, {}).values()):
+                if self._live(entry) is None:
+                    continue
+                score = sum(a * b for a, b in zip(vector, entry.vector))
+                if score >= best_score:
+                    best, best_score = entry, score
+            if best is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end((partition, best.prompt))
+            self._stats["near_hits"] += 1
+            return best.value
+
+    def _store(self, partition: tuple, prompt: str, vector: list[float], value) -> None:
+        if value is None:
+            return
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        entry = _Entry(partition, prompt, vector, value, expires_at)
+        with self._lock:
+            self._entries[(partition, prompt)] = entry
+            self._entries.move_to_end((partition, prompt))
+            self._partitions.setdefault(partition, {})[prompt] = entry
+            while len(self._entries) > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self._forget(evicted)
+
+    def _live(self, entry: _Entry | None) -> _Entry | None:
+        """The entry, or None once it expired (it is dropped then); callers hold the lock"""
+        if entry is None or entry.expires_at is None or entry.expires_at > time.monotonic():
+            return entry
+        self._entries.pop((entry.partition, entry.prompt), None)
+        self._forget(entry)
+        return None
+
+    def _forget(self, entry: _Entry) -> None:
+        prompts = self._partitions.get(entry.partition)
+        if prompts is not None and prompts.get(entry.prompt) is entry:
+            del prompts[entry.prompt]
+            if not prompts:
+                del self._partitions[entry.partition]
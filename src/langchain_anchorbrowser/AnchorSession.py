@@ -0,0 +1,98 @@
+from contextvars import ContextVar
+from pydantic import SecretStr
+import asyncio
+import threading
+
+from .AnchorSessionPool import PooledSession
+
+# LangChain run config key that pins a single tool call to an existing session
+CONFIG_SESSION_KEY = "anchor_session_id"
+
+_current_session: ContextVar["AnchorSession | None"] = ContextVar("anchor_session", default=None)
+
+
+def current_session() -> "AnchorSession | None":
+    """The innermost AnchorSession entered in this thread or task, if any"""
+    return _current_session.get()
+
+
+class AnchorSession:
+    """Pins consecutive tool calls to one live browser session, e.g.
+
+        with AnchorSession() as session:
+            content_tool.invoke({"url": url})
+            screenshot_tool.invoke({"url": url})
+            web_task_tool.invoke({"prompt": "Click the first link"})  # Runs on the page already loaded
+
+    Works with `async with` as well. A new session is leased from the shared pool on entry and
+    ended on exit; pass session_id to pin to an existing session instead, which is left running
+    unless end_on_exit is set. Calls inside the block are serialized, skip the cache and are never
+    coalesced, since they depend on the browser's state. Only tools using the same API key as the
+    session are pinned.
+    """
+
+    def __init__(self, api_key: str | SecretStr | None = None, session_id: str | None = None,
+                 end_on_exit: bool | None = None):
+        self.api_key = SecretStr(api_key) if isinstance(api_key, str) else api_key
+        self.end_on_exit = session_id is None if end_on_exit is None else end_on_exit
+        # created_at=0 so metrics never report a pinned call as having created its session
+        self.session = PooledSession(id=session_id, created_at=0.0) if session_id else None
+        self.lock = threading.Lock()  # Serializes sync calls on the browser
+        self._alock = None
+        self._pool = None
+        self._token = None
+
+    @property
+    def id(self) -> str | None:
+        return None if self.session is None else self.session.id
+
+    @property
+    def live_view_url(self) -> str | None:
+        return None if self.session is None else self.session.live_view_url
+
+    @property
+    def anchor_client(self):
+        from .AnchorBaseTool import AnchorClient
+
+        return AnchorClient(self.api_key)
+
+    @property
+    def alock(self) -> asyncio.Lock:
+        """Serializes async calls on the browser; created on first use so it binds to the running loop"""
+        if self._alock is None:
+            self._alock = asyncio.Lock()
+        return self._alock
+
+    def pins(self, anchor_client) -> bool:
+        """Whether calls made through anchor_client should run on this session"""
+        return self.session is not None and anchor_client.tenant == self.anchor_client.tenant
+
+    def __enter__(self) -> "AnchorSession":
+        if self.session is None:
+            self._pool = self.anchor_client.get_session_pool()
+            self.session = self._pool.acquire()
+        self._token = _current_session.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _current_session.reset(self._token)
+        if self._pool is not None:
+            self._pool.release(self.session, discard=self.end_on_exit)
+            self.session, self._pool = None, None
+        elif self.end_on_exit:
+            self.anchor_client.get_session_pool()._end_session(self.session)
+
+    async def __aenter__(self) -> "AnchorSession":
+        if self.session is None:
+            self._pool = self.anchor_client.get_async_session_pool()
+            self.session = await self._pool.acquire()
+        self._token = _current_session.set(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        _current_session.reset(self._token)
+        if self._pool is not None:
+            await self._pool.release(self.session, discard=self.end_on_exit)
+            self.session, self._pool = None, None
+        elif self.end_on_exit:
+            await self.anchor_client.get_async_session_pool()._end_session(self.session)
@@ -0,0 +1,456 @@
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+import asyncio
+import logging
+import threading
+import time
+
+from .AnchorCancellation import time_left
+from .AnchorResilience import CircuitBreaker, RetryPolicy, acall_with_retry, call_with_retry
+
+# Session statuses reported by the API that mean the browser can no longer be used
+DEAD_SESSION_STATUSES = {"ended", "failed", "terminated", "stopped", "error"}
+# Shortest pause between two reaper passes, so a tiny idle_ttl doesn't make the reaper spin
+MIN_REAP_INTERVAL = 0.05
+
+
+@dataclass
+class PooledSession:
+    """A remote browser session owned by an AnchorSessionPool"""
+    id: str
+    live_view_url: str | None = None
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    last_checked: float = field(default_factory=time.monotonic)
+
+
+class _SessionPoolState:
+    """Bookkeeping shared by the sync and async pools; callers hold the pool's lock"""
+
+    def __init__(
+        self,
+        client,
+        min_size: int = 0,
+        max_size: int = 10,
+        idle_ttl: float = 300.0,
+        health_check_interval: float = 60.0,
+        acquire_timeout: float | None = None,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min_size={min_size}, max_size={max_size}")
+        self.client = client
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        # Creating a session has no side effects, so it is always safe to retry
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.logger = logging.getLogger(__name__)
+        self._idle: list[PooledSession] = []  # Most recently used last
+        self._leased: dict[str, PooledSession] = {}
+        self._creating = 0
+        self._closed = False
+        self._reaper = None  # Started with the first idle session; ends idle sessions that outlived idle_ttl
+
+    @property
+    def size(self) -> int:
+        """Number of sessions currently owned by the pool (idle, leased or being created)"""
+        return self._size()
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    @property
+    def leased_count(self) -> int:
+        return len(self._leased)
+
+    def _size(self) -> int:
+        return len(self._idle) + len(self._leased) + self._creating
+
+    def _deadline(self, timeout: float | None) -> float | None:
+        timeout = self.acquire_timeout if timeout is None else timeout
+        return None if timeout is None else time.monotonic() + timeout
+
+    def _remaining(self, deadline: float | None) -> float | None:
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            raise TimeoutError(f"Timed out waiting for a browser session (max_size={self.max_size})")
+        return remaining
+
+    def _reap_interval(self) -> float:
+        return max(self.idle_ttl, MIN_REAP_INTERVAL)
+
+    def _pop_expired(self, now: float) -> list[PooledSession]:
+        # Idle list is ordered by last use, so the oldest sessions are at the front
+        expired = []
+        while (
+            self._idle
+            and self._size() > self.min_size
+            and now - self._idle[0].last_used > self.idle_ttl
+        ):
+            expired.append(self._idle.pop(0))
+        return expired
+
+    def _try_checkout(self, expired: list[PooledSession]) -> tuple[bool, PooledSession | None]:
+        """Take an idle session or reserve a creation slot; returns (ready, session)"""
+        if self._closed:
+            raise RuntimeError("Anchor session pool is closed")
+        expired.extend(self._pop_expired(time.monotonic()))
+        if self._idle:
+            session = self._idle.pop()
+            self._leased[session.id] = session
+            return True, session
+        if self._size() < self.max_size:
+            self._creating += 1
+            return True, None
+        return False, None
+
+    def _check_in(self, session: PooledSession, discard: bool) -> bool:
+        """Record a released session; returns whether it was kept for reuse"""
+        self._leased.pop(session.id, None)
+        keep = not discard and not self._closed
+        if keep:
+            session.last_used = time.monotonic()
+            self._idle.append(session)
+        return keep
+
+    def _created(self, session: PooledSession | None, leased: bool) -> None:
+        """Settle a reserved creation slot once sessions.create() returned or failed"""
+        self._creating -= 1
+        if session is None:
+            return
+        if leased:
+            self._leased[session.id] = session
+        else:
+            self._idle.append(session)
+
+    def _reserve_spare(self, wanted: int) -> bool:
+        """Reserve a creation slot for an idle session unless wanted are idle already or the pool is full"""
+        if self._closed or len(self._idle) >= wanted or self._size() >= self.max_size:
+            return False
+        self._creating += 1
+        return True
+
+    def _take_idle(self, session_id: str) -> PooledSession | None:
+        for index, session in enumerate(self._idle):
+            if session.id == session_id:
+                return self._idle.pop(index)
+        return None
+
+    def _needs_health_check(self, session: PooledSession) -> bool:
+        return time.monotonic() - session.last_checked >= self.health_check_interval
+
+    def _session_from_response(self, response) -> PooledSession:
+        self.logger.info(f"Session Information: {response.data}")
+        return PooledSession(id=response.data.id, live_view_url=response.data.live_view_url)
+
+    def _is_alive(self, session: PooledSession, statuses) -> bool:
+        status = next(
+            (item.status for item in statuses.data.items if item.session_id == session.id),
+            None,
+        )
+        session.last_checked = time.monotonic()
+        return status is not None and status.lower() not in DEAD_SESSION_STATUSES
+
+
+class AnchorSessionPool(_SessionPoolState):
+    """Thread-safe pool of warm browser sessions shared by all Anchor tools"""
+
+    def __init__(self, client, **pool_options):
+        super().__init__(client, **pool_options)
+        self._condition = threading.Condition()
+        self._reaper_stop = threading.Event()
+
+    def warm(self) -> None:
+        """Create sessions until the pool holds at least min_size of them"""
+        while True:
+            with self._condition:
+                if self._closed or self._size() >= self.min_size:
+                    return
+                self._creating += 1
+            self._create_session(leased=False)
+
+    def spare(self, wanted: int = 1) -> PooledSession | None:
+        """Create an idle session ahead of an expected acquire(), unless wanted are idle already
+
+        Returns the new session, or None when nothing was created (enough idle, or the pool is full).
+        """
+        with self._condition:
+            if not self._reserve_spare(wanted):
+                return None
+        return self._create_session(leased=False)
+
+    def evict(self, session_id: str) -> bool:
+        """End an idle session now; returns False if it is leased or no longer in the pool"""
+        with self._condition:
+            session = self._take_idle(session_id)
+        if session is None:
+            return False
+        self._end_session(session)
+        return True
+
+    def acquire(self, timeout: float | None = None, deadline: float | None = None) -> PooledSession:
+        """Lease a session, reusing a warm one when available
+
+        timeout bounds the wait for a free slot; deadline, the calling tool's, also bounds creating a session.
+        """
+        wait_deadline = self._deadline(timeout)
+        while True:
+            session = self._checkout(wait_deadline)
+            if session is None:
+                return self._create_session(leased=True, deadline=deadline)
+            if self._is_healthy(session):
+                return session
+            self.logger.info(f"Discarding unhealthy session {session.id}")
+            self.release(session, discard=True)
+
+    def release(self, session: PooledSession, discard: bool = False) -> None:
+        """Hand a leased session back to the pool, or end it if discard is set"""
+        with self._condition:
+            keep = self._check_in(session, discard)
+            self._condition.notify()
+            if keep:
+                self._start_reaper()
+        if not keep:
+            self._end_session(session)
+
+    @contextmanager
+    def lease(self, timeout: float | None = None, deadline: float | None = None):
+        """Context manager that acquires a session and always hands it back"""
+        session = self.acquire(timeout=timeout, deadline=deadline)
+        try:
+            yield session
+        except BaseException:
+            # A failed call may leave the browser in an unknown state
+            self.release(session, discard=True)
+            raise
+        else:
+            self.release(session)
+
+    def prune(self) -> None:
+        """End idle sessions that outlived idle_ttl"""
+        with self._condition:
+            expired = self._pop_expired(time.monotonic())
+        for session in expired:
+            self._end_session(session)
+
+    def close(self) -> None:
+        """End all idle sessions; leased sessions are ended when released"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        self._reaper_stop.set()
+        for session in idle:
+            self._end_session(session)
+
+    def _start_reaper(self) -> None:
+        # Without it, idle sessions past idle_ttl keep running (and billing) until the next acquire
+        if self._reaper is None and not self._closed:
+            self._reaper = threading.Thread(target=self._reap, name="anchor-session-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap(self) -> None:
+        while not self._reaper_stop.wait(self._reap_interval()):
+            self.prune()
+
+    def _checkout(self, deadline: float | None) -> PooledSession | None:
+        """Take an idle session, or reserve a slot for a new one (returns None)"""
+        expired = []
+        try:
+            with self._condition:
+                while True:
+                    ready, session = self._try_checkout(expired)
+                    if ready:
+                        return session
+                    self._condition.wait(self._remaining(deadline))
+        finally:
+            for session in expired:
+                self._end_session(session)
+
+    def _create_session(self, leased: bool, deadline: float | None = None) -> PooledSession:
+        session = None
+        try:
+            response = call_with_retry(lambda: self._guarded_create(deadline), self.retry_policy, deadline)
+            session = self._session_from_response(response)
+            return session
+        finally:
+            with self._condition:
+                self._created(session, leased)
+                self._condition.notify()
+                if session is not None and not leased:
+                    self._start_reaper()
+
+    def _guarded_create(self, deadline: float | None = None):
+        # Each attempt's request gets whatever time the deadline leaves
+        options = {} if deadline is None else {"timeout": time_left(deadline)}
+        if self.circuit_breaker is None:
+            return self.client.sessions.create(**options)
+        return self.circuit_breaker.call(lambda: self.client.sessions.create(**options))
+
+    def _is_healthy(self, session: PooledSession) -> bool:
+        if not self._needs_health_check(session):
+            return True
+        try:
+            return self._is_alive(session, self.client.sessions.all.status())
+        except Exception as e:
+            self.logger.warning(f"Health check failed for session {session.id}: {e}")
+            return False
+
+    def _end_session(self, session: PooledSession) -> None:
+        try:
+            self.client.sessions.delete(session.id)
+            self.logger.info(f"Ended session {session.id}")
+        except Exception as e:
+            self.logger.warning(f"Failed to end session {session.id}: {e}")
+
+
+class AsyncAnchorSessionPool(_SessionPoolState):
+    """asyncio counterpart of AnchorSessionPool, bound to a single event loop"""
+
+    def __init__(self, client, **pool_options):
+        super().__init__(client, **pool_options)
+        self._condition = asyncio.Condition()
+
+    async def warm(self) -> None:
+        """Create sessions until the pool holds at least min_size of them"""
+        while not self._closed and self._size() < self.min_size:
+            self._creating += 1
+            await self._create_session(leased=False)
+
+    async def spare(self, wanted: int = 1) -> PooledSession | None:
+        """Create an idle session ahead of an expected acquire(), unless wanted are idle already"""
+        if not self._reserve_spare(wanted):
+            return None
+        return await self._create_session(leased=False)
+
+    async def evict(self, session_id: str) -> bool:
+        """End an idle session now; returns False if it is leased or no longer in the pool"""
+        session = self._take_idle(session_id)
+        if session is None:
+            return False
+        await self._end_session(session)
+        return True
+
+    async def acquire(self, timeout: float | None = None) -> PooledSession:
+        """Lease a session, reusing a warm one when available"""
+        deadline = self._deadline(timeout)
+        while True:
+            session = await self._checkout(deadline)
+            if session is None:
+                return await self._create_session(leased=True)
+            if await self._is_healthy(session):
+                return session
+            self.logger.info(f"Discarding unhealthy session {session.id}")
+            await self.release(session, discard=True)
+
+    async def release(self, session: PooledSession, discard: bool = False) -> None:
+        """Hand a leased session back to the pool, or end it if discard is set"""
+        async with self._condition:
+            keep = self._check_in(session, discard)
+            self._condition.notify()
+        if keep:
+            self._start_reaper()
+        if not keep:
+            await self._end_session(session)
+
+    @asynccontextmanager
+    async def lease(self, timeout: float | None = None):
+        """Async context manager that acquires a session and always hands it back"""
+        session = await self.acquire(timeout=timeout)
+        try:
+            yield session
+        except BaseException:
+            # A failed or cancelled call may leave the browser in an unknown state
+            await self.release(session, discard=True)
+            raise
+        else:
+            await self.release(session)
+
+    async def prune(self) -> None:
+        """End idle sessions that outlived idle_ttl"""
+        for session in self._pop_expired(time.monotonic()):
+            await self._end_session(session)
+
+    async def aclose(self) -> None:
+        """End all idle sessions; leased sessions are ended when released"""
+        idle = self.detach_idle()
+        if self._reaper is not None:
+            self._reaper.cancel()
+        async with self._condition:
+            self._condition.notify_all()
+        await asyncio.gather(*(self._end_session(session) for session in idle))
+
+    def detach_idle(self) -> list[PooledSession]:
+        """Close the pool without any I/O and return its idle sessions for the caller to end"""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        return idle
+
+    def _start_reaper(self) -> None:
+        if self._reaper is None and not self._closed:
+            self._reaper = asyncio.ensure_future(self._reap())
+
+    async def _reap(self) -> None:
+        # detach_idle() may run on another thread, so the task checks _closed rather than being cancelled there
+        while not self._closed:
+            await asyncio.sleep(self._reap_interval())
+            await self.prune()
+
+    async def _checkout(self, deadline: float | None) -> PooledSession | None:
+        """Take an idle session, or reserve a slot for a new one (returns None)"""
+        expired = []
+        try:
+            async with self._condition:
+                while True:
+                    ready, session = self._try_checkout(expired)
+                    if ready:
+                        return session
+                    remaining = self._remaining(deadline)
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass  # _remaining() raises on the next iteration
+        finally:
+            for session in expired:
+                await self._end_session(session)
+
+    async def _create_session(self, leased: bool) -> PooledSession:
+        session = None
+        try:
+            session = self._session_from_response(
+                await acall_with_retry(self._guarded_create, self.retry_policy)
+            )
+            return session
+        finally:
+            self._created(session, leased)
+            if session is not None and not leased:
+                self._start_reaper()
+            async with self._condition:
+                self._condition.notify()
+
+    async def _guarded_create(self):
+        if self.circuit_breaker is None:
+            return await self.client.sessions.create()
+        return await self.circuit_breaker.acall(self.client.sessions.create)
+
+    async def _is_healthy(self, session: PooledSession) -> bool:
+        if not self._needs_health_check(session):
+            return True
+        try:
+            return self._is_alive(session, await self.client.sessions.all.status())
+        except Exception as e:
+            self.logger.warning(f"Health check failed for session {session.id}: {e}")
+            return False
+
+    async def _end_session(self, session: PooledSession) -> None:
+        try:
+            await self.client.sessions.delete(session.id)
+            self.logger.info(f"Ended session {session.id}")
+        except Exception as e:
+            self.logger.warning(f"Failed to end session {session.id}: {e}")
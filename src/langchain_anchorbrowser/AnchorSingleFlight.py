@@ -0,0 +1,131 @@
+from .AnchorCancellation import CallCancelledError, CancellationToken, time_left
+from typing import Awaitable, Callable
+import asyncio
+import threading
+
+# How often a waiting follower checks its CancellationToken
+CANCEL_POLL_INTERVAL = 0.05
+# Errors a call raises when its own caller's deadline or cancellation ended it; they aren't shared
+CALLER_LIMIT_ERRORS = (TimeoutError, CallCancelledError)
+
+
+class _Call:
+    """An in-flight call whose outcome is shared with every caller of the same key"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls from threads into one execution"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable, deadline: float | None = None,
+           cancel_token: CancellationToken | None = None):
+        """Run fn() unless a call with the same key is already in flight, then share its result
+
+        A caller that joins an in-flight call waits at most until its own deadline, and stops
+        waiting once its token is cancelled, raising TimeoutError or CallCancelledError. When the
+        call it joined ended on the leader's deadline or cancellation, it runs fn() itself instead.
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+            if leader:
+                break
+            self._wait(call, deadline, cancel_token)
+            if isinstance(call.error, CALLER_LIMIT_ERRORS):
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    @staticmethod
+    def _wait(call: _Call, deadline: float | None, cancel_token: CancellationToken | None) -> None:
+        while True:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            timeout = time_left(deadline)
+            if cancel_token is not None:
+                timeout = CANCEL_POLL_INTERVAL if timeout is None else min(timeout, CANCEL_POLL_INTERVAL)
+            if call.done.wait(timeout):
+                return
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+class _AsyncCall:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """asyncio counterpart of SingleFlight, bound to a single event loop"""
+
+    def __init__(self):
+        self._calls: dict[str, _AsyncCall] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable], deadline: float | None = None):
+        """Await fn() unless a call with the same key is already in flight, then share its result
+
+        Each caller waits at most until its own deadline, then raises TimeoutError. When the call
+        it joined ended on the deadline of the caller that started it, it runs fn() itself instead.
+        """
+        while True:
+            remaining = time_left(deadline)
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _AsyncCall(asyncio.ensure_future(fn()))
+                call.task.add_done_callback(lambda _, call=call: self._forget(key, call))
+
+            call.waiters += 1
+            try:
+                # Shield so one cancelled caller does not cancel the call for everybody else
+                return await asyncio.wait_for(asyncio.shield(call.task), remaining)
+            except BaseException as e:
+                if not leader and not isinstance(e, asyncio.CancelledError) and _ended_by_caller_limit(call.task):
+                    continue
+                if isinstance(e, (asyncio.CancelledError, asyncio.TimeoutError)):
+                    # The last caller to give up takes the call down with it
+                    if call.waiters == 1 and not call.task.done():
+                        call.task.cancel()
+                    if isinstance(e, asyncio.TimeoutError) and not call.task.done():
+                        raise TimeoutError("Anchor Browser call exceeded its deadline") from None
+                raise
+            finally:
+                call.waiters -= 1
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def _forget(self, key: str, call: _AsyncCall) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+
+def _ended_by_caller_limit(task: asyncio.Task) -> bool:
+    return task.done() and not task.cancelled() and isinstance(task.exception(), CALLER_LIMIT_ERRORS)
@@ -0,0 +1,197 @@
+from dataclasses import dataclass
+from typing import Any, Iterable, Literal
+from uuid import UUID
+import asyncio
+import logging
+import threading
+
+from langchain_core.callbacks import BaseCallbackHandler
+from pydantic import SecretStr
+
+from .AnchorBaseTool import AnchorClient
+
+# Default names of the tools in this package
+ANCHOR_TOOL_NAMES = frozenset({
+    "anchor_content_tool",
+    "anchor_screenshot_tool",
+    "simple_anchor_web_task_tool",
+    "advanced_anchor_web_task_tool",
+})
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Speculation:
+    run_id: UUID
+    pool: Any = None
+    session_id: str | None = None
+    outcome: str | None = None  # "hit" or "miss" once the LLM run ended
+    done: bool = False  # Session creation finished (or was skipped)
+
+
+def _tool_names(tools: Iterable[Any]) -> list[str]:
+    # OpenAI-style {"function": {"name": ...}} and Anthropic-style {"name": ...} tool definitions
+    names = []
+    for tool in tools or ():
+        if isinstance(tool, dict):
+            names.append(tool.get("name") or (tool.get("function") or {}).get("name"))
+    return names
+
+
+class SpeculativeSessionHandler(BaseCallbackHandler):
+    """Starts a browser session while the LLM is still deciding to call an Anchor tool
+
+    A streamed tool-call chunk naming one of tool_names triggers provisioning as soon as the name
+    arrives, before the arguments finish streaming; with eager=True, a chat model started with such
+    a tool bound triggers it already. The session is created idle in the pool the tools lease from,
+    so the tool call that follows skips sessions.create(). When the LLM run ends without calling
+    the tool, the session is recycled (left idle until the pool's idle_ttl) or, with on_miss="end",
+    ended right away. Pass the handler in callbacks=[...] of the model or the agent.
+    """
+
+    run_inline = True  # Async runs call it on the event loop, where the loop's async pool is used
+
+    def __init__(self, tool_names: Iterable[str] = ANCHOR_TOOL_NAMES, api_key: str | SecretStr | None = None,
+                 eager: bool = False, on_miss: Literal["recycle", "end"] = "recycle"):
+        if on_miss not in ("recycle", "end"):
+            raise ValueError(f"on_miss must be 'recycle' or 'end', got {on_miss!r}")
+        self.tool_names = frozenset(tool_names)
+        self.api_key = api_key
+        self.eager = eager
+        self.on_miss = on_miss
+        self._lock = threading.Lock()
+        self._pending: dict[UUID, list[_Speculation]] = {}
+        self._triggered: set[tuple[UUID, int]] = set()
+        self._workers: set = set()
+        self._stats = {"speculations": 0, "skipped": 0, "failed": 0, "hits": 0, "misses": 0, "unanticipated": 0}
+
+    @property
+    def anchor_client(self) -> AnchorClient:
+        return AnchorClient() if self.api_key is None else AnchorClient.for_api_key(self.api_key)
+
+    def stats(self) -> dict:
+        """Counters for tuning: hits and misses are LLM runs that did or did not call the tool after a
+        speculation, skipped ones found enough idle sessions (or a full pool), and unanticipated
+        tool calls had no speculation ahead of them"""
+        with self._lock:
+            stats = dict(self._stats)
+        decided = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / decided if decided else 0.0
+        return stats
+
+    def join(self, timeout: float | None = None) -> None:
+        """Wait for sync speculative sessions still being created"""
+        for worker in list(self._workers):
+            if isinstance(worker, threading.Thread):
+                worker.join(timeout)
+
+    def on_chat_model_start(self, serialized: dict[str, Any], messages, *, run_id: UUID, **kwargs: Any) -> None:
+        if not self.eager:
+            return
+        tools = (kwargs.get("invocation_params") or {}).get("tools")
+        if any(name in self.tool_names for name in _tool_names(tools)):
+            self._speculate(run_id, 0)
+
+    def on_llm_new_token(self, token: str, *, chunk=None, run_id: UUID, **kwargs: Any) -> None:
+        message = getattr(chunk, "message", None)
+        for tool_call in getattr(message, "tool_call_chunks", None) or ():
+            if tool_call.get("name") in self.tool_names:
+                self._speculate(run_id, tool_call.get("index") or 0)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        chosen = sum(
+            tool_call["name"] in self.tool_names
+            for generations in response.generations
+            for generation in generations
+            for tool_call in getattr(getattr(generation, "message", None), "tool_calls", None) or ()
+        )
+        self._settle(run_id, chosen)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._settle(run_id, 0)
+
+    def _speculate(self, run_id: UUID, index: int) -> None:
+        with self._lock:
+            if (run_id, index) in self._triggered:
+                return
+            self._triggered.add((run_id, index))
+            speculation = _Speculation(run_id)
+            self._pending.setdefault(run_id, []).append(speculation)
+            wanted = sum(len(speculations) for speculations in self._pending.values())
+            self._stats["speculations"] += 1
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            worker = threading.Thread(target=self._provision, args=(speculation, wanted), daemon=True)
+            self._workers.add(worker)
+            worker.start()
+        else:
+            worker = asyncio.ensure_future(self._aprovision(speculation, wanted))
+            self._workers.add(worker)
+            worker.add_done_callback(self._workers.discard)
+
+    def _provision(self, speculation: _Speculation, wanted: int) -> None:
+        try:
+            speculation.pool = self.anchor_client.get_session_pool()
+            session = speculation.pool.spare(wanted)
+        except Exception as e:
+            logger.warning(f"Speculative session failed: {e}")
+            session = None
+            self._count("failed")
+        else:
+            if session is None:
+                self._count("skipped")
+        try:
+            if self._provisioned(speculation, session):
+                speculation.pool.evict(session.id)
+        finally:
+            self._workers.discard(threading.current_thread())
+
+    async def _aprovision(self, speculation: _Speculation, wanted: int) -> None:
+        try:
+            speculation.pool = self.anchor_client.get_async_session_pool()
+            session = await speculation.pool.spare(wanted)
+        except Exception as e:
+            logger.warning(f"Speculative session failed: {e}")
+            session = None
+            self._count("failed")
+        else:
+            if session is None:
+                self._count("skipped")
+        if self._provisioned(speculation, session):
+            await speculation.pool.evict(session.id)
+
+    def _provisioned(self, speculation: _Speculation, session) -> bool:
+        """Record the created session; returns whether it has to be ended because the run missed already"""
+        with self._lock:
+            speculation.done = True
+            speculation.session_id = session.id if session is not None else None
+            return session is not None and speculation.outcome == "miss" and self.on_miss == "end"
+
+    def _settle(self, run_id: UUID, chosen: int) -> None:
+        with self._lock:
+            speculations = self._pending.pop(run_id, [])
+            self._triggered = {key for key in self._triggered if key[0] != run_id}
+            for position, speculation in enumerate(speculations):
+                speculation.outcome = "hit" if position < chosen else "miss"
+                self._stats["hits" if speculation.outcome == "hit" else "misses"] += 1
+            self._stats["unanticipated"] += max(chosen - len(speculations), 0)
+            # Sessions still being created are ended by their worker once they exist
+            to_end = [
+                speculation for speculation in speculations
+                if speculation.outcome == "miss" and speculation.done and speculation.session_id is not None
+            ] if self.on_miss == "end" else []
+        for speculation in to_end:
+            self._end(speculation)
+
+    def _end(self, speculation: _Speculation) -> None:
+        evicted = speculation.pool.evict(speculation.session_id)
+        if asyncio.iscoroutine(evicted):
+            worker = asyncio.ensure_future(evicted)
+            self._workers.add(worker)
+            worker.add_done_callback(self._workers.discard)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
@@ -0,0 +1,237 @@
+from collections import OrderedDict
+from typing import Any, Callable
+import hashlib
+import json
+import threading
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+# Checks a value at a JSON path and returns error messages; empty means valid
+_Check = Callable[[Any, str], list[str]]
+
+_JSON_TYPES = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    # JSON Schema counts a number with a zero fractional part, such as 1.0, as an integer
+    "integer": lambda v: (isinstance(v, int) and not isinstance(v, bool)) or (isinstance(v, float) and v.is_integer()),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+# Keywords that only make sense for JSON objects and arrays
+_STRUCTURED_KEYWORDS = ("properties", "required", "additionalProperties", "items", "minItems", "maxItems")
+
+
+class OutputValidationError(ValueError):
+    """A web task result that does not match its output schema"""
+
+    def __init__(self, errors: list[str]):
+        super().__init__("Web task result does not match the output schema: " + "; ".join(errors))
+        self.errors = errors
+
+
+def _check_one_of(options: list[_Check], value: Any, path: str) -> list[str]:
+    matches = sum(1 for option in options if not option(value, path))
+    if matches == 1:
+        return []
+    if matches == 0:
+        return [f"{path}: matches none of the allowed schemas"]
+    return [f"{path}: matches {matches} of the schemas where exactly one is allowed"]
+
+
+def schema_hash(schema: dict) -> str:
+    payload = json.dumps(schema, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class OutputValidator:
+    """Compiled validator for one output schema; validate() returns the typed result"""
+
+    json_schema: dict
+
+    def validate(self, data: Any) -> Any:
+        raise NotImplementedError
+
+
+class PydanticOutputValidator(OutputValidator):
+    """Validates into instances of a Pydantic model (or any type TypeAdapter supports)"""
+
+    def __init__(self, model):
+        self.model = model
+        self._adapter = TypeAdapter(model)
+        self.json_schema = self._adapter.json_schema()
+
+    def validate(self, data: Any) -> Any:
+        try:
+            if isinstance(data, str):
+                return self._adapter.validate_json(data)
+            return self._adapter.validate_python(data)
+        except ValidationError as e:
+            raise OutputValidationError(
+                [f"{'.'.join(map(str, error['loc'])) or '$'}: {error['msg']}" for error in e.errors()]
+            ) from e
+
+
+class JsonSchemaOutputValidator(OutputValidator):
+    """Validates plain JSON against a JSON Schema and returns it unchanged
+
+    Compiles the commonly used keywords: type, enum, const, properties, required,
+    additionalProperties, items, min/max(Length|Items|imum), anyOf, oneOf, allOf and local $refs.
+    Other keywords are ignored; use a Pydantic model for anything stricter.
+    """
+
+    def __init__(self, schema: dict):
+        self.json_schema = schema
+        self._refs: dict[str, _Check] = {}
+        self._check = self._compile(schema)
+        self._expects_json = _expects_json(schema)
+
+    def validate(self, data: Any) -> Any:
+        if isinstance(data, str) and self._expects_json:
+            try:
+                data = json.loads(data)
+            except ValueError as e:
+                raise OutputValidationError([f"$: expected JSON, got {data[:80]!r}"]) from e
+        errors = self._check(data, "$")
+        if errors:
+            raise OutputValidationError(errors)
+        return data
+
+    def _compile(self, schema: dict) -> _Check:
+        if not isinstance(schema, dict):
+            return lambda value, path: []
+        checks: list[_Check] = []
+        if "$ref" in schema:
+            checks.append(self._compile_ref(schema["$ref"]))
+        if "type" in schema:
+            types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+            matchers = [_JSON_TYPES[name] for name in types if name in _JSON_TYPES]
+            checks.append(lambda value, path: [] if any(match(value) for match in matchers)
+                          else [f"{path}: expected {' or '.join(types)}, got {type(value).__name__}"])
+        if "enum" in schema:
+            options = schema["enum"]
+            checks.append(lambda value, path: [] if value in options else [f"{path}: {value!r} is not one of {options}"])
+        if "const" in schema:
+            expected = schema["const"]
+            checks.append(lambda value, path: [] if value == expected else [f"{path}: expected {expected!r}"])
+        checks.extend(self._compile_object(schema))
+        if "items" in schema:
+            item_check = self._compile(schema["items"])
+            checks.append(lambda value, path: [
+                error for index, item in enumerate(value) for error in item_check(item, f"{path}[{index}]")
+            ] if isinstance(value, list) else [])
+        checks.extend(_compile_bounds(schema))
+        if "anyOf" in schema:
+            options = [self._compile(option) for option in schema["anyOf"]]
+            checks.append(lambda value, path: [] if any(not option(value, path) for option in options)
+                          else [f"{path}: matches none of the allowed schemas"])
+        if "oneOf" in schema:
+            exclusive = [self._compile(option) for option in schema["oneOf"]]
+            checks.append(lambda value, path: _check_one_of(exclusive, value, path))
+        for option in schema.get("allOf", []):
+            checks.append(self._compile(option))
+        return lambda value, path: [error for check in checks for error in check(value, path)]
+
+    def _compile_object(self, schema: dict) -> list[_Check]:
+        checks = []
+        properties = {name: self._compile(sub) for name, sub in schema.get("properties", {}).items()}
+        required = schema.get("required", [])
+        additional = schema.get("additionalProperties", True)
+        additional_check = self._compile(additional) if isinstance(additional, dict) else None
+
+        def check_object(value, path):
+            if not isinstance(value, dict):
+                # With a type keyword its own check reports the mismatch
+                return [] if "type" in schema else [f"{path}: missing required property {name!r}" for name in required]
+            errors = [f"{path}: missing required property {name!r}" for name in required if name not in value]
+            for name, item in value.items():
+                if name in properties:
+                    errors.extend(properties[name](item, f"{path}.{name}"))
+                elif additional is False:
+                    errors.append(f"{path}: unexpected property {name!r}")
+                elif additional_check is not None:
+                    errors.extend(additional_check(item, f"{path}.{name}"))
+            return errors
+
+        if properties or required or additional is not True:
+            checks.append(check_object)
+        return checks
+
+    def _compile_ref(self, ref: str) -> _Check:
+        # Resolved on first use, so recursive schemas compile
+        def check(value, path):
+            if ref not in self._refs:
+                self._refs[ref] = lambda value, path: []  # Placeholder while compiling a self-reference
+                self._refs[ref] = self._compile(self._resolve(ref))
+            return self._refs[ref](value, path)
+        return check
+
+    def _resolve(self, ref: str) -> dict:
+        if not ref.startswith("#/"):
+            raise ValueError(f"Only local $refs are supported, got {ref!r}")
+        node = self.json_schema
+        for part in ref[2:].split("/"):
+            node = node[part.replace("~1", "/").replace("~0", "~")]
+        return node
+
+
+def _expects_json(schema: dict) -> bool:
+    """Whether a string result must be parsed as JSON: the schema describes an object or array"""
+    types = schema.get("type")
+    if types is not None:
+        types = types if isinstance(types, list) else [types]
+        return "string" not in types and any(name in ("object", "array") for name in types)
+    return any(keyword in schema for keyword in _STRUCTURED_KEYWORDS)
+
+
+def _compile_bounds(schema: dict) -> list[_Check]:
+    bounds = [
+        ("minimum", lambda value: isinstance(value, (int, float)), lambda value, limit: value >= limit, "be >="),
+        ("maximum", lambda value: isinstance(value, (int, float)), lambda value, limit: value <= limit, "be <="),
+        ("minLength", lambda value: isinstance(value, str), lambda value, limit: len(value) >= limit, "have length >="),
+        ("maxLength", lambda value: isinstance(value, str), lambda value, limit: len(value) <= limit, "have length <="),
+        ("minItems", lambda value: isinstance(value, list), lambda value, limit: len(value) >= limit, "have items >="),
+        ("maxItems", lambda value: isinstance(value, list), lambda value, limit: len(value) <= limit, "have items <="),
+    ]
+    checks = []
+    for keyword, applies, holds, description in bounds:
+        if keyword in schema:
+            limit = schema[keyword]
+            checks.append(
+                lambda value, path, applies=applies, holds=holds, limit=limit, description=description:
+                [f"{path}: must {description} {limit}"] if applies(value) and not holds(value, limit) else []
+            )
+    return checks
+
+
+class _ValidatorCache:
+    """LRU of compiled validators keyed by schema hash (or by the model itself)"""
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._validators: OrderedDict[Any, OutputValidator] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, schema) -> OutputValidator:
+        key = schema_hash(schema) if isinstance(schema, dict) else schema
+        with self._lock:
+            validator = self._validators.get(key)
+            if validator is not None:
+                self._validators.move_to_end(key)
+                return validator
+        # Compiled outside the lock; a racing duplicate is harmless
+        validator = JsonSchemaOutputValidator(schema) if isinstance(schema, dict) else PydanticOutputValidator(schema)
+        with self._lock:
+            self._validators[key] = validator
+            while len(self._validators) > self.max_size:
+                self._validators.popitem(last=False)
+        return validator
+
+
+_validator_cache = _ValidatorCache()
+
+
+def compile_output_schema(schema: dict | type[BaseModel]) -> OutputValidator:
+    """Validator for a JSON Schema or Pydantic model, compiled once per distinct schema"""
+    return _validator_cache.get(schema)
@@ -0,0 +1,250 @@
+from .AnchorCache import make_cache_key
+from .AnchorSemanticCache import normalize_prompt
+from .AnchorStructuredOutput import schema_hash
+from dataclasses import asdict, dataclass, field
+from typing import Any, Literal
+import json
+import re
+import sqlite3
+import threading
+import time
+
+# A number as pages print it: optional sign, thousands separators and decimals
+_NUMBER = r"-?\d+(?:,\d{3})*(?:\.\d+)?"
+_NUMBER_TOKEN = re.compile(rf"(?<![\w.]){_NUMBER}(?!\w)")
+_LETTER = re.compile(r"[^\W\d_]")
+MAX_ANCHOR_CHARS = 80
+
+
+class ReplayError(Exception):
+    """A recorded script no longer matches the page it replays on"""
+
+
+@dataclass
+class ScriptSlot:
+    """Where one value of a result is read from: the text right before it, and after it for strings"""
+    path: list[str]  # Keys leading to the value; empty when the whole result is the value
+    kind: Literal["string", "integer", "number"]
+    before: str
+    after: str = ""
+    from_start: bool = False  # The value opens the page, e.g. its title, and before is all that precedes it
+
+
+@dataclass
+class TaskScript:
+    """Deterministic replacement for a web task: fetch url, then read each slot off the page"""
+    url: str
+    format: Literal["markdown", "html"] = "markdown"
+    slots: list[ScriptSlot] = field(default_factory=list)
+    recorded_at: float = field(default_factory=time.time)
+
+    def request_body(self) -> dict:
+        return {"url": self.url, "format": self.format}
+
+    def replay(self, page: str) -> Any:
+        """The result this script reads off page; raises ReplayError when an anchor is missing"""
+        if not isinstance(page, str):
+            raise ReplayError(f"Expected page content, got {type(page).__name__}")
+        result: Any = {}
+        for slot in self.slots:
+            value = _read_slot(page, slot)
+            if not slot.path:
+                return value
+            target = result
+            for key in slot.path[:-1]:
+                target = target.setdefault(key, {})
+            target[slot.path[-1]] = value
+        return result
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, payload: str) -> "TaskScript":
+        data = json.loads(payload)
+        data["slots"] = [ScriptSlot(**slot) for slot in data["slots"]]
+        return cls(**data)
+
+
+def record_script(result: Any, page: str, url: str, format: Literal["markdown", "html"] = "markdown") -> TaskScript | None:
+    """Script that reproduces result from page, or None when the result can't be read off it
+
+    Every value must appear exactly once on the page, so the slot is never a guess, and must be
+    a string or a number inside (nested) objects; lists, booleans and nulls aren't recorded. Each
+    slot is anchored on the shortest run of whole words before the value that is unique on the
+    page. The script is checked by replaying it on the same page.
+    """
+    if not isinstance(page, str):
+        return None
+    slots = []
+    for path, value in _leaves(result, []):
+        slot = _record_slot(page, path, value)
+        if slot is None:
+            return None
+        slots.append(slot)
+    if not slots:
+        return None
+    script = TaskScript(url=url, format=format, slots=slots)
+    try:
+        replayed = script.replay(page)
+    except ReplayError:
+        return None
+    return script if replayed == result else None
+
+
+def _leaves(value: Any, path: list[str]):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _leaves(item, path + [key])
+    else:
+        yield path, value
+
+
+def _record_slot(page: str, path: list[str], value: Any) -> ScriptSlot | None:
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        matches = [m for m in _NUMBER_TOKEN.finditer(page) if _parse_number(m.group()) == value]
+        if len(matches) != 1:
+            return None
+        start = matches[0].start()
+        before = _anchor_before(page, start)
+        kind = "integer" if isinstance(value, int) else "number"
+        return ScriptSlot(path, kind, before, from_start=start == len(before)) if before is not None else None
+    if isinstance(value, str) and value.strip() and "\n" not in value and page.count(value) == 1:
+        start = page.index(value)
+        before = _anchor_before(page, start)
+        if before is None:
+            return None
+        return ScriptSlot(path, "string", before, _anchor_after(page, start + len(value)), start == len(before))
+    return None
+
+
+def _anchor_before(page: str, start: int) -> str | None:
+    """Shortest text ending at start that begins on a word boundary, has 3+ letters and is unique
+
+    A value near the top of the page may be anchored on everything before it instead.
+    """
+    floor = max(0, start - MAX_ANCHOR_CHARS)
+    for begin in range(start - 1, floor - 1, -1):
+        if begin > 0 and not page[begin - 1].isspace():
+            continue
+        anchor = page[begin:start]
+        if len(_LETTER.findall(anchor)) >= 3 and page.count(anchor) == 1:
+            return anchor
+    return page[:start] if floor == 0 else None
+
+
+def _anchor_after(page: str, end: int) -> str:
+    """The rest of the line after a string value, up to and including its next word; "" at a line end"""
+    line = page[end:].split("\n", 1)[0]
+    match = re.match(r"\s*\S+", line[:MAX_ANCHOR_CHARS])
+    return match.group() if match else ""
+
+
+def _read_slot(page: str, slot: ScriptSlot) -> Any:
+    before = (r"\A" if slot.from_start else "") + re.escape(slot.before)
+    if slot.kind == "string":
+        after = re.escape(slot.after) if slot.after else r"[ \t\r]*$"
+        match = re.search(before + r"(.+?)" + after, page, re.MULTILINE)
+    else:
+        match = re.search(before + rf"({_NUMBER})(?!\w)", page)
+    if match is None:
+        raise ReplayError(f"Anchor for {'.'.join(slot.path) or 'result'} not found: {slot.before!r}")
+    text = match.group(1)
+    if slot.kind == "string":
+        return text
+    number = _parse_number(text)
+    if slot.kind == "integer":
+        if number != int(number):
+            raise ReplayError(f"Expected an integer for {'.'.join(slot.path) or 'result'}, found {text!r}")
+        return int(number)
+    return number
+
+
+def _parse_number(text: str) -> float:
+    return float(text.replace(",", ""))
+
+
+class TaskReplayStore:
+    """Recorded scripts of successful web tasks in SQLite, keyed by tool, start URL, prompt and schema
+
+    With the default ":memory:" path scripts last for the process; with a file path a recurring
+    task keeps replaying across runs. A task whose result couldn't be recorded is remembered for
+    unreplayable_ttl seconds, so it isn't re-fetched for recording on every run. A replay reads the
+    start page only, so tools record just the tasks marked read-only (replay_read_only).
+    """
+
+    def __init__(self, path: str = ":memory:", unreplayable_ttl: float | None = 86400.0):
+        self.path = path
+        self.unreplayable_ttl = unreplayable_ttl
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS anchor_task_replay ("
+            "key TEXT PRIMARY KEY, script TEXT, recorded_at REAL NOT NULL)"
+        )
+        self._stats = {"replays": 0, "replay_failures": 0, "recordings": 0, "unreplayable": 0}
+
+    @staticmethod
+    def key(namespace: str, url: str | None, prompt: str, output_schema: dict | None) -> str:
+        return make_cache_key(namespace, {
+            "url": url,
+            "prompt": normalize_prompt(prompt),
+            "output_schema": schema_hash(output_schema) if output_schema else None,
+        })
+
+    def get(self, key: str) -> TaskScript | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT script FROM anchor_task_replay WHERE key = ?", (key,)
+            ).fetchone()
+        return TaskScript.from_json(row[0]) if row is not None and row[0] is not None else None
+
+    def needs_recording(self, key: str) -> bool:
+        """Whether a successful run of the task should be recorded: nothing is stored or the marker expired"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT script, recorded_at FROM anchor_task_replay WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return True
+        if row[0] is not None:
+            return False
+        return self.unreplayable_ttl is not None and time.time() - row[1] >= self.unreplayable_ttl
+
+    def save(self, key: str, script: TaskScript | None) -> None:
+        """Store a script, or None to remember that the task can't be replayed"""
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO anchor_task_replay (key, script, recorded_at) VALUES (?, ?, ?)",
+                (key, script.to_json() if script is not None else None, time.time()),
+            )
+            self._stats["recordings" if script is not None else "unreplayable"] += 1
+
+    def replayed(self, key: str, error: BaseException | None = None) -> None:
+        """Count a replay; a failed one drops the script so the fallback run records a new one"""
+        with self._lock:
+            if error is None:
+                self._stats["replays"] += 1
+                return
+            self._stats["replay_failures"] += 1
+            self._connection.execute("DELETE FROM anchor_task_replay WHERE key = ?", (key,))
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM anchor_task_replay WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM anchor_task_replay")
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["scripts"] = self._connection.execute(
+                "SELECT COUNT(*) FROM anchor_task_replay WHERE script IS NOT NULL"
+            ).fetchone()[0]
+        return stats
@@ -0,0 +1,129 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TransportConfig:
+    """HTTP settings for the SDK clients of one AnchorClient"""
+    max_connections: int | None = 100  # Open connections per SDK client; None is unbounded
+    max_keepalive_connections: int | None = 20  # Idle connections kept for reuse
+    keepalive_expiry: float | None = 30.0  # Seconds an idle connection stays open
+    http2: bool = False  # Multiplex requests over one connection; needs the h2 package
+    connect_timeout: float | None = 5.0
+    timeout: float | None = 60.0  # Read, write and pool timeout; tool timeouts still apply per call
+    proxy: str | None = None  # e.g. "http://proxy.internal:3128"
+    prewarm: int = 0  # Connections to open as soon as an SDK client is created
+
+    def __post_init__(self):
+        if self.http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError as e:
+                raise ImportError("http2=True requires the h2 package: pip install 'httpx[http2]'") from e
+        if self.prewarm < 0:
+            raise ValueError(f"prewarm must not be negative, got {self.prewarm}")
+
+    @property
+    def prewarm_count(self) -> int:
+        # Connections beyond the keep-alive limit would be closed again right away
+        if self.max_keepalive_connections is None:
+            return self.prewarm
+        return min(self.prewarm, self.max_keepalive_connections)
+
+
+class TransportStats:
+    """Connection reuse counters for the HTTP traffic of one AnchorClient, sync and async"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            requests, opened, handshakes = self.requests, self.connections_opened, self.tls_handshakes
+        reused = max(requests - opened, 0)
+        return {
+            "requests": requests,
+            "connections_opened": opened,
+            "tls_handshakes": handshakes,
+            "reused_requests": reused,
+            "reuse_rate": reused / requests if requests else 0.0,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = self.connections_opened = self.tls_handshakes = 0
+
+    def _record(self, event: str) -> None:
+        # httpcore reports each new connection through the request's trace extension
+        if event == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections_opened += 1
+        elif event == "connection.start_tls.complete":
+            with self._lock:
+                self.tls_handshakes += 1
+
+    def _on_request(self, request) -> None:
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = lambda event, info: self._record(event)
+
+    async def _aon_request(self, request) -> None:
+        with self._lock:
+            self.requests += 1
+
+        async def trace(event, info):
+            self._record(event)
+        request.extensions["trace"] = trace
+
+
+def client_options(config: TransportConfig, stats: TransportStats, asynchronous: bool = False) -> dict:
+    """Keyword arguments for Anchorbrowser or AsyncAnchorbrowser that apply config"""
+    import httpx
+    from anchorbrowser import DefaultAsyncHttpxClient, DefaultHttpxClient
+
+    timeout = httpx.Timeout(config.timeout, connect=config.connect_timeout)
+    limits = httpx.Limits(
+        max_connections=config.max_connections,
+        max_keepalive_connections=config.max_keepalive_connections,
+        keepalive_expiry=config.keepalive_expiry,
+    )
+    http_client_class = DefaultAsyncHttpxClient if asynchronous else DefaultHttpxClient
+    http_client = http_client_class(
+        limits=limits,
+        timeout=timeout,
+        http2=config.http2,
+        proxy=config.proxy,
+        event_hooks={"request": [stats._aon_request if asynchronous else stats._on_request]},
+    )
+    # The SDK sends its own timeout with every request, so it has to be given here as well
+    return {"timeout": timeout, "http_client": http_client}
+
+
+def prewarm(http_client, url: str, count: int) -> None:
+    """Open up to count keep-alive connections by sending that many concurrent requests to url"""
+    def touch(_):
+        try:
+            http_client.get(url).close()
+        except Exception as e:
+            logger.debug(f"Pre-warming a connection to {url} failed: {e}")
+
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        list(executor.map(touch, range(count)))
+
+
+async def aprewarm(http_client, url: str, count: int) -> None:
+    async def touch():
+        try:
+            await (await http_client.get(url)).aclose()
+        except Exception as e:
+            logger.debug(f"Pre-warming a connection to {url} failed: {e}")
+
+    await asyncio.gather(*(touch() for _ in range(count)))
@@ -1,8 +1,131 @@
 from .AnchorBaseTool import AnchorBaseTool
+from .AnchorCancellation import CallCancelledError
+from .AnchorSemanticCache import SemanticTaskCache
+from .AnchorStructuredOutput import OutputValidationError, OutputValidator, compile_output_schema
+from .AnchorTaskReplay import TaskReplayStore, record_script
+from langchain_core.callbacks import AsyncCallbackManager, CallbackManager
+from langchain_core.runnables.config import (
+    ensure_config,
+    get_async_callback_manager_for_config,
+    get_callback_manager_for_config,
+)
 from langchain_core.tools import BaseToolkit, BaseTool
-from pydantic import Field, BaseModel
+from pydantic import Field, BaseModel, PrivateAttr
+from typing import Literal
+import asyncio
+import threading
+import time
 
-class SimpleAnchorWebTaskTool(AnchorBaseTool, BaseTool):
+# Custom events dispatched while a web task runs; they surface as on_custom_event in astream_events
+WEB_TASK_START_EVENT = "anchor_web_task_start"
+WEB_TASK_PROGRESS_EVENT = "anchor_web_task_progress"
+WEB_TASK_END_EVENT = "anchor_web_task_end"
+
+
+class AnchorWebTaskBaseTool(AnchorBaseTool):
+    """Reports a running perform_web_task through LangChain callbacks
+
+    The API answers a web task with a single response, so progress is reported around it: a start
+    event naming the session (watchable through its live view), a heartbeat every progress_interval
+    seconds, and an end event with the result. Cancelling the run, e.g. by leaving astream_events
+    early, ends the leased session and with it the remote task.
+    """
+    progress_events: bool = True  # Dispatch custom events when called inside a LangChain run
+    progress_interval: float = 2.0  # Seconds between heartbeat events
+    semantic_cache: SemanticTaskCache | None = None  # Opt-in: answers repeated or near-identical prompts per url
+
+    def _run(self, **kwargs):
+        partition = self._semantic_partition(kwargs)
+        if partition is None:
+            return self._run_task(kwargs)
+        result = self.semantic_cache.get(partition, kwargs["prompt"])
+        if result is None:
+            result = self._run_task(kwargs)
+            self.semantic_cache.set(partition, kwargs["prompt"], result)
+        return result
+
+    async def _arun(self, **kwargs):
+        partition = self._semantic_partition(kwargs)
+        if partition is None:
+            return await self._arun_task(kwargs)
+        result = await self.semantic_cache.aget(partition, kwargs["prompt"])
+        if result is None:
+            result = await self._arun_task(kwargs)
+            await self.semantic_cache.aset(partition, kwargs["prompt"], result)
+        return result
+
+    def _run_task(self, kwargs: dict):
+        return super()._run(**kwargs)
+
+    async def _arun_task(self, kwargs: dict):
+        return await super()._arun(**kwargs)
+
+    def _task_schema(self, kwargs: dict) -> dict | None:
+        return kwargs.get("output_schema")
+
+    def _semantic_partition(self, kwargs: dict) -> tuple | None:
+        # On a pinned session the result depends on the browser's state, so it is never shared
+        if self.semantic_cache is None or self._pinned_session() is not None:
+            return None
+        return SemanticTaskCache.partition(self._key_namespace(), kwargs.get("url"), self._task_schema(kwargs))
+
+    def _invoke_client(self, client, function_name: str, request_body: dict):
+        callback_manager = self._progress_manager(get_callback_manager_for_config)
+        # Pages fetched to record or replay a task aren't part of its progress
+        if callback_manager is None or function_name != "perform_web_task":
+            return super()._invoke_client(client, function_name, request_body)
+
+        def emit(name: str, **data):
+            callback_manager.on_custom_event(name, data, run_id=callback_manager.parent_run_id)
+
+        start = time.monotonic()
+        session_id = request_body.get("session_id")
+        emit(WEB_TASK_START_EVENT, session_id=session_id, prompt=request_body["prompt"], url=request_body.get("url"))
+        stopped = threading.Event()
+
+        def heartbeat():
+            while not stopped.wait(self.progress_interval):
+                emit(WEB_TASK_PROGRESS_EVENT, session_id=session_id, elapsed_seconds=time.monotonic() - start)
+
+        threading.Thread(target=heartbeat, daemon=True).start()
+        try:
+            result = super()._invoke_client(client, function_name, request_body)
+        finally:
+            stopped.set()
+        emit(WEB_TASK_END_EVENT, session_id=session_id, elapsed_seconds=time.monotonic() - start, result=result.data)
+        return result
+
+    async def _ainvoke_client(self, client, function_name: str, request_body: dict):
+        callback_manager = self._progress_manager(get_async_callback_manager_for_config)
+        if callback_manager is None or function_name != "perform_web_task":
+            return await super()._ainvoke_client(client, function_name, request_body)
+
+        async def emit(name: str, **data):
+            await callback_manager.on_custom_event(name, data, run_id=callback_manager.parent_run_id)
+
+        start = time.monotonic()
+        session_id = request_body.get("session_id")
+        await emit(WEB_TASK_START_EVENT, session_id=session_id, prompt=request_body["prompt"], url=request_body.get("url"))
+        task = asyncio.ensure_future(super()._ainvoke_client(client, function_name, request_body))
+        try:
+            while not (await asyncio.wait({task}, timeout=self.progress_interval))[0]:
+                await emit(WEB_TASK_PROGRESS_EVENT, session_id=session_id, elapsed_seconds=time.monotonic() - start)
+        except BaseException:
+            task.cancel()
+            raise
+        result = task.result()
+        await emit(WEB_TASK_END_EVENT, session_id=session_id, elapsed_seconds=time.monotonic() - start, result=result.data)
+        return result
+
+    def _progress_manager(self, get_manager) -> CallbackManager | AsyncCallbackManager | None:
+        """Callback manager of the enclosing tool run, or None when there is nothing to report to"""
+        if not self.progress_events:
+            return None
+        callback_manager = get_manager(ensure_config())
+        return callback_manager if callback_manager.parent_run_id is not None else None
+
+
+class SimpleAnchorWebTaskTool(AnchorWebTaskBaseTool, BaseTool):
     name: str = "simple_anchor_web_task_tool"
     description: str = "Perform a simple web task using Anchor Browser AI"
     client_function_name: str = "perform_web_task"
@@ -13,10 +136,19 @@ class SimpleAnchorWebTaskTool(AnchorBaseTool, BaseTool):
     args_schema: type[BaseModel] = SimpleWebTaskInputSchema
 
 
-class AdvancedAnchorWebTaskTool(AnchorBaseTool, BaseTool):
+class AdvancedAnchorWebTaskTool(AnchorWebTaskBaseTool, BaseTool):
     name: str = "advanced_anchor_web_task_tool"
     description: str = "Perform an advanced web task using Anchor Browser AI"
     client_function_name: str = "perform_web_task"
+    # Pydantic model or JSON Schema for results; sent as output_schema and used to validate what comes back
+    response_schema: type[BaseModel] | dict | None = None
+    validate_output: bool = True  # Validate results against the output schema and return the typed value
+    reask_on_mismatch: bool = False  # Run the task once more, quoting the validation errors, when a result doesn't match
+    # Opt-in: record successful tasks and replay them without the AI agent. A replay only fetches the start
+    # page, so nothing is recorded unless replay_read_only confirms the tasks take no actions there
+    replay_store: TaskReplayStore | None = None
+    replay_read_only: bool = False  # The tool's tasks only read the start page: no clicks, logins or form submissions
+    replay_format: Literal["markdown", "html"] = "markdown"  # Page format recorded scripts read from
     
     class AdvancedWebTaskInputSchema(BaseModel):
         prompt: str = Field(description="The task prompt to execute")
@@ -25,12 +157,137 @@ class AdvancedAnchorWebTaskTool(AnchorBaseTool, BaseTool):
 
     args_schema: type[BaseModel] = AdvancedWebTaskInputSchema
 
+    def _run_task(self, kwargs: dict):
+        # Only validated results come back from here, so only those reach the semantic cache
+        validator = self._output_validator(kwargs)
+        replay_key = self._replay_key(kwargs, validator)
+        script = self.replay_store.get(replay_key) if replay_key is not None else None
+        if script is not None:
+            try:
+                # One page fetch replaces the agent; the result is validated like a fresh one
+                page = self._call_remote("fetch_webpage", script.request_body())
+                result = validator.validate(script.replay(page))
+            except CallCancelledError:
+                raise
+            except Exception as e:
+                self.logger.info(f"Replay of recorded task failed, running it as a web task: {e}")
+                self.replay_store.replayed(replay_key, e)
+            else:
+                self.replay_store.replayed(replay_key)
+                return result
+        data = super()._run_task(kwargs)
+        if validator is None:
+            return data
+        try:
+            result = validator.validate(_task_result(data))
+        except OutputValidationError as e:
+            if not self.reask_on_mismatch:
+                raise
+            data = super()._run_task({**kwargs, "prompt": _reask_prompt(kwargs["prompt"], e)})
+            result = validator.validate(_task_result(data))
+        if replay_key is not None and self.replay_store.needs_recording(replay_key):
+            # Recording costs one page fetch, and a failure to record never fails the task
+            try:
+                page = self._call_remote("fetch_webpage", {"url": kwargs["url"], "format": self.replay_format})
+            except Exception as e:
+                self.logger.debug(f"Not recording {self.name} task: {e}")
+            else:
+                self._record(replay_key, kwargs["url"], _task_result(data), page)
+        return result
+
+    async def _arun_task(self, kwargs: dict):
+        validator = self._output_validator(kwargs)
+        replay_key = self._replay_key(kwargs, validator)
+        script = self.replay_store.get(replay_key) if replay_key is not None else None
+        if script is not None:
+            try:
+                page = await self._acall_remote("fetch_webpage", script.request_body())
+                result = validator.validate(script.replay(page))
+            except CallCancelledError:
+                raise
+            except Exception as e:
+                self.logger.info(f"Replay of recorded task failed, running it as a web task: {e}")
+                self.replay_store.replayed(replay_key, e)
+            else:
+                self.replay_store.replayed(replay_key)
+                return result
+        data = await super()._arun_task(kwargs)
+        if validator is None:
+            return data
+        try:
+            result = validator.validate(_task_result(data))
+        except OutputValidationError as e:
+            if not self.reask_on_mismatch:
+                raise
+            data = await super()._arun_task({**kwargs, "prompt": _reask_prompt(kwargs["prompt"], e)})
+            result = validator.validate(_task_result(data))
+        if replay_key is not None and self.replay_store.needs_recording(replay_key):
+            try:
+                page = await self._acall_remote("fetch_webpage", {"url": kwargs["url"], "format": self.replay_format})
+            except Exception as e:
+                self.logger.debug(f"Not recording {self.name} task: {e}")
+            else:
+                self._record(replay_key, kwargs["url"], _task_result(data), page)
+        return result
+
+    def _replay_key(self, kwargs: dict, validator: OutputValidator | None) -> str | None:
+        """Key of this task in the replay store, or None when it is neither replayed nor recorded
+
+        Only validated, read-only tasks that start from a URL on a fresh session qualify: a replay
+        skips whatever the agent would have done on the page, validation is what catches a replay
+        that read the wrong text, and a pinned session's page depends on its state.
+        """
+        if self.replay_store is None or not self.replay_read_only or validator is None:
+            return None
+        if not kwargs.get("url") or self._pinned_session() is not None:
+            return None
+        return TaskReplayStore.key(self._key_namespace(), kwargs["url"], kwargs["prompt"], validator.json_schema)
+
+    def _record(self, replay_key: str, url: str, result, page) -> None:
+        script = record_script(result, page, url, self.replay_format)
+        if script is None:
+            self.logger.debug(f"{self.name} task result can't be read off {url}; it will run as a web task")
+        self.replay_store.save(replay_key, script)
+
+    def _task_schema(self, kwargs: dict) -> dict | None:
+        if self.response_schema is not None:
+            return compile_output_schema(self.response_schema).json_schema
+        return kwargs.get("output_schema")
+
+    def _output_validator(self, kwargs: dict) -> OutputValidator | None:
+        """Compiled validator for this call (cached per schema); fills in output_schema from response_schema"""
+        if self.response_schema is not None:
+            validator = compile_output_schema(self.response_schema)
+            kwargs["output_schema"] = validator.json_schema
+        elif kwargs.get("output_schema"):
+            validator = compile_output_schema(kwargs["output_schema"])
+        else:
+            return None
+        return validator if self.validate_output else None
+
+
+def _task_result(data):
+    # perform_web_task answers with {"result": ...}; the result is a string or a JSON object
+    return getattr(data, "result", data)
+
+
+def _reask_prompt(prompt: str, error: OutputValidationError) -> str:
+    return (
+        f"{prompt}\n\nA previous answer did not match the required output schema "
+        f"({'; '.join(error.errors)}). Return data that matches the schema exactly."
+    )
+
 class AnchorWebTaskToolKit(BaseToolkit):
     name: str = "anchor_web_task_tool_kit"
     description: str = "Perform a web task using Anchor Browser AI"
 
+    _tools: list[BaseTool] | None = PrivateAttr(default=None)
+
     def get_tools(self) -> list[BaseTool]:
-        return [
-            SimpleAnchorWebTaskTool(),
-            AdvancedAnchorWebTaskTool(),
-        ]
+        # Tools hold no per-call state, so the same instances are handed out every time
+        if self._tools is None:
+            self._tools = [
+                SimpleAnchorWebTaskTool(),
+                AdvancedAnchorWebTaskTool(),
+            ]
+        return list(self._tools)
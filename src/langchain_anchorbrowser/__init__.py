@@ -1,17 +1,132 @@
-from .AnchorBaseTool import AnchorBaseTool
-from .AnchorContentTool import AnchorContentTool
-from .AnchorScreenshotTool import AnchorScreenshotTool
-from .AnchorWebTaskTool import (
-    SimpleAnchorWebTaskTool,
-    AdvancedAnchorWebTaskTool,
-    AnchorWebTaskToolKit
-)
-
-__all__ = [
-    "AnchorBaseTool",
-    "AnchorContentTool", 
-    "AnchorScreenshotTool",
-    "SimpleAnchorWebTaskTool",
-    "AdvancedAnchorWebTaskTool",
-    "AnchorWebTaskToolKit"
-]
+# Submodules are imported on first attribute access, so `import langchain_anchorbrowser` stays cheap
+from importlib import import_module
+from types import ModuleType
+from typing import TYPE_CHECKING
+import sys
+
+if TYPE_CHECKING:
+    from .AnchorBaseTool import AnchorBaseTool, AnchorClient
+    from .AnchorSessionPool import AnchorSessionPool, AsyncAnchorSessionPool
+    from .AnchorSession import AnchorSession
+    from .AnchorSpeculation import SpeculativeSessionHandler
+    from .AnchorCache import AnchorCache, InMemoryCache, SQLiteCache, RedisCache
+    from .AnchorInstrumentation import (
+        AnchorHook,
+        CallMetrics,
+        CallbackHook,
+        LoggingHook,
+        OpenTelemetryHook,
+        PrometheusHook,
+        capture_metrics
+    )
+    from .AnchorRateLimiter import RateLimit, RateLimiter
+    from .AnchorTransport import TransportConfig
+    from .AnchorResilience import RetryPolicy, CircuitBreaker, CircuitOpenError
+    from .AnchorCancellation import CancellationToken, CallCancelledError
+    from .AnchorContentPipeline import (
+        ContentPipeline,
+        StripBoilerplate,
+        HtmlToText,
+        SelectCss,
+        DedupeBlocks,
+        TruncateTokens,
+        ChunkTokens
+    )
+    from .AnchorRevisions import RevisionStore, PageRevision
+    from .AnchorContentTool import AnchorContentTool
+    from .AnchorBrowserLoader import AnchorBrowserLoader
+    from .AnchorCrawlTool import AnchorCrawlTool, CrawlPage, CrawlState
+    from .AnchorScreenshotDerivatives import Rendition, ScreenshotDerivatives
+    from .AnchorScreenshotTool import AnchorScreenshotTool
+    from .AnchorStructuredOutput import OutputValidationError, compile_output_schema
+    from .AnchorSemanticCache import SemanticTaskCache, HashingEmbedder
+    from .AnchorTaskReplay import TaskReplayStore, TaskScript, ReplayError
+    from .AnchorWebTaskTool import (
+        AnchorWebTaskBaseTool,
+        SimpleAnchorWebTaskTool,
+        AdvancedAnchorWebTaskTool,
+        AnchorWebTaskToolKit
+    )
+
+_EXPORTS = {
+    "AnchorBaseTool": "AnchorBaseTool",
+    "AnchorClient": "AnchorBaseTool",
+    "AnchorSessionPool": "AnchorSessionPool",
+    "AsyncAnchorSessionPool": "AnchorSessionPool",
+    "AnchorSession": "AnchorSession",
+    "SpeculativeSessionHandler": "AnchorSpeculation",
+    "AnchorCache": "AnchorCache",
+    "InMemoryCache": "AnchorCache",
+    "SQLiteCache": "AnchorCache",
+    "RedisCache": "AnchorCache",
+    "AnchorHook": "AnchorInstrumentation",
+    "CallMetrics": "AnchorInstrumentation",
+    "CallbackHook": "AnchorInstrumentation",
+    "LoggingHook": "AnchorInstrumentation",
+    "OpenTelemetryHook": "AnchorInstrumentation",
+    "PrometheusHook": "AnchorInstrumentation",
+    "capture_metrics": "AnchorInstrumentation",
+    "RateLimit": "AnchorRateLimiter",
+    "RateLimiter": "AnchorRateLimiter",
+    "TransportConfig": "AnchorTransport",
+    "RetryPolicy": "AnchorResilience",
+    "CircuitBreaker": "AnchorResilience",
+    "CircuitOpenError": "AnchorResilience",
+    "CancellationToken": "AnchorCancellation",
+    "CallCancelledError": "AnchorCancellation",
+    "ContentPipeline": "AnchorContentPipeline",
+    "StripBoilerplate": "AnchorContentPipeline",
+    "HtmlToText": "AnchorContentPipeline",
+    "SelectCss": "AnchorContentPipeline",
+    "DedupeBlocks": "AnchorContentPipeline",
+    "TruncateTokens": "AnchorContentPipeline",
+    "ChunkTokens": "AnchorContentPipeline",
+    "RevisionStore": "AnchorRevisions",
+    "PageRevision": "AnchorRevisions",
+    "AnchorContentTool": "AnchorContentTool",
+    "AnchorBrowserLoader": "AnchorBrowserLoader",
+    "AnchorCrawlTool": "AnchorCrawlTool",
+    "CrawlPage": "AnchorCrawlTool",
+    "CrawlState": "AnchorCrawlTool",
+    "Rendition": "AnchorScreenshotDerivatives",
+    "ScreenshotDerivatives": "AnchorScreenshotDerivatives",
+    "AnchorScreenshotTool": "AnchorScreenshotTool",
+    "OutputValidationError": "AnchorStructuredOutput",
+    "compile_output_schema": "AnchorStructuredOutput",
+    "SemanticTaskCache": "AnchorSemanticCache",
+    "HashingEmbedder": "AnchorSemanticCache",
+    "TaskReplayStore": "AnchorTaskReplay",
+    "TaskScript": "AnchorTaskReplay",
+    "ReplayError": "AnchorTaskReplay",
+    "AnchorWebTaskBaseTool": "AnchorWebTaskTool",
+    "SimpleAnchorWebTaskTool": "AnchorWebTaskTool",
+    "AdvancedAnchorWebTaskTool": "AnchorWebTaskTool",
+    "AnchorWebTaskToolKit": "AnchorWebTaskTool",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class _LazyPackage(ModuleType):
+    def __setattr__(self, name, value):
+        # Importing a submodule binds it on the package, and most submodules are named after their
+        # main class; keep the class bound instead, as the eager imports used to
+        if name in _EXPORTS and isinstance(value, ModuleType) and value.__name__ == f"{__name__}.{name}":
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _LazyPackage
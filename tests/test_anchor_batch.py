@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+import asyncio
+import itertools
+import threading
+import time
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from langchain_anchorbrowser.AnchorContentTool import AnchorContentTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+
+
+def make_session_factory():
+    counter = itertools.count(1)
+
+    def create_session():
+        session = Mock()
+        session.data.id = f"session_{next(counter)}"
+        session.data.live_view_url = "test_live_view_url"
+        return session
+    return create_session
+
+
+class TestAnchorBatch(unittest.TestCase):
+    """Test fetching many URLs in one call"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_batch_urls_keeps_order_and_reports_errors(self, mock_anchorbrowser):
+        """Test that results follow input order and failures are returned per item"""
+        mock_client = Mock()
+        mock_client.sessions.create.side_effect = make_session_factory()
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def fetch_webpage(url, **kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            if url.endswith("/broken"):
+                raise RuntimeError("page failed")
+            return f"content of {url}"
+
+        mock_client.tools.fetch_webpage.side_effect = fetch_webpage
+        mock_anchorbrowser.return_value = mock_client
+        urls = [f"https://example.com/{i}" for i in range(6)] + ["https://example.com/broken"]
+
+        results = AnchorContentTool().batch_urls(urls, max_concurrency=3, format="html")
+
+        self.assertEqual(results[:6], [f"content of {url}" for url in urls[:6]])
+        self.assertIsInstance(results[6], RuntimeError)
+        self.assertLessEqual(peak, 3)
+        self.assertLessEqual(mock_client.sessions.create.call_count, 3)
+        for call in mock_client.tools.fetch_webpage.call_args_list:
+            self.assertEqual(call.kwargs["format"], "html")
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_abatch_urls(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        """Test that abatch_urls runs concurrently on the event loop"""
+        mock_anchorbrowser.return_value = Mock()
+        mock_async_client = Mock()
+        create_session = make_session_factory()
+        mock_async_client.sessions.create = AsyncMock(side_effect=lambda: create_session())
+
+        async def fetch_webpage(url, **kwargs):
+            await asyncio.sleep(0.01)
+            return f"content of {url}"
+
+        mock_async_client.tools.fetch_webpage = AsyncMock(side_effect=fetch_webpage)
+        mock_async_anchorbrowser.return_value = mock_async_client
+        urls = [f"https://example.com/{i}" for i in range(5)]
+
+        results = asyncio.run(AnchorContentTool().abatch_urls(urls, max_concurrency=2))
+
+        self.assertEqual(results, [f"content of {url}" for url in urls])
+        self.assertEqual(mock_async_client.sessions.create.await_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import json
+import tempfile
+import sys
+import os
+
+# Add the benchmarks directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+import run_benchmarks
+from fake_anchor_server import FakeAnchorServer, FakeServerConfig
+from anchorbrowser import Anchorbrowser
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+    """Smoke test the offline benchmark harness against the local fake API"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        self.environ = dict(os.environ)
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.environ)
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+
+    def test_fake_server_speaks_the_sdk_protocol(self):
+        config = FakeServerConfig(latency=0, session_latency=0, content_bytes=10)
+        with FakeAnchorServer(config) as server:
+            client = Anchorbrowser(api_key="benchmark", base_url=server.url)
+            session = client.sessions.create()
+            content = client.tools.fetch_webpage(url="https://example.com", session_id=session.data.id)
+            statuses = client.sessions.all.status()
+            client.sessions.delete(session.data.id)
+            client.close()
+
+        self.assertEqual(content, "x" * 10)
+        self.assertEqual(statuses.data.items[0].session_id, session.data.id)
+        self.assertEqual(server.stats()["sessions_created"], 1)
+
+    def test_run_writes_json_results(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "results.json")
+            exit_code = run_benchmarks.main([
+                "--tools", "content", "--concurrency", "2", "--requests", "4", "--warmup", "2",
+                "--latency", "0", "--session-latency", "0", "--output", output,
+            ])
+            with open(output) as f:
+                report = json.load(f)
+
+        self.assertEqual(exit_code, 0)
+        modes = {(r["mode"], r["pooled"]) for r in report["results"]}
+        self.assertEqual(modes, {("raw_sdk", None), ("sync", True), ("sync", False), ("async", True), ("async", False)})
+        for result in report["results"]:
+            self.assertEqual(result["errors"], 0)
+            self.assertIsNotNone(result["p99_ms"])
+        pooled = next(r for r in report["results"] if r["mode"] == "sync" and r["pooled"])
+        unpooled = next(r for r in report["results"] if r["mode"] == "sync" and r["pooled"] is False)
+        self.assertEqual(pooled["server"]["sessions_created"], 0)
+        self.assertEqual(unpooled["server"]["sessions_created"], 4)
+
+    def test_structured_web_tasks_validate(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "results.json")
+            exit_code = run_benchmarks.main([
+                "--tools", "web_task_structured", "--concurrency", "2", "--requests", "4", "--warmup", "2",
+                "--latency", "0", "--session-latency", "0", "--output", output,
+            ])
+            with open(output) as f:
+                report = json.load(f)
+
+        self.assertEqual(exit_code, 0)
+        tool_results = [r for r in report["results"] if r["mode"] != "raw_sdk"]
+        self.assertEqual(len(tool_results), 4)
+        for result in tool_results:
+            self.assertEqual(result["errors"], 0)
+
+    def test_percentile(self):
+        values = [i / 100 for i in range(1, 101)]
+        self.assertEqual(run_benchmarks.percentile(values, 50), 0.5)
+        self.assertEqual(run_benchmarks.percentile(values, 99), 0.99)
+        self.assertIsNone(run_benchmarks.percentile([], 50))
+
+
+if __name__ == '__main__':
+    unittest.main()
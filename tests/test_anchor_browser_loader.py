@@ -0,0 +1,150 @@
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+import asyncio
+import itertools
+import threading
+import time
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from langchain_anchorbrowser.AnchorBrowserLoader import AnchorBrowserLoader
+from langchain_anchorbrowser.AnchorContentTool import AnchorContentTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorCache import InMemoryCache
+from langchain_anchorbrowser.AnchorContentPipeline import ChunkTokens, ContentPipeline
+
+
+def make_session_factory():
+    counter = itertools.count(1)
+
+    def create_session():
+        session = Mock()
+        session.data.id = f"session_{next(counter)}"
+        return session
+    return create_session
+
+
+def fetch(url, **kwargs):
+    if "broken" in url:
+        raise RuntimeError("page failed")
+    return f"content of {url}"
+
+
+class TestAnchorBrowserLoader(unittest.TestCase):
+    """Test loading pages as LangChain Documents"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+
+    def make_client(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value
+        mock_client.sessions.create.side_effect = make_session_factory()
+        mock_client.tools.fetch_webpage.side_effect = fetch
+        return mock_client
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_load_returns_documents_with_metadata(self, mock_anchorbrowser):
+        self.make_client(mock_anchorbrowser)
+        urls = [f"https://example.com/{i}" for i in range(4)]
+
+        documents = AnchorBrowserLoader(urls, format="html").load()
+
+        self.assertEqual(sorted(doc.metadata["url"] for doc in documents), urls)
+        document = next(doc for doc in documents if doc.metadata["url"] == urls[0])
+        self.assertEqual(document.page_content, f"content of {urls[0]}")
+        self.assertEqual(document.metadata["source"], urls[0])
+        self.assertEqual(document.metadata["format"], "html")
+        self.assertTrue(document.metadata["session_id"].startswith("session_"))
+        self.assertFalse(document.metadata["cache_hit"])
+        self.assertGreaterEqual(document.metadata["fetch_seconds"], 0)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_urls_are_consumed_within_the_window(self, mock_anchorbrowser):
+        mock_client = self.make_client(mock_anchorbrowser)
+        consumed = [0]
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def urls():
+            for i in itertools.count():
+                consumed[0] += 1
+                yield f"https://example.com/{i}"
+
+        def slow_fetch(url, **kwargs):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return url
+        mock_client.tools.fetch_webpage.side_effect = slow_fetch
+
+        documents = AnchorBrowserLoader(urls(), max_concurrency=3).lazy_load()
+        first = [next(documents) for _ in range(5)]
+        documents.close()
+
+        self.assertEqual(len(first), 5)
+        self.assertLessEqual(peak[0], 3)
+        # An endless URL stream is read only as far as the window needs
+        self.assertLessEqual(consumed[0], 5 + 3)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_failures_are_skipped_or_raised(self, mock_anchorbrowser):
+        self.make_client(mock_anchorbrowser)
+        urls = ["https://example.com/ok", "https://example.com/broken"]
+
+        documents = AnchorBrowserLoader(urls).load()
+        self.assertEqual([doc.metadata["url"] for doc in documents], ["https://example.com/ok"])
+
+        with self.assertRaises(RuntimeError):
+            AnchorBrowserLoader(urls, continue_on_failure=False).load()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_tool_settings_apply(self, mock_anchorbrowser):
+        self.make_client(mock_anchorbrowser)
+        tool = AnchorContentTool(cache=InMemoryCache(), pipeline=ContentPipeline(ChunkTokens(max_tokens=3)))
+        AnchorBrowserLoader(["https://example.com/a"], tool=tool).load()
+
+        documents = AnchorBrowserLoader(["https://example.com/a"], tool=tool).load()
+
+        self.assertGreater(len(documents), 1)
+        self.assertEqual([doc.metadata["chunk"] for doc in documents], list(range(len(documents))))
+        self.assertTrue(documents[0].metadata["cache_hit"])
+        self.assertIsNone(documents[0].metadata["session_id"])
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_alazy_load(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        mock_async_client = mock_async_anchorbrowser.return_value
+        mock_async_client.sessions.create = AsyncMock(side_effect=make_session_factory())
+        mock_async_client.sessions.delete = AsyncMock()
+        mock_async_client.tools.fetch_webpage = AsyncMock(side_effect=fetch)
+        urls = [f"https://example.com/{i}" for i in range(6)] + ["https://example.com/broken"]
+
+        async def run():
+            return [doc async for doc in AnchorBrowserLoader(urls, max_concurrency=2).alazy_load()]
+
+        documents = asyncio.run(run())
+
+        self.assertEqual(sorted(doc.metadata["url"] for doc in documents), urls[:6])
+        self.assertTrue(all(doc.metadata["session_id"] for doc in documents))
+
+    def test_rejects_empty_window(self):
+        with self.assertRaises(ValueError):
+            AnchorBrowserLoader([], max_concurrency=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
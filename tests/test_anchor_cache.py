@@ -0,0 +1,167 @@
+import unittest
+from unittest.mock import Mock, patch
+import tempfile
+import time
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from langchain_anchorbrowser.AnchorContentTool import AnchorContentTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorCache import (
+    InMemoryCache,
+    SQLiteCache,
+    RedisCache,
+    make_cache_key,
+)
+
+
+class FakeRedis:
+    """Minimal stand-in for the subset of the redis-py API used by RedisCache"""
+
+    def __init__(self):
+        self.store = {}
+        self.expiry = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+        self.expiry[key] = ex
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    def scan_iter(self, match):
+        prefix = match.rstrip("*")
+        return [key for key in self.store if key.startswith(prefix)]
+
+
+class TestCacheKey(unittest.TestCase):
+    """Test content-addressed cache keys"""
+
+    def test_session_id_and_fragment_are_ignored(self):
+        """Test that keys only depend on what the call asks for"""
+        key = make_cache_key("anchor_content_tool", {"url": "https://Example.com/page#top", "format": "html"})
+        same = make_cache_key(
+            "anchor_content_tool",
+            {"format": "html", "url": "https://example.com/page", "session_id": "abc"},
+        )
+        self.assertEqual(key, same)
+
+    def test_tool_name_and_parameters_change_the_key(self):
+        body = {"url": "https://example.com", "format": "html"}
+        key = make_cache_key("anchor_content_tool", body)
+        self.assertNotEqual(key, make_cache_key("anchor_screenshot_tool", body))
+        self.assertNotEqual(key, make_cache_key("anchor_content_tool", {**body, "format": "markdown"}))
+
+
+class TestCacheBackends(unittest.TestCase):
+    """Test TTL and LRU behaviour of the cache backends"""
+
+    def test_in_memory_lru_eviction(self):
+        cache = InMemoryCache(max_size=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")  # "b" is now the least recently used entry
+        cache.set("c", "3")
+
+        self.assertEqual(cache.get("a"), "1")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "3")
+
+    def test_in_memory_ttl(self):
+        cache = InMemoryCache(ttl=0.01)
+        cache.set("a", "1")
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("a"))
+
+    def test_sqlite_persists_and_evicts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.sqlite3")
+            cache = SQLiteCache(path, max_size=2)
+            cache.set("a", "1")
+            time.sleep(0.01)
+            cache.set("b", {"nested": ["value"]})
+            time.sleep(0.01)
+            cache.get("a")
+            time.sleep(0.01)
+            cache.set("c", "3")
+
+            reopened = SQLiteCache(path, max_size=2)
+            self.assertEqual(reopened.get("a"), "1")
+            self.assertIsNone(reopened.get("b"))
+            self.assertEqual(reopened.get("c"), "3")
+
+    def test_sqlite_ttl(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SQLiteCache(os.path.join(directory, "cache.sqlite3"), ttl=0.01)
+            cache.set("a", "1")
+            time.sleep(0.02)
+            self.assertIsNone(cache.get("a"))
+
+    def test_redis_round_trip(self):
+        client = FakeRedis()
+        cache = RedisCache(client, ttl=30)
+        cache.set("a", "1")
+
+        self.assertEqual(cache.get("a"), "1")
+        self.assertEqual(client.expiry["anchor:cache:a"], 30)
+        cache.clear()
+        self.assertIsNone(cache.get("a"))
+
+
+class TestToolCache(unittest.TestCase):
+    """Test that cached tool calls skip the remote browser"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_cache_hit_skips_session_creation(self, mock_anchorbrowser):
+        mock_client = Mock()
+        mock_session = Mock()
+        mock_session.data.id = "test_session_id"
+        mock_client.sessions.create.return_value = mock_session
+        mock_client.tools.fetch_webpage.return_value = "<html>Test content</html>"
+        mock_anchorbrowser.return_value = mock_client
+
+        tool = AnchorContentTool(cache=InMemoryCache())
+        first = tool.invoke({"url": "https://example.com", "format": "html"})
+        second = AnchorContentTool(cache=tool.cache).invoke({"url": "https://example.com#main", "format": "html"})
+
+        self.assertEqual(first, second)
+        mock_client.tools.fetch_webpage.assert_called_once()
+        mock_client.sessions.create.assert_called_once()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_cache_backend_errors_fall_through_to_the_api(self, mock_anchorbrowser):
+        mock_client = Mock()
+        mock_client.sessions.create.return_value.data.id = "test_session_id"
+        mock_client.tools.fetch_webpage.return_value = "<html>Test content</html>"
+        mock_anchorbrowser.return_value = mock_client
+        redis = Mock()
+        redis.get.side_effect = ConnectionError("Error 111 connecting to localhost:6379")
+        redis.set.side_effect = ConnectionError("Error 111 connecting to localhost:6379")
+        cache = RedisCache(redis)
+
+        with self.assertLogs(level="WARNING"):
+            result = AnchorContentTool(cache=cache).invoke({"url": "https://example.com", "format": "html"})
+
+        self.assertEqual(result, "<html>Test content</html>")
+        mock_client.tools.fetch_webpage.assert_called_once()
+        self.assertEqual(cache.stats(), {"get_errors": 1, "set_errors": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
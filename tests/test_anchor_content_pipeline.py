@@ -0,0 +1,127 @@
+from concurrent.futures import ThreadPoolExecutor
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+import importlib.util
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from langchain_anchorbrowser.AnchorContentTool import AnchorContentTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorCache import InMemoryCache
+from langchain_anchorbrowser.AnchorContentPipeline import (
+    ContentPipeline,
+    StripBoilerplate,
+    HtmlToText,
+    SelectCss,
+    DedupeBlocks,
+    TruncateTokens,
+    ChunkTokens,
+    estimate_tokens,
+)
+
+PAGE = (
+    "<html><head><style>p { color: red }</style></head><body>"
+    "<nav><ul><li>Home<li>About</ul></nav>"
+    "<h1>Prices &amp; plans</h1><p>The <b>basic</b> plan is free.</p>"
+    "<div class='cookie'><p>We use cookies.</p></div><p>We use cookies.</p>"
+    "<footer>(c) 2024</footer></body></html>"
+)
+
+
+class TestContentPipeline(unittest.TestCase):
+    """Test the content post-processing stages"""
+
+    def test_strip_boilerplate_keeps_content_markup(self):
+        html = ContentPipeline(StripBoilerplate()).run(PAGE)
+
+        self.assertNotIn("<nav>", html)
+        self.assertNotIn("(c) 2024", html)
+        self.assertNotIn("color: red", html)
+        self.assertIn("<h1>Prices &amp; plans</h1>", html)
+
+    def test_html_to_text_and_dedupe(self):
+        text = ContentPipeline(StripBoilerplate(), HtmlToText(), DedupeBlocks()).run(PAGE)
+
+        self.assertEqual(text, "Prices & plans\n\nThe basic plan is free.\n\nWe use cookies.")
+
+    def test_markdown_link_blocks_are_boilerplate(self):
+        markdown = "# Docs\n\n[Home](/) | [Guides](/guides) | [API](/api)\n\nInstall the package first."
+
+        self.assertEqual(ContentPipeline(StripBoilerplate()).run(markdown), "# Docs\n\nInstall the package first.")
+
+    def test_truncate_stops_pulling_input_at_the_budget(self):
+        pulled = []
+
+        def source(pieces):
+            for piece in pieces:
+                for block in piece.split("|"):
+                    pulled.append(block)
+                    yield block
+
+        text = ContentPipeline(source, TruncateTokens(6)).run("a" * 12 + "|" + "b" * 12 + "|" + "c" * 12)
+
+        self.assertEqual(text, "a" * 12 + "\n\n" + "b" * 12 + "\n\n[truncated]")
+        self.assertEqual(len(pulled), 3)  # The rest of the page is never processed
+
+    def test_chunks_respect_the_token_budget(self):
+        chunks = ContentPipeline(ChunkTokens(10)).run("a" * 16 + "\n\n" + "b" * 16 + "\n\n" + "c" * 100)
+
+        self.assertEqual(chunks[0], "a" * 16 + "\n\n" + "b" * 16)
+        self.assertTrue(all(estimate_tokens(chunk) <= 10 for chunk in chunks))
+        self.assertEqual("".join(chunks[1:]), "c" * 100)
+
+    @unittest.skipUnless(importlib.util.find_spec("bs4"), "beautifulsoup4 is not installed")
+    def test_select_css(self):
+        text = ContentPipeline(SelectCss("h1, p"), HtmlToText(), DedupeBlocks()).run(PAGE)
+
+        self.assertEqual(text, "Prices & plans\n\nThe basic plan is free.\n\nWe use cookies.")
+
+
+class TestContentToolPipeline(unittest.IsolatedAsyncioTestCase):
+    """Test the pipeline on AnchorContentTool"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._hooks = ()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_tool_returns_processed_content_and_caches_it_raw(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value
+        mock_client.sessions.create.return_value.data.id = "session_1"
+        mock_client.tools.fetch_webpage.return_value = PAGE
+        cache = InMemoryCache()
+        tool = AnchorContentTool(cache=cache, pipeline=ContentPipeline(StripBoilerplate(), HtmlToText()))
+
+        text = tool.invoke({"url": "https://example.com", "format": "html"})
+        raw = AnchorContentTool(cache=cache).invoke({"url": "https://example.com", "format": "html"})
+
+        self.assertTrue(text.startswith("Prices & plans"))
+        self.assertEqual(raw, PAGE)
+        mock_client.tools.fetch_webpage.assert_called_once()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    async def test_large_pages_are_processed_off_the_event_loop(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        mock_client = mock_async_anchorbrowser.return_value
+        mock_client.sessions.create = AsyncMock(return_value=Mock(data=Mock(id="session_1", live_view_url=None)))
+        mock_client.tools.fetch_webpage = AsyncMock(return_value=PAGE)
+        executor = Mock(wraps=ThreadPoolExecutor(max_workers=1))
+        pipeline = ContentPipeline(StripBoilerplate(), HtmlToText(), offload_threshold=10, executor=executor)
+
+        text = await AnchorContentTool(pipeline=pipeline).ainvoke({"url": "https://example.com"})
+
+        self.assertTrue(text.startswith("Prices & plans"))
+        executor.submit.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+import asyncio
+import itertools
+import tempfile
+import threading
+import time
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from langchain_anchorbrowser.AnchorCrawlTool import (
+    AnchorCrawlTool,
+    CrawlState,
+    extract_links,
+    normalize_crawl_url,
+)
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorContentPipeline import ContentPipeline, HtmlToText
+
+SITE = {
+    "https://example.com/": '<a href="/a">A</a> <a href="/b#top">B</a> <a href="https://other.com/">Other</a>',
+    "https://example.com/a": '<a href="/">Home</a> <a href="/a/deep?utm_source=x">Deep</a>',
+    "https://example.com/b": '<a href="https://docs.example.com/">Docs</a>',
+    "https://example.com/a/deep": "<p>Deep page</p>",
+    "https://docs.example.com/": "<p>Docs</p>",
+}
+
+
+def make_session_factory():
+    counter = itertools.count(1)
+
+    def create_session():
+        session = Mock()
+        session.data.id = f"session_{next(counter)}"
+        return session
+    return create_session
+
+
+def fetch(url, **kwargs):
+    if url not in SITE:
+        raise RuntimeError(f"404 {url}")
+    return SITE[url]
+
+
+class TestCrawlHelpers(unittest.TestCase):
+    """Test URL normalization and link extraction"""
+
+    def test_normalize_crawl_url(self):
+        self.assertEqual(normalize_crawl_url("HTTPS://Example.COM:443"), "https://example.com/")
+        self.assertEqual(normalize_crawl_url("http://example.com:8080/a#x"), "http://example.com:8080/a")
+        self.assertEqual(normalize_crawl_url("https://example.com/?utm_source=a&id=1"), "https://example.com/?id=1")
+        self.assertIsNone(normalize_crawl_url("mailto:someone@example.com"))
+        self.assertIsNone(normalize_crawl_url("javascript:void(0)"))
+
+    def test_extract_links_from_html_and_markdown(self):
+        html = '<base href="https://example.com/docs/"><a href="intro">I</a><a href="intro#part">I</a>'
+        self.assertEqual(extract_links(html, "https://example.com/"), ["https://example.com/docs/intro"])
+        markdown = 'See [the guide](/guide "Guide") and ![logo](https://cdn.example.com/logo.png).'
+        self.assertEqual(
+            extract_links(markdown, "https://example.com/page"),
+            ["https://example.com/guide", "https://cdn.example.com/logo.png"],
+        )
+
+
+class TestAnchorCrawlTool(unittest.TestCase):
+    """Test crawling a site through fetch_webpage"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+
+    def make_client(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value
+        mock_client.sessions.create.side_effect = make_session_factory()
+        mock_client.tools.fetch_webpage.side_effect = fetch
+        return mock_client
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_crawl_follows_links_within_depth_and_domain(self, mock_anchorbrowser):
+        mock_client = self.make_client(mock_anchorbrowser)
+        tool = AnchorCrawlTool(format="html")
+
+        pages = {page.url: page for page in tool.crawl(["https://example.com"], max_depth=1)}
+
+        self.assertEqual(set(pages), {"https://example.com/", "https://example.com/a", "https://example.com/b"})
+        self.assertEqual(pages["https://example.com/a"].depth, 1)
+        # Subdomains of the seed's host are in scope, other sites are not
+        self.assertEqual(pages["https://example.com/b"].links, ["https://docs.example.com/"])
+        self.assertEqual(mock_client.tools.fetch_webpage.call_count, 3)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_invoke_deduplicates_and_reports_errors(self, mock_anchorbrowser):
+        self.make_client(mock_anchorbrowser)
+        SITE["https://example.com/a/deep"] = '<a href="/missing">Missing</a>'
+        try:
+            results = AnchorCrawlTool().invoke({"urls": ["https://example.com/", "https://example.com/#top"], "max_depth": 3})
+        finally:
+            SITE["https://example.com/a/deep"] = "<p>Deep page</p>"
+
+        urls = [result["url"] for result in results]
+        self.assertEqual(len(urls), len(set(urls)))
+        self.assertEqual(len(urls), 6)
+        failed = [result for result in results if "error" in result]
+        self.assertEqual([result["url"] for result in failed], ["https://example.com/missing"])
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_concurrency_is_bounded_and_pages_stream(self, mock_anchorbrowser):
+        mock_client = self.make_client(mock_anchorbrowser)
+        links = "".join(f'<a href="/p{i}">{i}</a>' for i in range(8))
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def slow_fetch(url, **kwargs):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return links if url == "https://example.com/" else "<p>leaf</p>"
+        mock_client.tools.fetch_webpage.side_effect = slow_fetch
+
+        pages = AnchorCrawlTool(max_concurrency=3).crawl(["https://example.com/"], max_depth=1, max_pages=None)
+        first = next(pages)
+        self.assertEqual(first.url, "https://example.com/")
+        self.assertEqual(len(list(pages)), 8)
+        self.assertEqual(peak[0], 3)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_state_resumes_an_interrupted_crawl(self, mock_anchorbrowser):
+        mock_client = self.make_client(mock_anchorbrowser)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "crawl.sqlite3")
+            tool = AnchorCrawlTool(state=CrawlState(path), max_concurrency=1)
+            pages = tool.crawl(["https://example.com/"], max_depth=2)
+            first = next(pages)
+            pages.close()  # Crash after the first page
+
+            resumed = AnchorCrawlTool(state=CrawlState(path), max_concurrency=1)
+            rest = [page.url for page in resumed.crawl(["https://example.com/"], max_depth=2)]
+
+        self.assertEqual(first.url, "https://example.com/")
+        self.assertNotIn("https://example.com/", rest)
+        self.assertEqual(len(rest), 4)
+        fetched = [call.kwargs["url"] for call in mock_client.tools.fetch_webpage.call_args_list]
+        self.assertEqual(fetched.count("https://example.com/"), 1)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_max_pages_and_pipeline(self, mock_anchorbrowser):
+        self.make_client(mock_anchorbrowser)
+        tool = AnchorCrawlTool(pipeline=ContentPipeline(HtmlToText()))
+
+        pages = list(tool.crawl(["https://example.com/a/deep", "https://example.com/"], max_pages=2))
+
+        self.assertEqual(len(pages), 2)
+        self.assertIn("Deep page", [page.content for page in pages])
+
+    def test_rejects_seeds_that_cannot_be_crawled(self):
+        with self.assertRaises(ValueError):
+            list(AnchorCrawlTool().crawl(["ftp://example.com/"]))
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_async_crawl(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        mock_async_client = mock_async_anchorbrowser.return_value
+        mock_async_client.sessions.create = AsyncMock(side_effect=make_session_factory())
+        mock_async_client.sessions.delete = AsyncMock()
+        mock_async_client.tools.fetch_webpage = AsyncMock(side_effect=fetch)
+
+        async def run():
+            return [page async for page in AnchorCrawlTool().acrawl(["https://example.com/"], max_depth=1)]
+
+        pages = asyncio.run(run())
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(pages[0].url, "https://example.com/")
+        mock_anchorbrowser.return_value.tools.fetch_webpage.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,270 @@
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+import asyncio
+import threading
+import time
+import sys
+import os
+
+# Add the src and benchmarks directories to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from fake_anchor_server import FakeAnchorServer, FakeServerConfig
+from langchain_anchorbrowser.AnchorContentTool import AnchorContentTool
+from langchain_anchorbrowser.AnchorWebTaskTool import SimpleAnchorWebTaskTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorCancellation import CallCancelledError, CancellationToken
+from langchain_anchorbrowser.AnchorResilience import RetryPolicy, call_with_retry
+
+
+class TestDeadlines(unittest.TestCase):
+    """Test per-tool and per-call deadlines and cooperative cancellation"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._hooks = ()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_deadline_is_passed_to_the_sdk_request(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value
+        mock_client.sessions.create.return_value.data.id = "session_1"
+        mock_client.tools.fetch_webpage.return_value = "<html></html>"
+
+        AnchorContentTool(timeout=30)._run(url="https://example.com")
+        AnchorContentTool(timeout=30).invoke(
+            {"url": "https://example.org"}, config={"configurable": {"anchor_timeout": 5}}
+        )
+
+        first, second = mock_client.tools.fetch_webpage.call_args_list
+        self.assertTrue(25 < first.kwargs["timeout"] <= 30)
+        self.assertTrue(0 < second.kwargs["timeout"] <= 5)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_no_timeout_argument_without_a_deadline(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value
+        mock_client.sessions.create.return_value.data.id = "session_1"
+
+        AnchorContentTool()._run(url="https://example.com")
+
+        mock_client.tools.fetch_webpage.assert_called_once_with(url="https://example.com", session_id="session_1")
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_timed_out_request_ends_its_session_without_retrying_past_the_deadline(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value
+        mock_client.sessions.create.return_value.data.id = "session_1"
+        mock_client.tools.fetch_webpage.side_effect = TimeoutError("read timed out")
+        tool = AnchorContentTool(timeout=0.5, retry_policy=RetryPolicy(initial_backoff=1.0, jitter=False))
+
+        with self.assertRaises(TimeoutError):
+            tool._run(url="https://example.com")
+
+        mock_client.tools.fetch_webpage.assert_called_once()
+        mock_client.sessions.delete.assert_called_once_with("session_1")
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_deadline_bounds_the_wait_for_a_session(self, mock_anchorbrowser):
+        mock_anchorbrowser.return_value.sessions.create.return_value.data.id = "session_1"
+        pool = AnchorClient().configure_session_pool(max_size=1)
+
+        with pool.lease():
+            start = time.monotonic()
+            with self.assertRaises(TimeoutError):
+                AnchorContentTool(timeout=0.05)._run(url="https://example.com")
+
+        self.assertLess(time.monotonic() - start, 1.0)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_cancelling_a_running_call_ends_its_session(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value
+        mock_client.sessions.create.return_value.data.id = "session_1"
+        session_ended = threading.Event()
+        mock_client.sessions.delete.side_effect = lambda session_id: session_ended.set()
+
+        def perform_web_task(**kwargs):
+            # The API fails the request once its session is gone
+            session_ended.wait(5)
+            raise ConnectionError("session ended")
+
+        mock_client.tools.perform_web_task.side_effect = perform_web_task
+        token = CancellationToken()
+        threading.Timer(0.05, token.cancel).start()
+
+        with self.assertRaises(CallCancelledError):
+            SimpleAnchorWebTaskTool().invoke(
+                {"prompt": "Run forever"}, config={"configurable": {"anchor_cancel_token": token}}
+            )
+
+        self.assertTrue(session_ended.is_set())
+        self.assertEqual(mock_client.sessions.delete.call_args_list[0].args, ("session_1",))
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_cancelled_token_stops_before_leasing(self, mock_anchorbrowser):
+        token = CancellationToken()
+        token.cancel()
+
+        with self.assertRaises(CallCancelledError):
+            AnchorContentTool().invoke(
+                {"url": "https://example.com"}, config={"configurable": {"anchor_cancel_token": token}}
+            )
+
+        mock_anchorbrowser.return_value.sessions.create.assert_not_called()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_coalesced_follower_stops_waiting_at_its_deadline(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value
+        mock_client.sessions.create.return_value.data.id = "session_1"
+        started = threading.Event()
+
+        def slow_fetch(**kwargs):
+            started.set()
+            time.sleep(1.0)
+            return "<html></html>"
+
+        mock_client.tools.fetch_webpage.side_effect = slow_fetch
+        leader = threading.Thread(target=AnchorContentTool()._run, kwargs={"url": "https://example.com"})
+        leader.start()
+        started.wait(1)
+
+        start = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            AnchorContentTool(timeout=0.2)._run(url="https://example.com")
+        self.assertLess(time.monotonic() - start, 0.6)
+
+        token = CancellationToken()
+        threading.Timer(0.1, token.cancel).start()
+        start = time.monotonic()
+        with self.assertRaises(CallCancelledError):
+            AnchorContentTool().invoke(
+                {"url": "https://example.com"}, config={"configurable": {"anchor_cancel_token": token}}
+            )
+        self.assertLess(time.monotonic() - start, 0.6)
+        leader.join()
+        # Both callers joined the leader's call instead of starting their own
+        mock_client.tools.fetch_webpage.assert_called_once()
+
+    def test_retry_stops_at_the_deadline(self):
+        fn = Mock(side_effect=TimeoutError("read timed out"))
+
+        with self.assertRaises(TimeoutError):
+            call_with_retry(fn, RetryPolicy(max_attempts=5, initial_backoff=0.2, jitter=False), time.monotonic() + 0.3)
+
+        self.assertEqual(fn.call_count, 2)
+
+
+class TestAsyncDeadlines(unittest.IsolatedAsyncioTestCase):
+    """Test deadlines on the async execution path"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._hooks = ()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    async def test_deadline_cancels_the_call_and_ends_its_session(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        mock_client = mock_async_anchorbrowser.return_value
+        mock_client.sessions.create = AsyncMock(return_value=Mock(data=Mock(id="session_1", live_view_url=None)))
+        mock_client.sessions.delete = AsyncMock()
+
+        async def perform_web_task(**kwargs):
+            await asyncio.sleep(10)
+
+        mock_client.tools.perform_web_task = AsyncMock(side_effect=perform_web_task)
+
+        with self.assertRaises(TimeoutError):
+            await SimpleAnchorWebTaskTool(timeout=0.05)._arun(prompt="Run forever")
+
+        mock_client.sessions.delete.assert_awaited_once_with("session_1")
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    async def test_coalesced_follower_stops_waiting_at_its_deadline(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        mock_client = mock_async_anchorbrowser.return_value
+        mock_client.sessions.create = AsyncMock(return_value=Mock(data=Mock(id="session_1", live_view_url=None)))
+        mock_client.sessions.delete = AsyncMock()
+
+        async def slow_fetch(**kwargs):
+            await asyncio.sleep(0.5)
+            return "<html></html>"
+
+        mock_client.tools.fetch_webpage = AsyncMock(side_effect=slow_fetch)
+        leader = asyncio.ensure_future(AnchorContentTool()._arun(url="https://example.com"))
+        await asyncio.sleep(0.05)
+
+        start = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            await AnchorContentTool(timeout=0.1)._arun(url="https://example.com")
+        self.assertLess(time.monotonic() - start, 0.3)
+
+        # The leader's call carries on for the callers still waiting on it
+        self.assertEqual(await leader, "<html></html>")
+        mock_client.tools.fetch_webpage.assert_awaited_once()
+
+
+class TestDeadlinesOverHttp(unittest.TestCase):
+    """Test against the local fake API that a deadline bounds the whole call, SDK request included"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._hooks = ()
+        self.server = FakeAnchorServer(FakeServerConfig(latency=2.0, session_latency=0)).start()
+        self.environ = patch.dict(os.environ, {
+            'ANCHORBROWSER_API_KEY': 'test_api_key',
+            'ANCHORBROWSER_BASE_URL': self.server.url,
+        })
+        self.environ.start()
+
+    def tearDown(self):
+        AnchorClient().shutdown()
+        self.environ.stop()
+        self.server.stop()
+        AnchorClient._instance = None
+
+    def test_slow_requests_end_at_the_deadline(self):
+        for tool, inputs in (
+            (AnchorContentTool(timeout=0.5), {"url": "https://example.com"}),
+            (SimpleAnchorWebTaskTool(timeout=0.5), {"prompt": "Run slowly", "url": "https://example.com"}),
+        ):
+            start = time.monotonic()
+            with self.assertRaises(Exception):
+                tool.invoke(inputs)
+            self.assertLess(time.monotonic() - start, 0.9)
+
+        requests = self.server.stats()["requests"]
+        self.assertEqual(requests["POST /v1/tools/fetch-webpage"], 1)
+        self.assertEqual(requests["POST /v1/tools/perform-web-task"], 1)
+
+    def test_slow_session_creation_ends_at_the_deadline(self):
+        self.server.config.session_latency = 3.0
+
+        start = time.monotonic()
+        with self.assertRaises(Exception):
+            AnchorContentTool(timeout=0.5).invoke({"url": "https://example.com"})
+
+        self.assertLess(time.monotonic() - start, 0.9)
+        self.assertNotIn("POST /v1/tools/fetch-webpage", self.server.stats()["requests"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import unittest
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from langchain_anchorbrowser.AnchorContentTool import AnchorContentTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorCache import InMemoryCache
+from langchain_anchorbrowser.AnchorInstrumentation import (
+    AnchorHook,
+    CallbackHook,
+    CallMetrics,
+    LoggingHook,
+    OpenTelemetryHook,
+    capture_metrics,
+)
+
+
+class TestInstrumentationHooks(unittest.TestCase):
+    """Test per-call metrics delivered to instrumentation hooks"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._single_flight = None
+        AnchorClient._async_single_flights = None
+        AnchorClient._hooks = ()
+        self.metrics = []
+
+    def make_tool(self, mock_anchorbrowser, **tool_options):
+        mock_client = Mock()
+        mock_session = Mock()
+        mock_session.data.id = "test_session_id"
+        mock_session.data.live_view_url = "test_live_view_url"
+        mock_client.sessions.create.return_value = mock_session
+        mock_client.tools.fetch_webpage.return_value = "<html>Test content</html>"
+        mock_anchorbrowser.return_value = mock_client
+        AnchorClient().add_hook(CallbackHook(self.metrics.append))
+        return AnchorContentTool(**tool_options), mock_client
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_phase_metrics(self, mock_anchorbrowser):
+        """Test that session creation is distinguished from session reuse"""
+        tool, _ = self.make_tool(mock_anchorbrowser)
+
+        tool.invoke({"url": "https://example.com", "format": "html"})
+        tool.invoke({"url": "https://example.com", "format": "html"})
+
+        first, second = self.metrics
+        self.assertEqual(first.tool_name, "anchor_content_tool")
+        self.assertEqual(first.function_name, "fetch_webpage")
+        self.assertEqual(first.url, "https://example.com")
+        self.assertEqual(first.session_id, "test_session_id")
+        self.assertTrue(first.session_created)
+        self.assertFalse(second.session_created)
+        self.assertEqual(first.payload_bytes, len("<html>Test content</html>"))
+        for value in (first.session_acquire_seconds, first.tool_call_seconds, first.decode_seconds):
+            self.assertGreaterEqual(value, 0)
+        self.assertGreaterEqual(first.total_seconds, first.tool_call_seconds)
+        self.assertIsNone(first.error_class)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_error_class_is_recorded(self, mock_anchorbrowser):
+        tool, mock_client = self.make_tool(mock_anchorbrowser)
+        mock_client.tools.fetch_webpage.side_effect = ConnectionError("boom")
+
+        with self.assertRaises(ConnectionError):
+            tool._run(url="https://example.com")
+
+        self.assertEqual(self.metrics[0].error_class, "ConnectionError")
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_cache_hit_is_recorded(self, mock_anchorbrowser):
+        tool, _ = self.make_tool(mock_anchorbrowser, cache=InMemoryCache())
+
+        tool._run(url="https://example.com")
+        tool._run(url="https://example.com")
+
+        self.assertFalse(self.metrics[0].cache_hit)
+        self.assertTrue(self.metrics[1].cache_hit)
+        self.assertIsNone(self.metrics[1].tool_call_seconds)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_failing_hook_does_not_break_the_call(self, mock_anchorbrowser):
+        class BrokenHook(AnchorHook):
+            def on_call_end(self, metrics):
+                raise RuntimeError("hook failure")
+
+        tool, _ = self.make_tool(mock_anchorbrowser)
+        AnchorClient().add_hook(BrokenHook())
+
+        self.assertEqual(tool._run(url="https://example.com"), "<html>Test content</html>")
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_no_hooks_means_no_metrics(self, mock_anchorbrowser):
+        tool, _ = self.make_tool(mock_anchorbrowser)
+        AnchorClient()._hooks = ()
+
+        with patch('langchain_anchorbrowser.AnchorBaseTool.CallMetrics') as mock_metrics:
+            tool._run(url="https://example.com")
+
+        mock_metrics.assert_not_called()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_capture_metrics_without_hooks(self, mock_anchorbrowser):
+        tool, _ = self.make_tool(mock_anchorbrowser)
+        AnchorClient()._hooks = ()
+
+        with capture_metrics() as captured:
+            tool.invoke({"url": "https://example.com"})
+        tool.invoke({"url": "https://example.com/other"})
+
+        self.assertEqual([metrics.url for metrics in captured], ["https://example.com"])
+        self.assertEqual(captured[0].session_id, "test_session_id")
+
+
+class TestBuiltinHooks(unittest.TestCase):
+    """Test the bundled hook implementations"""
+
+    def make_metrics(self, **overrides):
+        values = dict(
+            tool_name="anchor_content_tool",
+            function_name="fetch_webpage",
+            url="https://example.com",
+            started_at=1000.0,
+            total_seconds=1.5,
+            session_acquire_seconds=1.0,
+            tool_call_seconds=0.5,
+            decode_seconds=0.0,
+            payload_bytes=42,
+        )
+        values.update(overrides)
+        return CallMetrics(**values)
+
+    def test_logging_hook(self):
+        hook = LoggingHook()
+        with self.assertLogs(hook.logger, level="INFO") as logs:
+            hook.on_call_end(self.make_metrics())
+
+        self.assertIn("fetch_webpage ok in 1.50s", logs.output[0])
+        self.assertIn("session=1.000s", logs.output[0])
+
+    def test_opentelemetry_hook_with_explicit_tracer(self):
+        tracer = Mock()
+        span = tracer.start_span.return_value
+        hook = OpenTelemetryHook(tracer=tracer)
+
+        hook.on_call_end(self.make_metrics())
+
+        tracer.start_span.assert_called_once_with("anchor.fetch_webpage", start_time=1000 * 10**9)
+        span.set_attribute.assert_any_call("anchor.session_acquire_seconds", 1.0)
+        span.end.assert_called_once_with(end_time=int(1001.5 * 10**9))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from unittest.mock import Mock, patch
+import contextlib
+import io
+import subprocess
+import sys
+import os
+
+# Add the src directory to the path
+SRC = os.path.join(os.path.dirname(__file__), '..', 'src')
+sys.path.insert(0, SRC)
+
+from langchain_anchorbrowser.AnchorContentTool import AnchorContentTool
+from langchain_anchorbrowser.AnchorWebTaskTool import AnchorWebTaskToolKit
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+
+
+class TestLazyConstruction(unittest.TestCase):
+    """Test that tools are cheap to construct and only connect on first use"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.getpass.getpass')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {}, clear=True)
+    def test_construction_has_no_side_effects(self, mock_anchorbrowser, mock_getpass):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            AnchorContentTool()
+            AnchorWebTaskToolKit().get_tools()
+
+        self.assertEqual(stdout.getvalue(), "")
+        mock_anchorbrowser.assert_not_called()
+        mock_getpass.assert_not_called()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_client_is_created_on_first_call(self, mock_anchorbrowser):
+        mock_client = Mock()
+        mock_client.sessions.create.return_value.data.id = "test_session_id"
+        mock_client.tools.fetch_webpage.return_value = "<html>Test content</html>"
+        mock_anchorbrowser.return_value = mock_client
+        tool = AnchorContentTool()
+        mock_anchorbrowser.assert_not_called()
+
+        tool._run(url="https://example.com")
+        tool._run(url="https://example.org")
+
+        mock_anchorbrowser.assert_called_once_with(api_key='test_api_key', max_retries=0)
+        self.assertIs(tool.client, mock_client)
+        self.assertIs(tool.session_pool, AnchorClient().get_session_pool())
+
+    def test_toolkit_reuses_tool_instances(self):
+        toolkit = AnchorWebTaskToolKit()
+        first, second = toolkit.get_tools(), toolkit.get_tools()
+
+        self.assertEqual([tool.name for tool in first], ["simple_anchor_web_task_tool", "advanced_anchor_web_task_tool"])
+        for a, b in zip(first, second):
+            self.assertIs(a, b)
+
+    def test_package_import_is_lazy(self):
+        code = (
+            "import sys, langchain_anchorbrowser as pkg; "
+            "assert 'langchain_anchorbrowser.AnchorContentTool' not in sys.modules; "
+            "from langchain_anchorbrowser import AnchorContentTool; AnchorContentTool(); "
+            "assert 'anchorbrowser' not in sys.modules; "
+            "import langchain_anchorbrowser.AnchorScreenshotTool; "
+            "assert isinstance(pkg.AnchorScreenshotTool, type)"
+        )
+        result = subprocess.run([sys.executable, "-W", "ignore", "-c", code], env={**os.environ, "PYTHONPATH": SRC},
+                                capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
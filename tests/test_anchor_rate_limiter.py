@@ -0,0 +1,192 @@
+import unittest
+from unittest.mock import Mock, patch
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+import time
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from langchain_anchorbrowser.AnchorContentTool import AnchorContentTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorInstrumentation import CallbackHook
+from langchain_anchorbrowser.AnchorRateLimiter import RateLimit, RateLimiter
+
+
+class ConcurrencyProbe:
+    """Tracks the highest number of callers inside a block at once"""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def enter(self):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def exit(self):
+        with self.lock:
+            self.current -= 1
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test the token bucket and in-flight cap"""
+
+    def test_token_bucket_spaces_out_calls(self):
+        limiter = RateLimiter(fetch_webpage=RateLimit(rate=20, burst=2))
+        waits = []
+        start = time.monotonic()
+        for _ in range(4):
+            with limiter.limit("fetch_webpage") as waited:
+                waits.append(waited)
+
+        # Two calls use the burst, the next two wait ~50ms each for a token
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+        self.assertLess(waits[0], 0.01)
+        self.assertGreater(waits[2], 0.03)
+
+    def test_max_in_flight_across_threads(self):
+        limiter = RateLimiter(perform_web_task=RateLimit(max_in_flight=2))
+        probe = ConcurrencyProbe()
+
+        def call():
+            with limiter.limit("perform_web_task"):
+                probe.enter()
+                time.sleep(0.02)
+                probe.exit()
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(lambda _: call(), range(6)))
+
+        self.assertEqual(probe.peak, 2)
+        self.assertEqual(limiter.in_flight("perform_web_task"), 0)
+
+    def test_max_in_flight_in_event_loop(self):
+        limiter = RateLimiter(default=RateLimit(max_in_flight=2))
+        probe = ConcurrencyProbe()
+
+        async def call():
+            async with limiter.alimit("fetch_webpage"):
+                probe.enter()
+                await asyncio.sleep(0.01)
+                probe.exit()
+
+        async def main():
+            await asyncio.gather(*(call() for _ in range(6)))
+
+        asyncio.run(main())
+
+        self.assertEqual(probe.peak, 2)
+
+    def test_thread_release_wakes_async_waiter(self):
+        limiter = RateLimiter(fetch_webpage=RateLimit(max_in_flight=1))
+        held = threading.Event()
+        release = threading.Event()
+
+        def hold_slot():
+            with limiter.limit("fetch_webpage"):
+                held.set()
+                release.wait()
+
+        async def main():
+            async with limiter.alimit("fetch_webpage") as waited:
+                return waited
+
+        thread = threading.Thread(target=hold_slot)
+        thread.start()
+        held.wait()
+        threading.Timer(0.05, release.set).start()
+        waited = asyncio.run(main())
+        thread.join()
+
+        self.assertGreater(waited, 0.03)
+
+    def test_timeout(self):
+        limiter = RateLimiter(fetch_webpage=RateLimit(max_in_flight=1), timeout=0.05)
+        with limiter.limit("fetch_webpage"):
+            with self.assertRaises(TimeoutError):
+                with limiter.limit("fetch_webpage"):
+                    pass
+
+    def test_limits_are_per_function(self):
+        limiter = RateLimiter(perform_web_task=RateLimit(max_in_flight=1))
+        with limiter.limit("perform_web_task"):
+            with limiter.limit("fetch_webpage") as waited:
+                self.assertEqual(waited, 0.0)
+
+    def test_invalid_limit(self):
+        with self.assertRaises(ValueError):
+            RateLimit(rate=0)
+
+
+class TestToolRateLimiting(unittest.TestCase):
+    """Test the governor configured on AnchorClient"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._single_flight = None
+        AnchorClient._async_single_flights = None
+        AnchorClient._hooks = ()
+        AnchorClient._rate_limiter = None
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_tool_calls_are_governed_and_queue_wait_is_reported(self, mock_anchorbrowser):
+        mock_client = Mock()
+        sessions = iter(range(100))
+
+        def create_session():
+            session = Mock()
+            session.data.id = f"session_{next(sessions)}"
+            return session
+
+        probe = ConcurrencyProbe()
+
+        def fetch_webpage(**kwargs):
+            probe.enter()
+            time.sleep(0.02)
+            probe.exit()
+            return f"<html>{kwargs['url']}</html>"
+
+        mock_client.sessions.create.side_effect = create_session
+        mock_client.tools.fetch_webpage.side_effect = fetch_webpage
+        mock_anchorbrowser.return_value = mock_client
+        metrics = []
+        AnchorClient().add_hook(CallbackHook(metrics.append))
+        AnchorClient().configure_rate_limits(fetch_webpage=RateLimit(max_in_flight=2))
+        tool = AnchorContentTool()
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = list(executor.map(lambda i: tool._run(url=f"https://example.com/{i}"), range(6)))
+
+        self.assertEqual(results, [f"<html>https://example.com/{i}</html>" for i in range(6)])
+        self.assertEqual(probe.peak, 2)
+        # Queued calls never leased a session, so at most two were ever created
+        self.assertEqual(mock_client.sessions.create.call_count, 2)
+        self.assertEqual(len(metrics), 6)
+        self.assertTrue(all(m.queue_wait_seconds is not None for m in metrics))
+        self.assertGreater(max(m.queue_wait_seconds for m in metrics), 0.01)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_no_limits_by_default(self, mock_anchorbrowser):
+        mock_client = Mock()
+        mock_client.sessions.create.return_value.data.id = "test_session_id"
+        mock_client.tools.fetch_webpage.return_value = "<html>Test content</html>"
+        mock_anchorbrowser.return_value = mock_client
+
+        self.assertEqual(AnchorContentTool()._run(url="https://example.com"), "<html>Test content</html>")
+        self.assertIsNone(AnchorClient().get_rate_limiter())
+
+
+if __name__ == '__main__':
+    unittest.main()
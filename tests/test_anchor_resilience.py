@@ -0,0 +1,267 @@
+import unittest
+from unittest.mock import Mock, patch
+import asyncio
+import sys
+import os
+
+import httpx
+
+# Add the src and benchmarks directories to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from anchorbrowser import APIStatusError
+from fake_anchor_server import FakeAnchorServer, FakeServerConfig
+from langchain_anchorbrowser.AnchorContentTool import AnchorContentTool
+from langchain_anchorbrowser.AnchorWebTaskTool import SimpleAnchorWebTaskTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorResilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    call_with_retry,
+    is_transient_error,
+)
+
+FAST_RETRY = RetryPolicy(max_attempts=3, initial_backoff=0, jitter=False)
+
+
+def status_error(status_code, headers=None):
+    request = httpx.Request("POST", "https://api.anchorbrowser.io/v1/tools/fetch-webpage")
+    response = httpx.Response(status_code, headers=headers, request=request)
+    return APIStatusError(f"HTTP {status_code}", response=response, body=None)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Test backoff computation and error classification"""
+
+    def test_transient_errors(self):
+        self.assertTrue(is_transient_error(status_error(503)))
+        self.assertTrue(is_transient_error(status_error(429)))
+        self.assertTrue(is_transient_error(ConnectionError()))
+        self.assertFalse(is_transient_error(status_error(400)))
+        self.assertFalse(is_transient_error(ValueError()))
+
+    def test_exponential_backoff_is_capped(self):
+        policy = RetryPolicy(initial_backoff=1, multiplier=2, max_backoff=5, jitter=False)
+        self.assertEqual([policy.backoff(n) for n in (1, 2, 3, 4)], [1, 2, 4, 5])
+
+    def test_retry_after_header_wins(self):
+        policy = RetryPolicy(initial_backoff=1, max_backoff=10, jitter=False)
+        self.assertEqual(policy.backoff(1, status_error(429, {"retry-after": "3"})), 3.0)
+
+    def test_call_with_retry_gives_up_after_max_attempts(self):
+        fn = Mock(side_effect=ConnectionError("down"))
+        with self.assertRaises(ConnectionError):
+            call_with_retry(fn, FAST_RETRY)
+        self.assertEqual(fn.call_count, 3)
+
+    def test_permanent_errors_are_not_retried(self):
+        fn = Mock(side_effect=status_error(404))
+        with self.assertRaises(APIStatusError):
+            call_with_retry(fn, FAST_RETRY)
+        fn.assert_called_once()
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test the closed -> open -> half-open -> closed cycle"""
+
+    def test_opens_after_threshold_and_fails_fast(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+        failing = Mock(side_effect=ConnectionError("down"))
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                breaker.call(failing)
+
+        with self.assertRaises(CircuitOpenError):
+            breaker.call(failing)
+        self.assertEqual(failing.call_count, 2)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_half_open_probe_closes_the_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        with self.assertRaises(ConnectionError):
+            breaker.call(Mock(side_effect=ConnectionError("down")))
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+
+        self.assertEqual(breaker.call(lambda: "ok"), "ok")
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_probe_reopens_the_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        failing = Mock(side_effect=ConnectionError("still down"))
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                breaker.call(failing)
+
+        self.assertEqual(breaker._state, CircuitBreaker.OPEN)
+        self.assertEqual(failing.call_count, 2)
+
+    def test_permanent_errors_do_not_trip_the_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        with self.assertRaises(APIStatusError):
+            breaker.call(Mock(side_effect=status_error(400)))
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+class TestToolRetries(unittest.TestCase):
+    """Test retries and the circuit breaker wired into the tools"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._single_flight = None
+        AnchorClient._async_single_flights = None
+        AnchorClient._retry_policy = None
+        AnchorClient._circuit_breaker = None
+
+    def make_client(self, mock_anchorbrowser):
+        mock_client = Mock()
+        sessions = []
+        for session_id in ("session_1", "session_2", "session_3"):
+            session = Mock()
+            session.data.id = session_id
+            sessions.append(session)
+        mock_client.sessions.create.side_effect = sessions
+        mock_anchorbrowser.return_value = mock_client
+        AnchorClient().configure_resilience(retry_policy=FAST_RETRY)
+        return mock_client
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_fetch_is_retried_on_a_fresh_session(self, mock_anchorbrowser):
+        mock_client = self.make_client(mock_anchorbrowser)
+        mock_client.tools.fetch_webpage.side_effect = [status_error(503), "<html>ok</html>"]
+
+        result = AnchorContentTool()._run(url="https://example.com")
+
+        self.assertEqual(result, "<html>ok</html>")
+        session_ids = [c.kwargs["session_id"] for c in mock_client.tools.fetch_webpage.call_args_list]
+        self.assertEqual(session_ids, ["session_1", "session_2"])
+        mock_client.sessions.delete.assert_called_once_with("session_1")
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_web_tasks_are_not_retried_by_default(self, mock_anchorbrowser):
+        mock_client = self.make_client(mock_anchorbrowser)
+        mock_client.tools.perform_web_task.side_effect = status_error(503)
+
+        with self.assertRaises(APIStatusError):
+            SimpleAnchorWebTaskTool()._run(prompt="Buy a ticket", url="https://example.com")
+
+        mock_client.tools.perform_web_task.assert_called_once()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_web_task_retries_are_opt_in(self, mock_anchorbrowser):
+        mock_client = self.make_client(mock_anchorbrowser)
+        mock_client.tools.perform_web_task.side_effect = [status_error(503), Mock(data="done")]
+
+        result = SimpleAnchorWebTaskTool(retry_web_tasks=True)._run(prompt="Read the title", url="https://example.com")
+
+        self.assertEqual(result, "done")
+        self.assertEqual(mock_client.tools.perform_web_task.call_count, 2)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_session_creation_is_retried(self, mock_anchorbrowser):
+        mock_client = self.make_client(mock_anchorbrowser)
+        session = Mock()
+        session.data.id = "session_2"
+        mock_client.sessions.create.side_effect = [ConnectionError("reset"), session]
+        mock_client.tools.fetch_webpage.return_value = "<html>ok</html>"
+
+        AnchorContentTool()._run(url="https://example.com")
+
+        self.assertEqual(mock_client.sessions.create.call_count, 2)
+        self.assertEqual(mock_client.tools.fetch_webpage.call_args.kwargs["session_id"], "session_2")
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_open_circuit_fails_fast(self, mock_anchorbrowser):
+        mock_client = self.make_client(mock_anchorbrowser)
+        AnchorClient().configure_resilience(circuit_breaker=CircuitBreaker(failure_threshold=1, recovery_timeout=60))
+        mock_client.tools.fetch_webpage.side_effect = status_error(502)
+        tool = AnchorContentTool()
+
+        with self.assertRaises(CircuitOpenError):
+            tool._run(url="https://example.com")
+
+        # First attempt trips the breaker; the retry is rejected before reaching the API
+        mock_client.tools.fetch_webpage.assert_called_once()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_async_fetch_is_retried(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        self.make_client(mock_anchorbrowser)
+        mock_async_client = Mock()
+        session = Mock()
+        session.data.id = "async_session"
+        responses = [status_error(500), "<html>ok</html>"]
+
+        async def create_session():
+            return session
+
+        async def fetch_webpage(**kwargs):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        mock_async_client.sessions.create.side_effect = create_session
+        mock_async_client.sessions.delete.side_effect = lambda session_id: asyncio.sleep(0)
+        mock_async_client.tools.fetch_webpage.side_effect = fetch_webpage
+        mock_async_anchorbrowser.return_value = mock_async_client
+
+        result = asyncio.run(AnchorContentTool()._arun(url="https://example.com"))
+
+        self.assertEqual(result, "<html>ok</html>")
+        self.assertEqual(mock_async_client.tools.fetch_webpage.call_count, 2)
+
+
+class TestHttpRequestsPerAttempt(unittest.TestCase):
+    """Test against the local fake API that each attempt is a single HTTP request"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._single_flight = None
+        AnchorClient._async_single_flights = None
+        AnchorClient._retry_policy = None
+        AnchorClient._circuit_breaker = None
+        self.server = FakeAnchorServer(FakeServerConfig(latency=0, session_latency=0, failure_rate=1.0)).start()
+        self.environ = patch.dict(os.environ, {
+            'ANCHORBROWSER_API_KEY': 'test_api_key',
+            'ANCHORBROWSER_BASE_URL': self.server.url,
+        })
+        self.environ.start()
+
+    def tearDown(self):
+        AnchorClient().shutdown()
+        self.environ.stop()
+        self.server.stop()
+        AnchorClient._instance = None
+
+    def test_failing_web_task_is_sent_once(self):
+        with self.assertRaises(APIStatusError):
+            SimpleAnchorWebTaskTool().invoke({"prompt": "Buy the item", "url": "https://example.com"})
+
+        self.assertEqual(self.server.stats()["requests"]["POST /v1/tools/perform-web-task"], 1)
+
+    def test_retries_are_not_multiplied_by_the_sdk(self):
+        AnchorClient().configure_resilience(retry_policy=FAST_RETRY)
+        with self.assertRaises(APIStatusError):
+            AnchorContentTool().invoke({"url": "https://example.com"})
+
+        self.assertEqual(self.server.stats()["requests"]["POST /v1/tools/fetch-webpage"], FAST_RETRY.max_attempts)
+
+
+if __name__ == '__main__':
+    unittest.main()
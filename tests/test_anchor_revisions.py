@@ -0,0 +1,137 @@
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+import tempfile
+import time
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from langchain_anchorbrowser.AnchorContentTool import AnchorContentTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorContentPipeline import ChunkTokens, ContentPipeline
+from langchain_anchorbrowser.AnchorRevisions import RevisionStore, UNCHANGED_MARKER
+
+
+class TestRevisionStore(unittest.TestCase):
+    """Test the on-disk revision store"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "revisions.sqlite3")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_revisions_survive_a_restart(self):
+        RevisionStore(self.path).record("key", "https://example.com", "first")
+
+        revision = RevisionStore(self.path).get("key")
+
+        self.assertEqual(revision.content, "first")
+        self.assertEqual(revision.url, "https://example.com")
+
+    def test_unchanged_content_keeps_its_change_time(self):
+        store = RevisionStore(self.path)
+        _, first = store.record("key", "https://example.com", "same")
+        time.sleep(0.01)
+
+        previous, current = store.record("key", "https://example.com", "same")
+
+        self.assertEqual(previous.content_hash, current.content_hash)
+        self.assertEqual(current.changed_at, first.changed_at)
+        self.assertGreater(store.get("key").fetched_at, first.fetched_at)
+
+
+class TestContentToolRevisions(unittest.IsolatedAsyncioTestCase):
+    """Test change_mode on AnchorContentTool"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._hooks = ()
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = RevisionStore(os.path.join(self.directory.name, "revisions.sqlite3"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def fetch_sequence(self, mock_anchorbrowser, *pages):
+        mock_client = mock_anchorbrowser.return_value
+        mock_client.sessions.create.return_value.data.id = "session_1"
+        mock_client.tools.fetch_webpage.side_effect = list(pages)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_if_changed_returns_a_marker_for_unchanged_pages(self, mock_anchorbrowser):
+        self.fetch_sequence(mock_anchorbrowser, "v1", "v1", "v2")
+        tool = AnchorContentTool(revisions=self.store, change_mode="if_changed")
+
+        results = [tool.invoke({"url": "https://example.com"}) for _ in range(3)]
+
+        self.assertEqual(results[0], "v1")
+        self.assertTrue(results[1].startswith(f"{UNCHANGED_MARKER} https://example.com has not changed since"))
+        self.assertEqual(results[2], "v2")
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_diff_mode_returns_only_what_changed(self, mock_anchorbrowser):
+        self.fetch_sequence(mock_anchorbrowser, "title\nprice: 10\nfooter", "title\nprice: 12\nfooter")
+        tool = AnchorContentTool(revisions=self.store, change_mode="diff")
+
+        tool.invoke({"url": "https://example.com"})
+        diff = tool.invoke({"url": "https://example.com"})
+
+        self.assertIn("-price: 10", diff)
+        self.assertIn("+price: 12", diff)
+        self.assertTrue(diff.startswith("--- https://example.com @"))
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_changed_since(self, mock_anchorbrowser):
+        self.fetch_sequence(mock_anchorbrowser, "v1", "v1", "v2")
+        tool = AnchorContentTool(revisions=self.store)
+
+        tool.invoke({"url": "https://example.com"})
+        checkpoint = time.time()
+
+        self.assertFalse(tool.changed_since("https://example.com", checkpoint))
+        self.assertTrue(tool.changed_since("https://example.com", checkpoint))
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_changed_chunks_are_returned_as_chunks(self, mock_anchorbrowser):
+        self.fetch_sequence(mock_anchorbrowser, "a" * 40, "b" * 40)
+        tool = AnchorContentTool(
+            revisions=self.store, change_mode="if_changed", pipeline=ContentPipeline(ChunkTokens(5))
+        )
+
+        tool.invoke({"url": "https://example.com"})
+
+        self.assertEqual(tool.invoke({"url": "https://example.com"}), ["b" * 20, "b" * 20])
+
+    def test_change_mode_needs_a_store(self):
+        with self.assertRaises(ValueError):
+            AnchorContentTool(change_mode="diff")._track_revision({"url": "https://example.com"}, "page")
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    async def test_async_if_changed(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        mock_client = mock_async_anchorbrowser.return_value
+        mock_client.sessions.create = AsyncMock(return_value=Mock(data=Mock(id="session_1", live_view_url=None)))
+        mock_client.tools.fetch_webpage = AsyncMock(side_effect=["v1", "v1"])
+        tool = AnchorContentTool(revisions=self.store, change_mode="if_changed")
+
+        await tool.ainvoke({"url": "https://example.com"})
+        result = await tool.ainvoke({"url": "https://example.com"})
+
+        self.assertTrue(result.startswith(UNCHANGED_MARKER))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+from concurrent.futures import ThreadPoolExecutor
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+import base64
+import importlib.util
+import io
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from langchain_anchorbrowser.AnchorScreenshotTool import AnchorScreenshotTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorCache import InMemoryCache
+from langchain_anchorbrowser.AnchorScreenshotDerivatives import (
+    Rendition,
+    ScreenshotDerivatives,
+    derive_image,
+    hamming_distance,
+)
+
+HAS_PILLOW = importlib.util.find_spec("PIL") is not None
+
+
+class FakeDerivatives(ScreenshotDerivatives):
+    """Stands in for Pillow so the tool wiring can be tested without it"""
+
+    def __init__(self):
+        self.renditions = (Rendition("thumb", width=320),)
+        self.perceptual_hash = True
+        self.executor = None
+        self.calls = []
+
+    def derive(self, image: bytes) -> dict:
+        self.calls.append(image)
+        return {"width": 1280, "height": 720, "renditions": {"thumb": "dGh1bWI="}, "phash": "0f0f0f0f0f0f0f0f"}
+
+    async def aderive(self, image: bytes) -> dict:
+        return self.derive(image)
+
+
+def make_streaming_client(client, payload: bytes):
+    response = client.tools.with_streaming_response.screenshot_webpage.return_value.__enter__.return_value
+    response.iter_bytes.return_value = [payload]
+
+
+class TestScreenshotDerivatives(unittest.TestCase):
+    """Test local screenshot post-processing"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._hooks = ()
+
+    def test_hamming_distance(self):
+        self.assertEqual(hamming_distance("00000000000000ff", "000000000000000f"), 4)
+
+    @unittest.skipIf(HAS_PILLOW, "Pillow is installed")
+    def test_pillow_is_required(self):
+        with self.assertRaises(ImportError):
+            ScreenshotDerivatives()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_derivatives_are_cached_alongside_the_capture(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value
+        mock_client.sessions.create.return_value.data.id = "session_1"
+        make_streaming_client(mock_client, b"\x89PNG")
+        derivatives = FakeDerivatives()
+        tool = AnchorScreenshotTool(output_mode="bytes", cache=InMemoryCache(), derivatives=derivatives)
+
+        first = tool.invoke({"url": "https://example.com"})
+        second = tool.invoke({"url": "https://example.com"})
+
+        self.assertEqual(first, second)
+        self.assertEqual(first["screenshot"], b"\x89PNG")
+        self.assertEqual(first["phash"], "0f0f0f0f0f0f0f0f")
+        self.assertEqual(derivatives.calls, [b"\x89PNG"])
+        mock_client.tools.with_streaming_response.screenshot_webpage.assert_called_once()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_base64_captures_are_decoded_for_derivation(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value
+        mock_client.sessions.create.return_value.data.id = "session_1"
+        make_streaming_client(mock_client, b"\x89PNG")
+        derivatives = FakeDerivatives()
+
+        result = AnchorScreenshotTool(output_mode="base64", derivatives=derivatives).invoke({"url": "https://example.com"})
+
+        self.assertEqual(result["screenshot"], base64.b64encode(b"\x89PNG").decode("ascii"))
+        self.assertEqual(derivatives.calls, [b"\x89PNG"])
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_text_mode_is_rejected_before_capturing(self, mock_anchorbrowser):
+        with self.assertRaises(ValueError):
+            AnchorScreenshotTool(derivatives=FakeDerivatives()).invoke({"url": "https://example.com"})
+
+        mock_anchorbrowser.return_value.sessions.create.assert_not_called()
+
+    @unittest.skipUnless(HAS_PILLOW, "Pillow is not installed")
+    def test_renditions_and_perceptual_hash(self):
+        from PIL import Image, ImageDraw
+
+        image = Image.new("RGB", (800, 600), "white")
+        ImageDraw.Draw(image).rectangle((100, 100, 500, 400), fill="navy")
+        png = io.BytesIO()
+        image.save(png, format="PNG")
+        resized = io.BytesIO()
+        image.resize((400, 300)).save(resized, format="PNG")
+        renditions = (Rendition("thumb", width=200, format="PNG"), Rendition("small", format="JPEG", max_bytes=4000))
+
+        derived = derive_image(png.getvalue(), renditions)
+        with Image.open(io.BytesIO(base64.b64decode(derived["renditions"]["thumb"]))) as thumb:
+            self.assertEqual(thumb.size, (200, 150))
+        self.assertLessEqual(len(base64.b64decode(derived["renditions"]["small"])), 4000)
+        self.assertLessEqual(hamming_distance(derived["phash"], derive_image(resized.getvalue(), ())["phash"]), 4)
+
+    @unittest.skipUnless(HAS_PILLOW, "Pillow is not installed")
+    def test_custom_executor(self):
+        from PIL import Image
+
+        png = io.BytesIO()
+        Image.new("RGB", (64, 64), "red").save(png, format="PNG")
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            derived = ScreenshotDerivatives(executor=executor).derive(png.getvalue())
+
+        self.assertEqual((derived["width"], derived["height"]), (64, 64))
+
+
+class TestAsyncScreenshotDerivatives(unittest.IsolatedAsyncioTestCase):
+    """Test derivatives on the async execution path"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._hooks = ()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    async def test_async_derivatives(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        mock_client = mock_async_anchorbrowser.return_value
+        mock_client.sessions.create = AsyncMock(return_value=Mock(data=Mock(id="session_1", live_view_url=None)))
+        mock_client.sessions.delete = AsyncMock()
+
+        async def iter_bytes(chunk_size):
+            yield b"\x89PNG"
+
+        response = mock_client.tools.with_streaming_response.screenshot_webpage.return_value
+        response.__aenter__ = AsyncMock(return_value=Mock(iter_bytes=iter_bytes))
+        response.__aexit__ = AsyncMock(return_value=False)
+        derivatives = FakeDerivatives()
+
+        result = await AnchorScreenshotTool(output_mode="bytes", derivatives=derivatives).ainvoke(
+            {"url": "https://example.com"}
+        )
+
+        self.assertEqual(result["screenshot"], b"\x89PNG")
+        self.assertEqual(result["renditions"], {"thumb": "dGh1bWI="})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,216 @@
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+import asyncio
+import base64
+import io
+import tempfile
+import threading
+import time
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from langchain_anchorbrowser.AnchorScreenshotTool import AnchorScreenshotTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorCache import InMemoryCache
+from langchain_anchorbrowser.AnchorResilience import RetryPolicy
+
+IMAGE = bytes(range(256)) * 40 + b"\x89PNG tail"
+
+
+class AsyncStreamedResponse:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def iter_bytes(self, chunk_size=None):
+        for chunk in self.chunks:
+            yield chunk
+
+
+class TestScreenshotOutputModes(unittest.TestCase):
+    """Test streamed screenshot output modes"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._single_flight = None
+        AnchorClient._async_single_flights = None
+
+    def make_client(self, mock_anchorbrowser, chunks):
+        mock_client = Mock()
+        mock_session = Mock()
+        mock_session.data.id = "test_session_id"
+        mock_client.sessions.create.return_value = mock_session
+        response = Mock()
+        response.iter_bytes.return_value = iter(chunks)
+        stream = MagicMock()
+        stream.__enter__.return_value = response
+        mock_client.tools.with_streaming_response.screenshot_webpage.return_value = stream
+        mock_anchorbrowser.return_value = mock_client
+        return mock_client
+
+    def chunks(self, size=1000):
+        return [IMAGE[i:i + size] for i in range(0, len(IMAGE), size)]
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_base64_mode(self, mock_anchorbrowser):
+        """Test that chunked base64 encoding matches encoding the whole image"""
+        mock_client = self.make_client(mock_anchorbrowser, self.chunks())
+
+        result = AnchorScreenshotTool(output_mode="base64")._run(url="https://example.com", width=800)
+
+        self.assertEqual(result, base64.b64encode(IMAGE).decode("ascii"))
+        mock_client.tools.with_streaming_response.screenshot_webpage.assert_called_once_with(
+            url="https://example.com", width=800, session_id="test_session_id"
+        )
+        mock_client.tools.screenshot_webpage.assert_not_called()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_bytes_mode(self, mock_anchorbrowser):
+        self.make_client(mock_anchorbrowser, self.chunks())
+
+        result = AnchorScreenshotTool(output_mode="bytes")._run(url="https://example.com")
+
+        self.assertEqual(result, IMAGE)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_file_mode_with_directory(self, mock_anchorbrowser):
+        """Test that a directory target gets a unique file holding the raw image"""
+        self.make_client(mock_anchorbrowser, self.chunks())
+
+        with tempfile.TemporaryDirectory() as directory:
+            result = AnchorScreenshotTool(output_mode="file", output_target=directory)._run(url="https://example.com")
+            (file_name,) = os.listdir(directory)
+            with open(os.path.join(directory, file_name), "rb") as f:
+                self.assertEqual(f.read(), IMAGE)
+
+        self.assertIn(f"({len(IMAGE)} bytes)", result)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_file_mode_with_file_object(self, mock_anchorbrowser):
+        self.make_client(mock_anchorbrowser, self.chunks())
+        buffer = io.BytesIO()
+
+        AnchorScreenshotTool(output_mode="file", output_target=buffer)._run(url="https://example.com")
+
+        self.assertEqual(buffer.getvalue(), IMAGE)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_file_object_gets_only_the_retried_capture(self, mock_anchorbrowser):
+        attempts = []
+
+        def flaky_chunks(chunk_size=None):
+            attempts.append(chunk_size)
+            yield IMAGE[:100]
+            if len(attempts) == 1:
+                raise ConnectionError("stream interrupted")
+            yield IMAGE[100:]
+
+        mock_client = self.make_client(mock_anchorbrowser, [])
+        response = mock_client.tools.with_streaming_response.screenshot_webpage.return_value.__enter__.return_value
+        response.iter_bytes.side_effect = flaky_chunks
+        buffer = io.BytesIO()
+
+        result = AnchorScreenshotTool(
+            output_mode="file", output_target=buffer, retry_policy=RetryPolicy(initial_backoff=0, jitter=False)
+        )._run(url="https://example.com")
+
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(buffer.getvalue(), IMAGE)
+        self.assertEqual(result, f"Screenshot written ({len(IMAGE)} bytes)")
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_file_mode_removes_partial_file_on_error(self, mock_anchorbrowser):
+        def failing_chunks(chunk_size=None):
+            yield IMAGE[:100]
+            raise ConnectionError("stream interrupted")
+
+        mock_client = self.make_client(mock_anchorbrowser, [])
+        response = mock_client.tools.with_streaming_response.screenshot_webpage.return_value.__enter__.return_value
+        response.iter_bytes.side_effect = failing_chunks
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "capture.png")
+            with self.assertRaises(ConnectionError):
+                AnchorScreenshotTool(output_mode="file", output_target=path)._run(url="https://example.com")
+            self.assertFalse(os.path.exists(path))
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_modes_do_not_share_concurrent_or_cached_captures(self, mock_anchorbrowser):
+        """Test that concurrent and cached identical calls only share results of the same output mode"""
+        mock_client = self.make_client(mock_anchorbrowser, self.chunks())
+        started = threading.Event()
+
+        def slow_text_capture(**kwargs):
+            started.set()
+            time.sleep(0.1)
+            return Mock(text=Mock(return_value="decoded image"))
+        mock_client.tools.screenshot_webpage.side_effect = slow_text_capture
+        cache = InMemoryCache()
+        results = {}
+
+        def run(mode):
+            results[mode] = AnchorScreenshotTool(output_mode=mode, cache=cache)._run(url="https://example.com")
+
+        text_thread = threading.Thread(target=run, args=("text",))
+        text_thread.start()
+        started.wait(1)
+        run("bytes")
+        text_thread.join()
+
+        self.assertEqual(results, {"text": "decoded image", "bytes": IMAGE})
+        mock_client.tools.screenshot_webpage.assert_called_once()
+        mock_client.tools.with_streaming_response.screenshot_webpage.assert_called_once()
+        # Each mode now hits its own cache entry
+        self.assertEqual(AnchorScreenshotTool(output_mode="bytes", cache=cache)._run(url="https://example.com"), IMAGE)
+        self.assertEqual(AnchorScreenshotTool(cache=cache)._run(url="https://example.com"), "decoded image")
+        mock_client.tools.screenshot_webpage.assert_called_once()
+
+    def test_file_mode_requires_target(self):
+        tool = AnchorScreenshotTool.model_construct(output_mode="file", output_target=None)
+        with self.assertRaises(ValueError):
+            tool._open_sink()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_async_base64_mode(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        self.make_client(mock_anchorbrowser, [])
+        mock_async_client = Mock()
+        mock_session = Mock()
+        mock_session.data.id = "test_session_id"
+
+        async def create_session():
+            return mock_session
+
+        mock_async_client.sessions.create.side_effect = create_session
+        mock_async_client.tools.with_streaming_response.screenshot_webpage.return_value = (
+            AsyncStreamedResponse(self.chunks(777))
+        )
+        mock_async_anchorbrowser.return_value = mock_async_client
+
+        result = asyncio.run(AnchorScreenshotTool(output_mode="base64")._arun(url="https://example.com"))
+
+        self.assertEqual(result, base64.b64encode(IMAGE).decode("ascii"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+import asyncio
+import time
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pydantic import BaseModel
+from langchain_anchorbrowser.AnchorWebTaskTool import AdvancedAnchorWebTaskTool, SimpleAnchorWebTaskTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorSemanticCache import HashingEmbedder, SemanticTaskCache, normalize_prompt
+from langchain_anchorbrowser.AnchorStructuredOutput import OutputValidationError
+
+PARTITION = SemanticTaskCache.partition("tool", "https://shop.example.com/item", None)
+
+
+class Price(BaseModel):
+    price: float
+
+
+class KeywordEmbedder:
+    """Embeddings-style stand-in that maps prompts about prices to the same vector"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        return [1.0, 0.0] if "price" in text or "cost" in text else [0.0, 1.0]
+
+
+class TestSemanticTaskCache(unittest.TestCase):
+    """Test exact and near-match lookups of web task results"""
+
+    def test_normalized_prompt_matches_exactly_without_embedding(self):
+        embedder = KeywordEmbedder()
+        cache = SemanticTaskCache(embedder)
+        cache.set(PARTITION, "Get the price!", "$10")
+        embedder.calls = 0
+
+        self.assertEqual(normalize_prompt("  GET the   price "), "get the price")
+        self.assertEqual(cache.get(PARTITION, "get THE price"), "$10")
+        self.assertEqual(embedder.calls, 0)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_near_match_above_threshold(self):
+        cache = SemanticTaskCache(KeywordEmbedder(), threshold=0.95)
+        cache.set(PARTITION, "what is the price on this page", "$10")
+
+        self.assertEqual(cache.get(PARTITION, "how much does it cost"), "$10")
+        self.assertIsNone(cache.get(PARTITION, "list the reviews"))
+        stats = cache.stats()
+        self.assertEqual((stats["near_hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_partitions_keep_urls_and_schemas_apart(self):
+        cache = SemanticTaskCache(KeywordEmbedder())
+        cache.set(PARTITION, "get the price", "$10")
+
+        other_page = SemanticTaskCache.partition("tool", "https://shop.example.com/other", None)
+        other_schema = SemanticTaskCache.partition("tool", "https://shop.example.com/item", {"type": "object"})
+        self.assertIsNone(cache.get(other_page, "get the price"))
+        self.assertIsNone(cache.get(other_schema, "get the price"))
+        # URLs are normalized like the response cache's keys
+        same_page = SemanticTaskCache.partition("tool", "HTTPS://shop.example.com/item#reviews", None)
+        self.assertEqual(cache.get(same_page, "get the price"), "$10")
+
+    def test_ttl_and_size_bound(self):
+        cache = SemanticTaskCache(HashingEmbedder(), ttl=0.05, max_size=2)
+        cache.set(PARTITION, "first", 1)
+        cache.set(PARTITION, "second", 2)
+        cache.set(PARTITION, "third", 3)
+        self.assertIsNone(cache.get(PARTITION, "first"))
+        self.assertEqual(cache.get(PARTITION, "third"), 3)
+
+        time.sleep(0.06)
+        self.assertIsNone(cache.get(PARTITION, "third"))
+        self.assertEqual(cache._partitions, {})
+
+    def test_hashing_embedder_matches_rewordings(self):
+        cache = SemanticTaskCache(HashingEmbedder(), threshold=0.85)
+        cache.set(PARTITION, "Get the product price", "$10")
+
+        self.assertEqual(cache.get(PARTITION, "What is the price of the product?"), "$10")
+        self.assertIsNone(cache.get(PARTITION, "Get the shipping options"))
+
+    def test_rejects_invalid_threshold(self):
+        with self.assertRaises(ValueError):
+            SemanticTaskCache(threshold=0)
+
+
+class TestWebTaskSemanticCache(unittest.TestCase):
+    """Test the semantic cache on the web task tools"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+
+    def make_client(self, mock_anchorbrowser, *results):
+        mock_client = Mock()
+        mock_client.sessions.create.return_value.data.id = "test_session_id"
+        mock_client.tools.perform_web_task.side_effect = [Mock(data=Mock(result=result)) for result in results]
+        mock_anchorbrowser.return_value = mock_client
+        return mock_client
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_repeated_task_skips_the_browser(self, mock_anchorbrowser):
+        mock_client = self.make_client(mock_anchorbrowser, "$10", "4 reviews")
+        tool = SimpleAnchorWebTaskTool(semantic_cache=SemanticTaskCache(KeywordEmbedder()))
+        url = "https://shop.example.com/item"
+
+        first = tool.invoke({"prompt": "What is the price on this page?", "url": url})
+        second = tool.invoke({"prompt": "get the price", "url": url})
+        third = tool.invoke({"prompt": "count the reviews", "url": url})
+
+        self.assertIs(first, second)
+        self.assertEqual(first.result, "$10")
+        self.assertEqual(third.result, "4 reviews")
+        self.assertEqual(mock_client.tools.perform_web_task.call_count, 2)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_only_validated_results_are_cached(self, mock_anchorbrowser):
+        mock_client = self.make_client(mock_anchorbrowser, {"price": "unknown"}, {"price": 10.0})
+        cache = SemanticTaskCache(KeywordEmbedder())
+        tool = AdvancedAnchorWebTaskTool(response_schema=Price, semantic_cache=cache)
+        inputs = {"prompt": "get the price", "url": "https://shop.example.com/item"}
+
+        with self.assertRaises(OutputValidationError):
+            tool.invoke(inputs)
+        self.assertEqual(tool.invoke(inputs), Price(price=10.0))
+        self.assertEqual(tool.invoke(inputs), Price(price=10.0))
+
+        self.assertEqual(mock_client.tools.perform_web_task.call_count, 2)
+        # The schema is part of the partition, so a tool without it doesn't see the entry
+        plain_partition = SemanticTaskCache.partition(tool._key_namespace(), inputs["url"], None)
+        self.assertIsNone(cache.get(plain_partition, inputs["prompt"]))
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_async_lookup(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        mock_async_client = mock_async_anchorbrowser.return_value
+        mock_async_client.sessions.create = AsyncMock()
+        mock_async_client.sessions.create.return_value.data.id = "async_session_id"
+        mock_async_client.tools.perform_web_task = AsyncMock(return_value=Mock(data=Mock(result="$10")))
+        tool = SimpleAnchorWebTaskTool(semantic_cache=SemanticTaskCache(KeywordEmbedder()))
+
+        async def run():
+            first = await tool.ainvoke({"prompt": "price?", "url": "https://shop.example.com/item"})
+            second = await tool.ainvoke({"prompt": "what does it cost", "url": "https://shop.example.com/item"})
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        self.assertIs(first, second)
+        mock_async_client.tools.perform_web_task.assert_awaited_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+import itertools
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from langchain_anchorbrowser.AnchorContentTool import AnchorContentTool
+from langchain_anchorbrowser.AnchorScreenshotTool import AnchorScreenshotTool
+from langchain_anchorbrowser.AnchorWebTaskTool import SimpleAnchorWebTaskTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorCache import InMemoryCache
+from langchain_anchorbrowser.AnchorSession import AnchorSession, current_session
+
+
+def make_sdk_client():
+    """Mock Anchorbrowser client whose sessions get unique ids"""
+    client = Mock()
+    counter = itertools.count(1)
+
+    def create_session():
+        session = Mock()
+        session.data.id = f"session_{next(counter)}"
+        session.data.live_view_url = "test_live_view_url"
+        return session
+
+    client.sessions.create.side_effect = create_session
+    client.tools.fetch_webpage.return_value = "<html>page</html>"
+    client.tools.screenshot_webpage.return_value.text.return_value = "png"
+    client.tools.perform_web_task.return_value.data = "done"
+    return client
+
+
+def make_async_sdk_client():
+    client = make_sdk_client()
+    client.sessions.create = AsyncMock(side_effect=client.sessions.create.side_effect)
+    client.sessions.delete = AsyncMock()
+    client.tools.fetch_webpage = AsyncMock(return_value="<html>page</html>")
+    client.tools.perform_web_task = AsyncMock(return_value=Mock(data="done"))
+    return client
+
+
+def session_ids(mock_function):
+    return [call.kwargs["session_id"] for call in mock_function.call_args_list]
+
+
+class TestSessionAffinity(unittest.TestCase):
+    """Test pinning consecutive tool calls to one browser session"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._hooks = ()
+        AnchorClient._tenants = None
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_calls_share_one_session_that_ends_on_exit(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value = make_sdk_client()
+
+        with AnchorSession() as session:
+            self.assertIs(current_session(), session)
+            AnchorContentTool().invoke({"url": "https://example.com"})
+            AnchorScreenshotTool().invoke({"url": "https://example.com"})
+            SimpleAnchorWebTaskTool()._run(prompt="Click the first link")
+            mock_client.sessions.delete.assert_not_called()
+
+        self.assertIsNone(current_session())
+        self.assertEqual(session_ids(mock_client.tools.fetch_webpage), ["session_1"])
+        self.assertEqual(session_ids(mock_client.tools.screenshot_webpage), ["session_1"])
+        self.assertEqual(session_ids(mock_client.tools.perform_web_task), ["session_1"])
+        mock_client.sessions.create.assert_called_once()
+        mock_client.sessions.delete.assert_called_once_with("session_1")
+        self.assertEqual(AnchorClient().get_session_pool().size, 0)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_web_task_without_url_stays_on_current_page(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value = make_sdk_client()
+
+        with AnchorSession():
+            SimpleAnchorWebTaskTool()._run(prompt="Summarize this page")
+
+        mock_client.tools.perform_web_task.assert_called_once_with(
+            prompt="Summarize this page", session_id="session_1"
+        )
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_pinned_calls_skip_the_cache(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value = make_sdk_client()
+        tool = AnchorContentTool(cache=InMemoryCache())
+        tool._run(url="https://example.com")
+
+        with AnchorSession():
+            tool._run(url="https://example.com")
+
+        self.assertEqual(mock_client.tools.fetch_webpage.call_count, 2)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_failed_call_keeps_the_pinned_session(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value = make_sdk_client()
+        mock_client.tools.fetch_webpage.side_effect = [ValueError("bad page"), "<html>page</html>"]
+
+        with AnchorSession():
+            with self.assertRaises(ValueError):
+                AnchorContentTool()._run(url="https://example.com")
+            AnchorContentTool()._run(url="https://example.com")
+            mock_client.sessions.delete.assert_not_called()
+
+        self.assertEqual(session_ids(mock_client.tools.fetch_webpage), ["session_1", "session_1"])
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_run_config_pins_an_existing_session(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value = make_sdk_client()
+
+        AnchorContentTool().invoke(
+            {"url": "https://example.com"}, config={"configurable": {"anchor_session_id": "external"}}
+        )
+
+        self.assertEqual(session_ids(mock_client.tools.fetch_webpage), ["external"])
+        mock_client.sessions.create.assert_not_called()
+        mock_client.sessions.delete.assert_not_called()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_existing_session_is_only_ended_on_request(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value = make_sdk_client()
+
+        with AnchorSession(session_id="external"):
+            AnchorContentTool()._run(url="https://example.com")
+        mock_client.sessions.delete.assert_not_called()
+
+        with AnchorSession(session_id="external", end_on_exit=True):
+            pass
+        mock_client.sessions.delete.assert_called_once_with("external")
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'default_key'})
+    def test_other_tenants_are_not_pinned(self, mock_anchorbrowser):
+        clients = {}
+        mock_anchorbrowser.side_effect = lambda api_key, **options: clients.setdefault(api_key, make_sdk_client())
+
+        with AnchorSession():
+            AnchorContentTool(api_key="key_a")._run(url="https://example.com")
+
+        clients["key_a"].tools.fetch_webpage.assert_called_once()
+        clients["default_key"].tools.fetch_webpage.assert_not_called()
+        clients["key_a"].sessions.create.assert_called_once()
+
+
+class TestAsyncSessionAffinity(unittest.IsolatedAsyncioTestCase):
+    """Test session affinity on the async execution path"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._hooks = ()
+        AnchorClient._tenants = None
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    async def test_async_calls_share_one_session(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        mock_client = mock_async_anchorbrowser.return_value = make_async_sdk_client()
+
+        async with AnchorSession() as session:
+            await AnchorContentTool().ainvoke({"url": "https://example.com"})
+            await SimpleAnchorWebTaskTool()._arun(prompt="Click the first link")
+
+        self.assertIsNone(session.id)
+        self.assertEqual(session_ids(mock_client.tools.fetch_webpage), ["session_1"])
+        self.assertEqual(session_ids(mock_client.tools.perform_web_task), ["session_1"])
+        mock_client.sessions.delete.assert_awaited_once_with("session_1")
+
+
+if __name__ == '__main__':
+    unittest.main()
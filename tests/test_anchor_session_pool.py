@@ -0,0 +1,197 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+import itertools
+import threading
+import time
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from langchain_anchorbrowser.AnchorContentTool import AnchorContentTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorSessionPool import AnchorSessionPool
+
+
+def make_mock_client():
+    """Create a mock Anchorbrowser client whose sessions get unique ids"""
+    client = Mock()
+    counter = itertools.count(1)
+
+    def create_session():
+        session = Mock()
+        session.data.id = f"session_{next(counter)}"
+        session.data.live_view_url = "test_live_view_url"
+        return session
+
+    client.sessions.create.side_effect = create_session
+    return client
+
+
+class TestAnchorSessionPool(unittest.TestCase):
+    """Test the AnchorSessionPool lease/release lifecycle"""
+
+    def test_released_session_is_reused(self):
+        """Test that a released session is handed out again instead of creating a new one"""
+        client = make_mock_client()
+        pool = AnchorSessionPool(client)
+
+        with pool.lease() as first:
+            pass
+        with pool.lease() as second:
+            pass
+
+        self.assertEqual(first.id, second.id)
+        client.sessions.create.assert_called_once()
+        client.sessions.delete.assert_not_called()
+
+    def test_failed_call_discards_session(self):
+        """Test that a session is ended when the leased call raises"""
+        client = make_mock_client()
+        pool = AnchorSessionPool(client)
+
+        with self.assertRaises(RuntimeError):
+            with pool.lease():
+                raise RuntimeError("tool call failed")
+
+        client.sessions.delete.assert_called_once_with("session_1")
+        self.assertEqual(pool.size, 0)
+
+    def test_warm_creates_min_size_sessions(self):
+        """Test that warm() pre-creates min_size sessions"""
+        client = make_mock_client()
+        pool = AnchorSessionPool(client, min_size=3, max_size=5)
+
+        pool.warm()
+
+        self.assertEqual(client.sessions.create.call_count, 3)
+        self.assertEqual(pool.idle_count, 3)
+
+    def test_idle_ttl_expires_sessions(self):
+        """Test that idle sessions past their TTL are ended instead of reused"""
+        client = make_mock_client()
+        pool = AnchorSessionPool(client, idle_ttl=0)
+
+        with pool.lease():
+            pass
+        with pool.lease() as session:
+            pass
+
+        self.assertEqual(session.id, "session_2")
+        client.sessions.delete.assert_called_once_with("session_1")
+
+    def test_idle_sessions_are_ended_without_another_acquire(self):
+        """Test that the reaper ends sessions idle past their TTL, keeping min_size of them"""
+        client = make_mock_client()
+        pool = AnchorSessionPool(client, min_size=1, idle_ttl=0.1)
+        pool.warm()
+
+        with pool.lease(), pool.lease():
+            pass
+        time.sleep(0.4)
+
+        client.sessions.delete.assert_called_once()
+        self.assertEqual(pool.idle_count, 1)
+        pool.close()
+
+    def test_unhealthy_session_is_replaced(self):
+        """Test that a session failing its health check is discarded"""
+        client = make_mock_client()
+        status_item = Mock(session_id="session_1", status="ended")
+        client.sessions.all.status.return_value.data.items = [status_item]
+        pool = AnchorSessionPool(client, health_check_interval=0)
+
+        with pool.lease():
+            pass
+        with pool.lease() as session:
+            pass
+
+        self.assertEqual(session.id, "session_2")
+        client.sessions.delete.assert_called_once_with("session_1")
+
+    def test_acquire_times_out_when_pool_is_exhausted(self):
+        """Test that acquire() waits for max_size and then raises TimeoutError"""
+        client = make_mock_client()
+        pool = AnchorSessionPool(client, max_size=1)
+
+        session = pool.acquire()
+        with self.assertRaises(TimeoutError):
+            pool.acquire(timeout=0.05)
+
+        # Releasing from another thread wakes up a waiting caller
+        threading.Timer(0.05, pool.release, args=(session,)).start()
+        self.assertEqual(pool.acquire(timeout=5).id, session.id)
+
+    def test_close_ends_idle_sessions(self):
+        """Test that close() ends idle sessions and refuses new leases"""
+        client = make_mock_client()
+        pool = AnchorSessionPool(client, min_size=2, max_size=2)
+        pool.warm()
+
+        pool.close()
+
+        self.assertEqual(client.sessions.delete.call_count, 2)
+        with self.assertRaises(RuntimeError):
+            pool.acquire()
+
+
+class TestAnchorToolSessionReuse(unittest.TestCase):
+    """Test that tools lease sessions from the shared pool"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_consecutive_calls_share_one_session(self, mock_anchorbrowser):
+        """Test that consecutive tool calls reuse the same warm session"""
+        mock_client = make_mock_client()
+        mock_client.tools.fetch_webpage.return_value = "content"
+        mock_anchorbrowser.return_value = mock_client
+
+        tool = AnchorContentTool()
+        tool._run(url="https://example.com")
+        tool._run(url="https://example.org")
+
+        mock_client.sessions.create.assert_called_once()
+        for call in mock_client.tools.fetch_webpage.call_args_list:
+            self.assertEqual(call.kwargs["session_id"], "session_1")
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_configure_session_pool(self, mock_anchorbrowser):
+        """Test that the shared pool can be reconfigured and is used by new tools"""
+        mock_anchorbrowser.return_value = make_mock_client()
+
+        pool = AnchorClient().configure_session_pool(min_size=1, max_size=4)
+        tool = AnchorContentTool()
+
+        self.assertIs(tool.session_pool, pool)
+        self.assertEqual(pool.max_size, 4)
+        self.assertEqual(pool.idle_count, 1)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_concurrent_first_calls_create_one_pool(self, mock_anchorbrowser):
+        """Test that threads racing to the first call share one pool instead of each building one"""
+        mock_anchorbrowser.return_value = make_mock_client()
+
+        def slow_pool(*args, **kwargs):
+            time.sleep(0.05)
+            return AnchorSessionPool(*args, **kwargs)
+
+        with patch('langchain_anchorbrowser.AnchorBaseTool.AnchorSessionPool', side_effect=slow_pool) as pool_class:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                pools = list(executor.map(lambda _: AnchorClient().get_session_pool(), range(8)))
+
+        pool_class.assert_called_once()
+        self.assertTrue(all(pool is pools[0] for pool in pools))
+
+
+if __name__ == '__main__':
+    unittest.main()
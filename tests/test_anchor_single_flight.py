@@ -0,0 +1,267 @@
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+import asyncio
+import threading
+import time
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from langchain_anchorbrowser.AnchorContentTool import AnchorContentTool
+from langchain_anchorbrowser.AnchorWebTaskTool import SimpleAnchorWebTaskTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorSingleFlight import SingleFlight, AsyncSingleFlight
+from langchain_anchorbrowser.AnchorInstrumentation import capture_metrics
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test coalescing of concurrent identical calls on the sync path"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        single_flight = SingleFlight()
+        calls = 0
+        started = threading.Event()
+
+        def slow_call():
+            nonlocal calls
+            calls += 1
+            started.set()
+            time.sleep(0.05)
+            return "result"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(single_flight.do("key", slow_call)))
+        leader.start()
+        started.wait()
+        followers = [
+            threading.Thread(target=lambda: results.append(single_flight.do("key", slow_call)))
+            for _ in range(4)
+        ]
+        for thread in followers:
+            thread.start()
+        for thread in [leader, *followers]:
+            thread.join()
+
+        self.assertEqual(calls, 1)
+        self.assertEqual(results, ["result"] * 5)
+        self.assertEqual(single_flight.in_flight, 0)
+
+    def test_errors_are_shared_and_not_remembered(self):
+        single_flight = SingleFlight()
+
+        def failing_call():
+            raise RuntimeError("remote failure")
+
+        with self.assertRaises(RuntimeError):
+            single_flight.do("key", failing_call)
+        self.assertEqual(single_flight.do("key", lambda: "recovered"), "recovered")
+
+
+class TestAsyncSingleFlight(unittest.IsolatedAsyncioTestCase):
+    """Test coalescing of concurrent identical calls on the async path"""
+
+    async def test_concurrent_calls_share_one_execution(self):
+        single_flight = AsyncSingleFlight()
+        calls = 0
+
+        async def slow_call():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(single_flight.do("key", slow_call) for _ in range(5)))
+
+        self.assertEqual(calls, 1)
+        self.assertEqual(results, ["result"] * 5)
+        self.assertEqual(single_flight.in_flight, 0)
+
+    async def test_one_cancelled_caller_does_not_cancel_the_others(self):
+        single_flight = AsyncSingleFlight()
+
+        async def slow_call():
+            await asyncio.sleep(0.02)
+            return "result"
+
+        cancelled = asyncio.create_task(single_flight.do("key", slow_call))
+        surviving = asyncio.create_task(single_flight.do("key", slow_call))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        self.assertEqual(await surviving, "result")
+        self.assertTrue(cancelled.cancelled())
+
+
+class TestToolCoalescing(unittest.TestCase):
+    """Test that tools coalesce idempotent calls only"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._single_flight = None
+        AnchorClient._async_single_flights = None
+
+    def make_client(self, mock_anchorbrowser):
+        mock_client = Mock()
+        mock_session = Mock()
+        mock_session.data.id = "test_session_id"
+        mock_client.sessions.create.return_value = mock_session
+        mock_anchorbrowser.return_value = mock_client
+        return mock_client
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_identical_fetches_share_one_remote_call(self, mock_anchorbrowser):
+        mock_client = self.make_client(mock_anchorbrowser)
+
+        def fetch_webpage(**kwargs):
+            time.sleep(0.05)
+            return "content"
+
+        mock_client.tools.fetch_webpage.side_effect = fetch_webpage
+
+        results = AnchorContentTool().batch(
+            [{"url": "https://example.com"}] * 4, config={"max_concurrency": 4}
+        )
+
+        self.assertEqual(results, ["content"] * 4)
+        mock_client.tools.fetch_webpage.assert_called_once()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_identical_async_fetches_share_one_remote_call(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        self.make_client(mock_anchorbrowser)
+        mock_async_client = Mock()
+        mock_session = Mock()
+        mock_session.data.id = "test_session_id"
+        mock_async_client.sessions.create = AsyncMock(return_value=mock_session)
+
+        async def fetch_webpage(**kwargs):
+            await asyncio.sleep(0.01)
+            return "content"
+
+        mock_async_client.tools.fetch_webpage = AsyncMock(side_effect=fetch_webpage)
+        mock_async_anchorbrowser.return_value = mock_async_client
+        tool = AnchorContentTool()
+
+        async def run():
+            return await asyncio.gather(*(tool.ainvoke({"url": "https://example.com"}) for _ in range(4)))
+
+        self.assertEqual(asyncio.run(run()), ["content"] * 4)
+        mock_async_client.tools.fetch_webpage.assert_awaited_once()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_follower_reruns_when_the_leader_hits_its_own_deadline(self, mock_anchorbrowser):
+        mock_client = self.make_client(mock_anchorbrowser)
+        started = threading.Event()
+
+        def fetch_webpage(**kwargs):
+            started.set()
+            if "timeout" in kwargs:
+                time.sleep(kwargs["timeout"])
+                raise ConnectionError("read timed out")  # What the SDK does once the request timeout expires
+            time.sleep(0.05)
+            return "content"
+
+        mock_client.tools.fetch_webpage.side_effect = fetch_webpage
+        errors = []
+
+        def leader():
+            try:
+                AnchorContentTool(timeout=0.2)._run(url="https://example.com")
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=leader)
+        thread.start()
+        started.wait(1)
+        with capture_metrics() as captured:
+            result = AnchorContentTool()._run(url="https://example.com")
+        thread.join()
+
+        self.assertEqual(result, "content")
+        self.assertIsInstance(errors[0], TimeoutError)
+        self.assertEqual(mock_client.tools.fetch_webpage.call_count, 2)
+        self.assertFalse(captured[0].coalesced)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_follower_metrics_are_marked_coalesced(self, mock_anchorbrowser):
+        mock_client = self.make_client(mock_anchorbrowser)
+        started = threading.Event()
+
+        def fetch_webpage(**kwargs):
+            started.set()
+            time.sleep(0.1)
+            return "content"
+
+        mock_client.tools.fetch_webpage.side_effect = fetch_webpage
+        thread = threading.Thread(target=AnchorContentTool()._run, kwargs={"url": "https://example.com"})
+        thread.start()
+        started.wait(1)
+        with capture_metrics() as captured:
+            AnchorContentTool()._run(url="https://example.com")
+        thread.join()
+
+        metrics = captured[0]
+        self.assertTrue(metrics.coalesced)
+        self.assertEqual(metrics.payload_bytes, len("content"))
+        self.assertIsNone(metrics.session_id)
+        mock_client.tools.fetch_webpage.assert_called_once()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_async_follower_reruns_when_the_leader_hits_its_own_deadline(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        self.make_client(mock_anchorbrowser)
+        mock_async_client = Mock()
+        mock_session = Mock()
+        mock_session.data.id = "test_session_id"
+        mock_async_client.sessions.create = AsyncMock(return_value=mock_session)
+        mock_async_client.sessions.delete = AsyncMock()
+
+        async def fetch_webpage(**kwargs):
+            await asyncio.sleep(0.1)
+            return "content"
+
+        mock_async_client.tools.fetch_webpage = AsyncMock(side_effect=fetch_webpage)
+        mock_async_anchorbrowser.return_value = mock_async_client
+
+        async def run():
+            leader = asyncio.ensure_future(AnchorContentTool(timeout=0.05).ainvoke({"url": "https://example.com"}))
+            await asyncio.sleep(0.01)
+            follower = await AnchorContentTool().ainvoke({"url": "https://example.com"})
+            with self.assertRaises(TimeoutError):
+                await leader
+            return follower
+
+        self.assertEqual(asyncio.run(run()), "content")
+        self.assertEqual(mock_async_client.tools.fetch_webpage.await_count, 2)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_web_tasks_are_not_coalesced(self, mock_anchorbrowser):
+        mock_client = self.make_client(mock_anchorbrowser)
+
+        def perform_web_task(**kwargs):
+            time.sleep(0.05)
+            return Mock(data="done")
+
+        mock_client.tools.perform_web_task.side_effect = perform_web_task
+
+        SimpleAnchorWebTaskTool().batch(
+            [{"prompt": "Click buy", "url": "https://example.com"}] * 2, config={"max_concurrency": 2}
+        )
+
+        self.assertEqual(mock_client.tools.perform_web_task.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+from uuid import uuid4
+import asyncio
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, LLMResult
+from langchain_anchorbrowser.AnchorContentTool import AnchorContentTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorSpeculation import SpeculativeSessionHandler
+
+
+def tool_call_chunk(name, index=0):
+    message = AIMessageChunk(content="", tool_call_chunks=[{"name": name, "args": "", "id": "call", "index": index}])
+    return ChatGenerationChunk(message=message)
+
+
+def llm_result(*tool_names):
+    tool_calls = [{"name": name, "args": {}, "id": f"call_{i}"} for i, name in enumerate(tool_names)]
+    return LLMResult(generations=[[ChatGeneration(message=AIMessage(content="", tool_calls=tool_calls))]])
+
+
+def make_sdk_client():
+    mock_client = Mock()
+    mock_client.sessions.create.return_value.data.id = "speculative_session"
+    mock_client.tools.fetch_webpage.return_value = "<html>page</html>"
+    return mock_client
+
+
+class TestSpeculativeSessions(unittest.TestCase):
+    """Test session pre-warming driven by LLM callbacks"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_key'})
+    def test_streamed_tool_call_provisions_a_session_the_tool_then_uses(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value = make_sdk_client()
+        handler = SpeculativeSessionHandler()
+        run_id = uuid4()
+
+        handler.on_llm_new_token("", chunk=tool_call_chunk("anchor_content_tool"), run_id=run_id)
+        handler.on_llm_new_token("", chunk=tool_call_chunk("anchor_content_tool"), run_id=run_id)
+        handler.join()
+        self.assertEqual(AnchorClient().get_session_pool().idle_count, 1)
+
+        handler.on_llm_end(llm_result("anchor_content_tool"), run_id=run_id)
+        result = AnchorContentTool()._run(url="https://example.com")
+
+        self.assertEqual(result, "<html>page</html>")
+        mock_client.sessions.create.assert_called_once()
+        stats = handler.stats()
+        self.assertEqual((stats["speculations"], stats["hits"], stats["misses"]), (1, 1, 0))
+        self.assertEqual(stats["hit_rate"], 1.0)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_key'})
+    def test_other_tools_and_plain_tokens_do_not_trigger(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value = make_sdk_client()
+        handler = SpeculativeSessionHandler()
+        run_id = uuid4()
+
+        handler.on_llm_new_token("Hello", chunk=ChatGenerationChunk(message=AIMessageChunk(content="Hello")), run_id=run_id)
+        handler.on_llm_new_token("", chunk=tool_call_chunk("calculator"), run_id=run_id)
+        handler.on_llm_end(llm_result("anchor_content_tool"), run_id=run_id)
+
+        mock_client.sessions.create.assert_not_called()
+        self.assertEqual(handler.stats()["speculations"], 0)
+        self.assertEqual(handler.stats()["unanticipated"], 1)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_key'})
+    def test_miss_recycles_the_session_by_default(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value = make_sdk_client()
+        handler = SpeculativeSessionHandler(eager=True)
+        run_id = uuid4()
+
+        tools = [{"type": "function", "function": {"name": "anchor_content_tool"}}]
+        handler.on_chat_model_start({}, [[]], run_id=run_id, invocation_params={"tools": tools})
+        handler.join()
+        handler.on_llm_end(llm_result(), run_id=run_id)
+
+        self.assertEqual(AnchorClient().get_session_pool().idle_count, 1)
+        mock_client.sessions.delete.assert_not_called()
+        self.assertEqual(handler.stats()["misses"], 1)
+        self.assertEqual(handler.stats()["hit_rate"], 0.0)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_key'})
+    def test_miss_can_end_the_session(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value = make_sdk_client()
+        handler = SpeculativeSessionHandler(on_miss="end")
+        run_id = uuid4()
+
+        handler.on_llm_new_token("", chunk=tool_call_chunk("anchor_screenshot_tool"), run_id=run_id)
+        handler.join()
+        handler.on_llm_error(RuntimeError("model failed"), run_id=run_id)
+
+        self.assertEqual(AnchorClient().get_session_pool().idle_count, 0)
+        mock_client.sessions.delete.assert_called_once_with("speculative_session")
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_key'})
+    def test_existing_idle_session_skips_speculation(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value = make_sdk_client()
+        AnchorClient().configure_session_pool(min_size=1)
+        handler = SpeculativeSessionHandler()
+
+        handler.on_llm_new_token("", chunk=tool_call_chunk("anchor_content_tool"), run_id=uuid4())
+        handler.join()
+
+        mock_client.sessions.create.assert_called_once()
+        self.assertEqual(handler.stats()["skipped"], 1)
+
+    def test_rejects_unknown_miss_policy(self):
+        with self.assertRaises(ValueError):
+            SpeculativeSessionHandler(on_miss="keep")
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_key'})
+    def test_async_runs_use_the_loop_pool(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        mock_async_client = mock_async_anchorbrowser.return_value
+        mock_async_client.sessions.create = AsyncMock()
+        mock_async_client.sessions.create.return_value.data.id = "async_session"
+        mock_async_client.sessions.delete = AsyncMock()
+        handler = SpeculativeSessionHandler(on_miss="end")
+
+        async def run():
+            run_id = uuid4()
+            handler.on_llm_new_token("", chunk=tool_call_chunk("simple_anchor_web_task_tool"), run_id=run_id)
+            # Missed before the session exists; it is ended once created
+            handler.on_llm_end(llm_result(), run_id=run_id)
+            await asyncio.gather(*handler._workers)
+            return AnchorClient().get_async_session_pool()
+
+        pool = asyncio.run(run())
+
+        mock_async_client.sessions.create.assert_awaited_once()
+        mock_async_client.sessions.delete.assert_awaited_once_with("async_session")
+        self.assertEqual(pool.idle_count, 0)
+        mock_anchorbrowser.return_value.sessions.create.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pydantic import BaseModel
+from langchain_anchorbrowser.AnchorWebTaskTool import AdvancedAnchorWebTaskTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorStructuredOutput import (
+    OutputValidationError,
+    compile_output_schema,
+)
+
+
+class Product(BaseModel):
+    name: str
+    price: float
+
+
+PRODUCT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "minLength": 1},
+        "price": {"type": "number", "minimum": 0},
+        "tags": {"type": "array", "items": {"$ref": "#/$defs/tag"}},
+    },
+    "required": ["name", "price"],
+    "additionalProperties": False,
+    "$defs": {"tag": {"type": "string", "enum": ["new", "sale"]}},
+}
+
+
+class TestOutputValidators(unittest.TestCase):
+    """Test compiled output schema validators"""
+
+    def test_validators_are_compiled_once_per_schema(self):
+        self.assertIs(compile_output_schema(PRODUCT_SCHEMA), compile_output_schema(dict(PRODUCT_SCHEMA)))
+        self.assertIs(compile_output_schema(Product), compile_output_schema(Product))
+
+    def test_json_schema_validation(self):
+        validator = compile_output_schema(PRODUCT_SCHEMA)
+
+        self.assertEqual(validator.validate('{"name": "Lamp", "price": 12.5}'), {"name": "Lamp", "price": 12.5})
+        with self.assertRaises(OutputValidationError) as context:
+            validator.validate({"name": "", "price": -1, "tags": ["old"], "color": "red"})
+
+        self.assertEqual(sorted(context.exception.errors), [
+            "$.name: must have length >= 1",
+            "$.price: must be >= 0",
+            "$.tags[0]: 'old' is not one of ['new', 'sale']",
+            "$: unexpected property 'color'",
+        ])
+
+    def test_untyped_object_schemas_reject_plain_text(self):
+        validator = compile_output_schema({"properties": {"price": {"type": "number"}}, "required": ["price"]})
+
+        self.assertEqual(validator.validate('{"price": 3}'), {"price": 3})
+        with self.assertRaises(OutputValidationError) as context:
+            validator.validate("Task completed")
+        self.assertEqual(context.exception.errors, ["$: expected JSON, got 'Task completed'"])
+        with self.assertRaises(OutputValidationError) as context:
+            validator.validate(42)
+        self.assertEqual(context.exception.errors, ["$: missing required property 'price'"])
+        # A schema that allows strings keeps plain text answers
+        self.assertEqual(compile_output_schema({"type": ["object", "string"]}).validate("done"), "done")
+
+    def test_one_of_needs_exactly_one_match_and_integers_may_be_floats(self):
+        validator = compile_output_schema({"oneOf": [{"type": "integer"}, {"type": "number", "maximum": 10}]})
+
+        self.assertEqual(validator.validate(12.0), 12.0)
+        self.assertEqual(validator.validate(2.5), 2.5)
+        with self.assertRaises(OutputValidationError) as context:
+            validator.validate(3)
+        self.assertEqual(context.exception.errors, ["$: matches 2 of the schemas where exactly one is allowed"])
+        with self.assertRaises(OutputValidationError):
+            validator.validate(12.5)
+        with self.assertRaises(OutputValidationError):
+            compile_output_schema({"type": "integer"}).validate(1.5)
+
+    def test_pydantic_validation_returns_model_instances(self):
+        validator = compile_output_schema(Product)
+
+        self.assertEqual(validator.validate({"name": "Lamp", "price": "12.5"}), Product(name="Lamp", price=12.5))
+        self.assertEqual(validator.json_schema["required"], ["name", "price"])
+        with self.assertRaises(OutputValidationError):
+            validator.validate({"name": "Lamp"})
+
+
+class TestAdvancedWebTaskValidation(unittest.IsolatedAsyncioTestCase):
+    """Test structured output on AdvancedAnchorWebTaskTool"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._hooks = ()
+
+    def mock_results(self, mock_anchorbrowser, *results):
+        mock_client = mock_anchorbrowser.return_value
+        mock_client.sessions.create.return_value.data.id = "session_1"
+        mock_client.tools.perform_web_task.side_effect = [Mock(data=Mock(result=result)) for result in results]
+        return mock_client
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_response_schema_model_returns_a_typed_object(self, mock_anchorbrowser):
+        mock_client = self.mock_results(mock_anchorbrowser, {"name": "Lamp", "price": 12.5})
+
+        result = AdvancedAnchorWebTaskTool(response_schema=Product).invoke(
+            {"prompt": "Get the product", "url": "https://example.com"}
+        )
+
+        self.assertEqual(result, Product(name="Lamp", price=12.5))
+        sent_schema = mock_client.tools.perform_web_task.call_args.kwargs["output_schema"]
+        self.assertEqual(sent_schema["properties"]["price"]["type"], "number")
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_mismatch_raises_without_reask(self, mock_anchorbrowser):
+        mock_client = self.mock_results(mock_anchorbrowser, {"name": "Lamp"})
+
+        with self.assertRaises(OutputValidationError):
+            AdvancedAnchorWebTaskTool().invoke(
+                {"prompt": "Get the product", "url": "https://example.com", "output_schema": PRODUCT_SCHEMA}
+            )
+
+        mock_client.tools.perform_web_task.assert_called_once()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_reask_once_with_the_validation_errors(self, mock_anchorbrowser):
+        mock_client = self.mock_results(mock_anchorbrowser, {"name": "Lamp"}, {"name": "Lamp", "price": 3})
+
+        result = AdvancedAnchorWebTaskTool(response_schema=Product, reask_on_mismatch=True).invoke(
+            {"prompt": "Get the product", "url": "https://example.com"}
+        )
+
+        self.assertEqual(result, Product(name="Lamp", price=3))
+        second_prompt = mock_client.tools.perform_web_task.call_args_list[1].kwargs["prompt"]
+        self.assertTrue(second_prompt.startswith("Get the product\n\nA previous answer did not match"))
+        self.assertIn("price: Field required", second_prompt)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_validation_can_be_turned_off(self, mock_anchorbrowser):
+        self.mock_results(mock_anchorbrowser, {"name": "Lamp"})
+
+        result = AdvancedAnchorWebTaskTool(response_schema=Product, validate_output=False).invoke(
+            {"prompt": "Get the product", "url": "https://example.com"}
+        )
+
+        self.assertEqual(result.result, {"name": "Lamp"})
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    async def test_async_validation(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        mock_client = mock_async_anchorbrowser.return_value
+        mock_client.sessions.create = AsyncMock(return_value=Mock(data=Mock(id="session_1", live_view_url=None)))
+        mock_client.tools.perform_web_task = AsyncMock(
+            return_value=Mock(data=Mock(result='{"name": "Lamp", "price": 1}'))
+        )
+
+        result = await AdvancedAnchorWebTaskTool(response_schema=Product).ainvoke(
+            {"prompt": "Get the product", "url": "https://example.com"}
+        )
+
+        self.assertEqual(result, Product(name="Lamp", price=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+import asyncio
+import tempfile
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pydantic import BaseModel
+from langchain_anchorbrowser.AnchorWebTaskTool import AdvancedAnchorWebTaskTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorTaskReplay import ReplayError, TaskReplayStore, TaskScript, record_script
+
+URL = "https://shop.example.com/item"
+PAGE = """# Acme Widget
+Sold by Acme Corp, updated 2026-10-15
+
+**Price:** $1,299.50
+**In stock:** 14 units
+Rating 4.5 of 5
+"""
+
+
+class Product(BaseModel):
+    name: str
+    price: float
+    stock: int
+
+
+class TestRecordScript(unittest.TestCase):
+    """Test recording and replaying scripts on page content"""
+
+    def test_replays_on_a_changed_page(self):
+        result = {"name": "Acme Widget", "price": 1299.5, "stock": 14}
+        script = record_script(result, PAGE, URL)
+
+        self.assertIsNotNone(script)
+        self.assertEqual(script.replay(PAGE), result)
+        changed = PAGE.replace("Acme Widget", "Acme Widget Pro").replace("1,299.50", "999").replace("14 units", "3 units")
+        self.assertEqual(script.replay(changed), {"name": "Acme Widget Pro", "price": 999.0, "stock": 3})
+        # Anchors are whole words; the date above the price doesn't leak into them
+        self.assertNotIn("2026", "".join(slot.before for slot in script.slots))
+
+    def test_nested_results_and_json_round_trip(self):
+        result = {"offer": {"price": 1299.5}, "rating": 4.5}
+        script = TaskScript.from_json(record_script(result, PAGE, URL).to_json())
+
+        self.assertEqual(script.replay(PAGE), result)
+        self.assertEqual(record_script(14, PAGE, URL).replay(PAGE), 14)
+
+    def test_ambiguous_or_absent_values_are_not_recorded(self):
+        self.assertIsNone(record_script({"stock": 7}, PAGE, URL))  # Not on the page
+        self.assertIsNone(record_script({"price": 1299.5, "tags": ["a"]}, PAGE, URL))
+        self.assertIsNone(record_script({"stock": 14}, PAGE + "Ships in 14 days\n", URL))  # Found twice
+        self.assertIsNone(record_script({"available": True}, PAGE, URL))
+
+    def test_missing_anchor_raises(self):
+        script = record_script({"price": 1299.5}, PAGE, URL)
+
+        with self.assertRaises(ReplayError):
+            script.replay(PAGE.replace("**Price:**", "**Now only:**"))
+        with self.assertRaises(ReplayError):
+            record_script({"stock": 14}, PAGE, URL).replay(PAGE.replace("14 units", "14.5 units"))
+
+
+class TestTaskReplayStore(unittest.TestCase):
+    """Test storing scripts and unreplayable markers"""
+
+    def test_scripts_persist_and_failures_drop_them(self):
+        script = record_script({"price": 1299.5}, PAGE, URL)
+        key = TaskReplayStore.key("tool", URL, "Get the price!", {"type": "object"})
+        self.assertEqual(key, TaskReplayStore.key("tool", "HTTPS://shop.example.com/item", "get the price", {"type": "object"}))
+        self.assertNotEqual(key, TaskReplayStore.key("tool", URL, "get the price", None))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "replay.sqlite3")
+            TaskReplayStore(path).save(key, script)
+            store = TaskReplayStore(path)
+            self.assertEqual(store.get(key), script)
+            self.assertFalse(store.needs_recording(key))
+
+            store.replayed(key, ReplayError("anchor missing"))
+            self.assertIsNone(store.get(key))
+            self.assertTrue(store.needs_recording(key))
+            self.assertEqual(store.stats()["replay_failures"], 1)
+
+    def test_unreplayable_marker_expires(self):
+        store = TaskReplayStore(unreplayable_ttl=0.0)
+        store.save("key", None)
+
+        self.assertIsNone(store.get("key"))
+        self.assertTrue(store.needs_recording("key"))
+        kept = TaskReplayStore(unreplayable_ttl=None)
+        kept.save("key", None)
+        self.assertFalse(kept.needs_recording("key"))
+
+
+class TestWebTaskReplay(unittest.TestCase):
+    """Test recording and replaying tasks of the advanced web task tool"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+
+    def make_client(self, mock_anchorbrowser, pages, *results):
+        mock_client = Mock()
+        mock_client.sessions.create.return_value.data.id = "test_session_id"
+        mock_client.tools.perform_web_task.side_effect = [Mock(data=Mock(result=result)) for result in results]
+        mock_client.tools.fetch_webpage.side_effect = pages
+        mock_anchorbrowser.return_value = mock_client
+        return mock_client
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_recorded_task_is_replayed_without_the_agent(self, mock_anchorbrowser):
+        tomorrow = PAGE.replace("1,299.50", "1,249.00")
+        mock_client = self.make_client(mock_anchorbrowser, [PAGE, tomorrow],
+                                       {"name": "Acme Widget", "price": 1299.5, "stock": 14})
+        store = TaskReplayStore()
+        tool = AdvancedAnchorWebTaskTool(response_schema=Product, replay_store=store, replay_read_only=True)
+        inputs = {"prompt": "Get the product name, price and stock", "url": URL}
+
+        self.assertEqual(tool.invoke(inputs), Product(name="Acme Widget", price=1299.5, stock=14))
+        self.assertEqual(tool.invoke(inputs), Product(name="Acme Widget", price=1249.0, stock=14))
+
+        mock_client.tools.perform_web_task.assert_called_once()
+        fetches = mock_client.tools.fetch_webpage.call_args_list
+        self.assertEqual([(call.kwargs["url"], call.kwargs["format"]) for call in fetches], [(URL, "markdown")] * 2)
+        self.assertEqual((store.stats()["recordings"], store.stats()["replays"]), (1, 1))
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_failed_replay_falls_back_and_records_again(self, mock_anchorbrowser):
+        redesigned = PAGE.replace("**Price:**", "Our price").replace("**In stock:**", "Available:")
+        mock_client = self.make_client(
+            mock_anchorbrowser, [PAGE, redesigned, redesigned, redesigned],
+            {"name": "Acme Widget", "price": 1299.5, "stock": 14},
+            {"name": "Acme Widget", "price": 1299.5, "stock": 14},
+        )
+        store = TaskReplayStore()
+        tool = AdvancedAnchorWebTaskTool(response_schema=Product, replay_store=store, replay_read_only=True)
+        inputs = {"prompt": "Get the product name, price and stock", "url": URL}
+
+        tool.invoke(inputs)
+        self.assertEqual(tool.invoke(inputs).price, 1299.5)  # Replay misses the anchors, the agent runs
+        self.assertEqual(tool.invoke(inputs).stock, 14)  # Replays the script recorded on the new layout
+
+        self.assertEqual(mock_client.tools.perform_web_task.call_count, 2)
+        stats = store.stats()
+        self.assertEqual((stats["replays"], stats["replay_failures"], stats["recordings"]), (1, 1, 2))
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_unrecordable_and_unvalidated_tasks_run_as_web_tasks(self, mock_anchorbrowser):
+        mock_client = self.make_client(
+            mock_anchorbrowser, [PAGE],
+            {"name": "Widget", "price": 1.0, "stock": 1}, {"name": "Widget", "price": 1.0, "stock": 1}, "free text",
+        )
+        store = TaskReplayStore()
+        tool = AdvancedAnchorWebTaskTool(response_schema=Product, replay_store=store, replay_read_only=True)
+        inputs = {"prompt": "Get the product", "url": URL}
+
+        tool.invoke(inputs)
+        tool.invoke(inputs)
+        # Without an output schema nothing is validated, so nothing is recorded
+        AdvancedAnchorWebTaskTool(replay_store=store, replay_read_only=True).invoke({"prompt": "Summarize the page", "url": URL})
+
+        self.assertEqual(mock_client.tools.perform_web_task.call_count, 3)
+        # The task is marked unreplayable after the first run, so the page is fetched once
+        mock_client.tools.fetch_webpage.assert_called_once()
+        self.assertEqual(store.stats()["unreplayable"], 1)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_tasks_are_not_recorded_unless_marked_read_only(self, mock_anchorbrowser):
+        result = {"name": "Acme Widget", "price": 1299.5, "stock": 14}
+        mock_client = self.make_client(mock_anchorbrowser, [PAGE], result, result)
+        store = TaskReplayStore()
+        tool = AdvancedAnchorWebTaskTool(response_schema=Product, replay_store=store)
+        inputs = {"prompt": "Add the widget to the cart, then report its name, price and stock", "url": URL}
+
+        tool.invoke(inputs)
+        tool.invoke(inputs)
+
+        # Replaying would skip adding to the cart, so both runs go to the agent
+        self.assertEqual(mock_client.tools.perform_web_task.call_count, 2)
+        mock_client.tools.fetch_webpage.assert_not_called()
+        self.assertEqual(store.stats()["scripts"], 0)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_async_record_and_replay(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        mock_async_client = mock_async_anchorbrowser.return_value
+        mock_async_client.sessions.create = AsyncMock()
+        mock_async_client.sessions.create.return_value.data.id = "async_session_id"
+        mock_async_client.tools.perform_web_task = AsyncMock(
+            return_value=Mock(data=Mock(result={"name": "Acme Widget", "price": 1299.5, "stock": 14}))
+        )
+        mock_async_client.tools.fetch_webpage = AsyncMock(side_effect=[PAGE, PAGE.replace("14 units", "9 units")])
+        tool = AdvancedAnchorWebTaskTool(response_schema=Product, replay_store=TaskReplayStore(), replay_read_only=True)
+        inputs = {"prompt": "Get the product name, price and stock", "url": URL}
+
+        async def run():
+            return await tool.ainvoke(inputs), await tool.ainvoke(inputs)
+
+        first, second = asyncio.run(run())
+
+        self.assertEqual((first.stock, second.stock), (14, 9))
+        mock_async_client.tools.perform_web_task.assert_awaited_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
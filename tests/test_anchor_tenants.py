@@ -0,0 +1,150 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+import sys
+import os
+import time
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from langchain_anchorbrowser.AnchorContentTool import AnchorContentTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorCache import InMemoryCache
+from langchain_anchorbrowser.AnchorInstrumentation import CallbackHook
+from langchain_anchorbrowser.AnchorRateLimiter import RateLimit
+
+
+def make_sdk_client(api_key):
+    mock_client = Mock(name=f"client-{api_key}")
+    mock_client.api_key = api_key
+    mock_client.sessions.create.return_value.data.id = f"session-{api_key}"
+    mock_client.tools.fetch_webpage.side_effect = lambda **kwargs: f"<html>{api_key}</html>"
+    return mock_client
+
+
+class TestTenantClients(unittest.TestCase):
+    """Test the per-API-key client registry"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._hooks = ()
+        AnchorClient._tenants = None
+
+    def tearDown(self):
+        AnchorClient._tenants = None
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'default_key'})
+    def test_api_key_selects_a_separate_client(self, mock_anchorbrowser):
+        mock_anchorbrowser.side_effect = lambda api_key, **options: make_sdk_client(api_key)
+
+        results = [
+            AnchorContentTool(api_key="key_a")._run(url="https://example.com"),
+            AnchorContentTool(api_key="key_b")._run(url="https://example.com"),
+            AnchorContentTool()._run(url="https://example.com"),
+        ]
+
+        self.assertEqual(results, ["<html>key_a</html>", "<html>key_b</html>", "<html>default_key</html>"])
+        self.assertEqual(
+            sorted(call.kwargs["api_key"] for call in mock_anchorbrowser.call_args_list),
+            ["default_key", "key_a", "key_b"],
+        )
+        self.assertIsNot(AnchorContentTool(api_key="key_a").client, AnchorContentTool(api_key="key_b").client)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    def test_same_key_shares_one_client(self, mock_anchorbrowser):
+        mock_anchorbrowser.side_effect = lambda api_key, **options: make_sdk_client(api_key)
+
+        self.assertIs(AnchorClient("key_a"), AnchorClient.for_api_key("key_a"))
+        self.assertIs(AnchorContentTool(api_key="key_a").client, AnchorContentTool(api_key="key_a").client)
+        self.assertIsNot(AnchorClient("key_a"), AnchorClient())
+        mock_anchorbrowser.assert_called_once_with(api_key="key_a", max_retries=0)
+
+    def test_limits_are_per_tenant(self):
+        AnchorClient("key_a").configure_rate_limits(fetch_webpage=RateLimit(max_in_flight=1))
+
+        self.assertIsNotNone(AnchorClient("key_a").get_rate_limiter())
+        self.assertIsNone(AnchorClient("key_b").get_rate_limiter())
+        self.assertIsNone(AnchorClient().get_rate_limiter())
+        self.assertIsNot(AnchorClient("key_a").get_circuit_breaker(), AnchorClient("key_b").get_circuit_breaker())
+
+    def test_setup_runs_once_per_tenant(self):
+        configured = []
+        AnchorClient.configure_tenants(setup=configured.append)
+
+        AnchorClient("key_a")
+        AnchorClient("key_a")
+        AnchorClient("key_b")
+
+        self.assertEqual([client.tenant for client in configured], [AnchorClient("key_a").tenant, AnchorClient("key_b").tenant])
+
+    def test_concurrent_callers_get_the_tenant_after_setup(self):
+        configured = []
+
+        def setup(client):
+            time.sleep(0.05)  # Widens the window for a second caller to slip past setup
+            client.configure_rate_limits(fetch_webpage=RateLimit(max_in_flight=1))
+            configured.append(client)
+
+        AnchorClient.configure_tenants(setup=setup)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            limiters = list(executor.map(lambda _: AnchorClient("key_a").get_rate_limiter(), range(8)))
+
+        self.assertEqual(len(configured), 1)
+        self.assertTrue(all(limiter is not None for limiter in limiters))
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    def test_least_recently_used_tenant_is_evicted(self, mock_anchorbrowser):
+        mock_anchorbrowser.side_effect = lambda api_key, **options: make_sdk_client(api_key)
+        AnchorClient.configure_tenants(max_clients=1)
+        AnchorContentTool(api_key="key_a")._run(url="https://example.com")
+        sdk_client_a = AnchorClient("key_a").initialize()[1]
+
+        AnchorContentTool(api_key="key_b")._run(url="https://example.com")
+
+        self.assertEqual(AnchorClient.tenant_count(), 1)
+        sdk_client_a.sessions.delete.assert_called_once_with("session-key_a")
+        sdk_client_a.close.assert_called_once()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    def test_busy_tenant_is_not_evicted(self, mock_anchorbrowser):
+        mock_anchorbrowser.side_effect = lambda api_key, **options: make_sdk_client(api_key)
+        AnchorClient.configure_tenants(max_clients=1, idle_ttl=0)
+        tenant_a = AnchorClient("key_a")
+
+        with tenant_a.get_session_pool().lease():
+            AnchorClient("key_b")
+            self.assertEqual(AnchorClient.evict_idle_tenants(), 1)  # Only key_b, key_a has a leased session
+            self.assertIs(AnchorClient("key_a"), tenant_a)
+
+        self.assertGreaterEqual(AnchorClient.evict_idle_tenants(), 1)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    def test_cache_entries_are_kept_apart_per_tenant(self, mock_anchorbrowser):
+        mock_anchorbrowser.side_effect = lambda api_key, **options: make_sdk_client(api_key)
+        cache = InMemoryCache()
+
+        first = AnchorContentTool(api_key="key_a", cache=cache)._run(url="https://example.com")
+        second = AnchorContentTool(api_key="key_b", cache=cache)._run(url="https://example.com")
+
+        self.assertEqual((first, second), ("<html>key_a</html>", "<html>key_b</html>"))
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    def test_default_hooks_observe_tenants(self, mock_anchorbrowser):
+        mock_anchorbrowser.side_effect = lambda api_key, **options: make_sdk_client(api_key)
+        metrics = []
+        AnchorClient().add_hook(CallbackHook(metrics.append))
+
+        AnchorContentTool(api_key="key_a")._run(url="https://example.com")
+
+        self.assertEqual(len(metrics), 1)
+        self.assertEqual(metrics[0].session_id, "session-key_a")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+import asyncio
+import itertools
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from langchain_anchorbrowser.AnchorContentTool import AnchorContentTool
+from langchain_anchorbrowser.AnchorScreenshotTool import AnchorScreenshotTool
+from langchain_anchorbrowser.AnchorWebTaskTool import SimpleAnchorWebTaskTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorSessionPool import AsyncAnchorSessionPool
+
+
+def make_mock_async_client():
+    """Create a mock AsyncAnchorbrowser client whose sessions get unique ids"""
+    client = Mock()
+    counter = itertools.count(1)
+
+    async def create_session():
+        session = Mock()
+        session.data.id = f"session_{next(counter)}"
+        session.data.live_view_url = "test_live_view_url"
+        return session
+
+    client.sessions.create = AsyncMock(side_effect=create_session)
+    client.sessions.delete = AsyncMock()
+    return client
+
+
+class TestAsyncAnchorSessionPool(unittest.IsolatedAsyncioTestCase):
+    """Test the AsyncAnchorSessionPool lease/release lifecycle"""
+
+    async def test_released_session_is_reused(self):
+        """Test that a released session is handed out again"""
+        client = make_mock_async_client()
+        pool = AsyncAnchorSessionPool(client)
+
+        async with pool.lease() as first:
+            pass
+        async with pool.lease() as second:
+            pass
+
+        self.assertEqual(first.id, second.id)
+        client.sessions.create.assert_awaited_once()
+
+    async def test_cancelled_call_discards_session(self):
+        """Test that a session is ended when the leased call is cancelled"""
+        client = make_mock_async_client()
+        pool = AsyncAnchorSessionPool(client)
+
+        async def leased_call():
+            async with pool.lease():
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(leased_call())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        client.sessions.delete.assert_awaited_once_with("session_1")
+        self.assertEqual(pool.size, 0)
+
+    async def test_concurrent_leases_respect_max_size(self):
+        """Test that concurrent callers never hold more than max_size sessions"""
+        client = make_mock_async_client()
+        pool = AsyncAnchorSessionPool(client, max_size=2)
+        peak = 0
+
+        async def leased_call():
+            nonlocal peak
+            async with pool.lease():
+                peak = max(peak, pool.leased_count)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(leased_call() for _ in range(10)))
+
+        self.assertEqual(peak, 2)
+        self.assertEqual(client.sessions.create.await_count, 2)
+
+    async def test_acquire_times_out_when_pool_is_exhausted(self):
+        """Test that acquire() raises TimeoutError once the deadline passes"""
+        pool = AsyncAnchorSessionPool(make_mock_async_client(), max_size=1)
+
+        await pool.acquire()
+        with self.assertRaises(TimeoutError):
+            await pool.acquire(timeout=0.05)
+
+
+    async def test_idle_sessions_are_ended_without_another_acquire(self):
+        """Test that the reaper task ends sessions idle past their TTL"""
+        client = make_mock_async_client()
+        pool = AsyncAnchorSessionPool(client, idle_ttl=0.1)
+
+        async with pool.lease():
+            pass
+        await asyncio.sleep(0.3)
+
+        client.sessions.delete.assert_awaited_once_with("session_1")
+        self.assertEqual(pool.size, 0)
+        await pool.aclose()
+
+
+class TestAnchorToolsAsync(unittest.IsolatedAsyncioTestCase):
+    """Test the native async execution path of the tools"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    async def test_content_tool_ainvoke(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        """Test that ainvoke goes through the async client without touching the sync one"""
+        mock_client = Mock()
+        mock_anchorbrowser.return_value = mock_client
+        mock_async_client = make_mock_async_client()
+        mock_async_client.tools.fetch_webpage = AsyncMock(return_value="<html>Test content</html>")
+        mock_async_anchorbrowser.return_value = mock_async_client
+
+        tool = AnchorContentTool()
+        result = await tool.ainvoke({"url": "https://example.com", "format": "html"})
+
+        self.assertEqual(result, "<html>Test content</html>")
+        mock_async_anchorbrowser.assert_called_once_with(api_key='test_api_key', max_retries=0)
+        mock_async_client.tools.fetch_webpage.assert_awaited_once_with(
+            url="https://example.com", format="html", session_id="session_1"
+        )
+        mock_client.sessions.create.assert_not_called()
+        mock_client.tools.fetch_webpage.assert_not_called()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    async def test_async_pool_is_warmed_to_min_size(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        """Test that the async pool of a loop fills up to min_size like the sync pool"""
+        mock_anchorbrowser.return_value.sessions.create.return_value.data.id = "sync_session"
+        mock_async_client = make_mock_async_client()
+        mock_async_client.tools.fetch_webpage = AsyncMock(return_value="content")
+        mock_async_anchorbrowser.return_value = mock_async_client
+        AnchorClient().configure_session_pool(min_size=3)
+
+        await AnchorContentTool().ainvoke({"url": "https://example.com"})
+        await asyncio.sleep(0.01)
+
+        pool = AnchorClient().get_async_session_pool()
+        self.assertEqual((pool.size, pool.idle_count), (3, 3))
+        self.assertEqual(mock_async_client.sessions.create.await_count, 3)
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    async def test_screenshot_tool_arun(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        """Test that the async screenshot path awaits the response text"""
+        mock_anchorbrowser.return_value = Mock()
+        mock_async_client = make_mock_async_client()
+        mock_response = Mock()
+        mock_response.text = AsyncMock(return_value="screenshot_data")
+        mock_async_client.tools.screenshot_webpage = AsyncMock(return_value=mock_response)
+        mock_async_anchorbrowser.return_value = mock_async_client
+
+        tool = AnchorScreenshotTool()
+        result = await tool._arun(url="https://example.com", width=1920)
+
+        self.assertEqual(result, "screenshot_data")
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    async def test_web_task_arun_without_url(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        """Test that the async web task path applies the same defaults as _run"""
+        mock_anchorbrowser.return_value = Mock()
+        mock_async_client = make_mock_async_client()
+        mock_response = Mock()
+        mock_response.data = "task_result"
+        mock_async_client.tools.perform_web_task = AsyncMock(return_value=mock_response)
+        mock_async_anchorbrowser.return_value = mock_async_client
+
+        tool = SimpleAnchorWebTaskTool()
+        result = await tool._arun(prompt="Search for Python")
+
+        self.assertEqual(result, "task_result")
+        mock_async_client.tools.perform_web_task.assert_awaited_once_with(
+            prompt="Search for Python. Ignore the starting url.",
+            url="https://example.com",
+            session_id="session_1"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -80,11 +80,13 @@ class TestAnchorToolsIntegration(unittest.TestCase):
         mock_client = Mock()
         mock_anchorbrowser.return_value = mock_client
         
-        # Create a tool - should use environment variable
+        # Create a tool - the client is only created on first use
         tool = AnchorContentTool()
+        mock_anchorbrowser.assert_not_called()
         
         # Verify environment variable was used
-        mock_anchorbrowser.assert_called_once_with(api_key='test_env_key')
+        self.assertIs(tool.client, mock_client)
+        mock_anchorbrowser.assert_called_once_with(api_key='test_env_key', max_retries=0)
 
     def test_real_anchor_browser_connection(self):
         """Test real connection to Anchor Browser API"""
@@ -36,7 +36,7 @@ class TestAnchorClient(unittest.TestCase):
         api_key, _ = client.initialize()
         
         self.assertEqual(api_key.get_secret_value(), 'env_api_key')
-        mock_anchorbrowser.assert_called_once_with(api_key='env_api_key')
+        mock_anchorbrowser.assert_called_once_with(api_key='env_api_key', max_retries=0)
 
 
 class TestAnchorBaseTool(unittest.TestCase):
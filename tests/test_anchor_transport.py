@@ -0,0 +1,116 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import sys
+import os
+
+# Add the src and benchmarks directories to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from fake_anchor_server import FakeAnchorServer, FakeServerConfig
+from langchain_anchorbrowser.AnchorContentTool import AnchorContentTool
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+from langchain_anchorbrowser.AnchorTransport import TransportConfig
+
+
+class TestTransport(unittest.TestCase):
+    """Test HTTP transport settings, pre-warming and reuse stats against the local fake API"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        self.server = FakeAnchorServer(FakeServerConfig(latency=0, session_latency=0, content_bytes=10)).start()
+        self.environ = patch.dict(os.environ, {
+            'ANCHORBROWSER_API_KEY': 'transport_key',
+            'ANCHORBROWSER_BASE_URL': self.server.url,
+        })
+        self.environ.start()
+
+    def tearDown(self):
+        client = AnchorClient._instance
+        if client is not None and client._client is not None:
+            client.shutdown()
+        self.environ.stop()
+        self.server.stop()
+        AnchorClient._instance = None
+
+    def test_no_transport_keeps_the_sdk_defaults(self):
+        client = AnchorClient()
+        _, sdk_client = client.initialize()
+
+        self.assertIsNone(client.transport_stats())
+        self.assertEqual(sdk_client._client._transport._pool._max_keepalive_connections, 20)
+
+    def test_settings_reach_the_http_client(self):
+        client = AnchorClient()
+        client.configure_transport(max_connections=7, max_keepalive_connections=3, keepalive_expiry=5.0, timeout=12.0)
+        _, sdk_client = client.initialize()
+
+        pool = sdk_client._client._transport._pool
+        self.assertEqual(pool._max_connections, 7)
+        self.assertEqual(pool._max_keepalive_connections, 3)
+        self.assertEqual(pool._keepalive_expiry, 5.0)
+        self.assertEqual(sdk_client.timeout.read, 12.0)
+
+    def test_stats_report_connection_reuse(self):
+        client = AnchorClient()
+        client.configure_transport()
+        client.configure_session_pool(max_size=1)
+        tool = AnchorContentTool()
+
+        for _ in range(3):
+            self.assertEqual(tool._run(url="https://example.com"), "x" * 10)
+        stats = client.transport_stats()
+
+        # Session create, three fetches, and the status checks before reusing the session
+        self.assertGreaterEqual(stats["requests"], 4)
+        self.assertEqual(stats["connections_opened"], 1)
+        self.assertEqual(stats["reused_requests"], stats["requests"] - 1)
+        self.assertGreater(stats["reuse_rate"], 0.7)
+
+    def test_prewarm_opens_connections_up_front(self):
+        client = AnchorClient()
+        client.configure_transport(prewarm=4)
+
+        stats = client.transport_stats()
+        self.assertIsNotNone(client._client)
+        self.assertEqual(stats["requests"], 4)
+        self.assertGreaterEqual(stats["connections_opened"], 1)
+        self.assertLessEqual(stats["connections_opened"], 4)
+
+    def test_prewarm_is_capped_by_keepalive_limit(self):
+        self.assertEqual(TransportConfig(prewarm=50, max_keepalive_connections=8).prewarm_count, 8)
+        self.assertEqual(TransportConfig(prewarm=50, max_keepalive_connections=None).prewarm_count, 50)
+        with self.assertRaises(ValueError):
+            TransportConfig(prewarm=-1)
+
+    def test_reconfiguring_replaces_the_client(self):
+        client = AnchorClient()
+        _, first = client.initialize()
+        client.configure_transport(max_connections=5)
+        _, second = client.initialize()
+
+        self.assertIsNot(first, second)
+        self.assertTrue(first._client.is_closed)
+
+    def test_async_client_uses_the_transport(self):
+        client = AnchorClient()
+        client.configure_transport(prewarm=2)
+        sync_requests = client.transport_stats()["requests"]
+
+        async def run():
+            pool = client.get_async_session_pool()
+            await asyncio.gather(*client._prewarm_tasks)
+            return pool
+
+        pool = asyncio.run(run())
+        self.assertEqual(pool.client._client._transport._pool._max_keepalive_connections, 20)
+        self.assertEqual(client.transport_stats()["requests"], sync_requests + 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+import asyncio
+import time
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_anchorbrowser.AnchorWebTaskTool import (
+    SimpleAnchorWebTaskTool,
+    AdvancedAnchorWebTaskTool,
+    WEB_TASK_START_EVENT,
+    WEB_TASK_PROGRESS_EVENT,
+    WEB_TASK_END_EVENT,
+)
+from langchain_anchorbrowser.AnchorBaseTool import AnchorClient
+
+
+class RecordingHandler(BaseCallbackHandler):
+    def __init__(self):
+        self.events = []
+
+    def on_custom_event(self, name, data, **kwargs):
+        self.events.append((name, data))
+
+
+def make_async_client(task_seconds: float):
+    client = Mock()
+    client.sessions.create = AsyncMock(return_value=Mock(data=Mock(id="session_1", live_view_url="live")))
+    client.sessions.delete = AsyncMock()
+
+    async def perform_web_task(**kwargs):
+        await asyncio.sleep(task_seconds)
+        return Mock(data={"title": "Example Domain"})
+
+    client.tools.perform_web_task = AsyncMock(side_effect=perform_web_task)
+    return client
+
+
+class TestWebTaskProgress(unittest.TestCase):
+    """Test the progress events dispatched by the web task tools"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._hooks = ()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_invoke_reports_start_heartbeats_and_end(self, mock_anchorbrowser):
+        mock_client = mock_anchorbrowser.return_value
+        mock_client.sessions.create.return_value.data.id = "session_1"
+
+        def perform_web_task(**kwargs):
+            time.sleep(0.1)
+            return Mock(data="done")
+
+        mock_client.tools.perform_web_task.side_effect = perform_web_task
+        handler = RecordingHandler()
+
+        result = SimpleAnchorWebTaskTool(progress_interval=0.02).invoke(
+            {"prompt": "Find the title", "url": "https://example.com"}, config={"callbacks": [handler]}
+        )
+
+        names = [name for name, _ in handler.events]
+        self.assertEqual(result, "done")
+        self.assertEqual(names[0], WEB_TASK_START_EVENT)
+        self.assertIn(WEB_TASK_PROGRESS_EVENT, names)
+        self.assertEqual(names[-1], WEB_TASK_END_EVENT)
+        self.assertEqual(handler.events[0][1]["session_id"], "session_1")
+        self.assertEqual(handler.events[-1][1]["result"], "done")
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    def test_no_events_outside_a_run_or_when_disabled(self, mock_anchorbrowser):
+        mock_anchorbrowser.return_value.tools.perform_web_task.return_value.data = "done"
+        handler = RecordingHandler()
+
+        self.assertEqual(SimpleAnchorWebTaskTool()._run(prompt="Find the title"), "done")
+        SimpleAnchorWebTaskTool(progress_events=False).invoke(
+            {"prompt": "Find the title"}, config={"callbacks": [handler]}
+        )
+
+        self.assertEqual(handler.events, [])
+
+
+class TestAsyncWebTaskProgress(unittest.IsolatedAsyncioTestCase):
+    """Test progress events on the async path, as seen through astream_events"""
+
+    def setUp(self):
+        AnchorClient._instance = None
+        AnchorClient._client = None
+        AnchorClient._api_key = None
+        AnchorClient._session_pool = None
+        AnchorClient._async_session_pools = None
+        AnchorClient._hooks = ()
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    async def test_astream_events_yields_progress(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        mock_async_anchorbrowser.return_value = make_async_client(task_seconds=0.1)
+        tool = AdvancedAnchorWebTaskTool(progress_interval=0.02)
+
+        events = [
+            event async for event in tool.astream_events(
+                {"prompt": "Find the title", "url": "https://example.com", "output_schema": {"type": "object"}},
+                version="v2",
+            )
+            if event["event"] == "on_custom_event"
+        ]
+
+        names = [event["name"] for event in events]
+        self.assertEqual(names[0], WEB_TASK_START_EVENT)
+        self.assertGreaterEqual(names.count(WEB_TASK_PROGRESS_EVENT), 1)
+        self.assertEqual(names[-1], WEB_TASK_END_EVENT)
+        self.assertEqual(events[-1]["data"]["result"], {"title": "Example Domain"})
+
+    @patch('langchain_anchorbrowser.AnchorBaseTool.AsyncAnchorbrowser')
+    @patch('langchain_anchorbrowser.AnchorBaseTool.Anchorbrowser')
+    @patch.dict(os.environ, {'ANCHORBROWSER_API_KEY': 'test_api_key'})
+    async def test_cancelling_the_stream_ends_the_session(self, mock_anchorbrowser, mock_async_anchorbrowser):
+        mock_client = mock_async_anchorbrowser.return_value = make_async_client(task_seconds=10)
+        tool = SimpleAnchorWebTaskTool(progress_interval=0.01)
+
+        async def consume():
+            async for event in tool.astream_events({"prompt": "Run forever"}, version="v2"):
+                pass
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        mock_client.sessions.delete.assert_awaited_once_with("session_1")
+
+
+if __name__ == '__main__':
+    unittest.main()